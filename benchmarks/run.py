@@ -0,0 +1,199 @@
+import argparse
+import json
+import tempfile
+import timeit
+import tracemalloc
+from collections.abc import Callable, Sequence
+from pathlib import Path
+
+from benchmarks.synthetic import generate_accounts
+from portfoliomanager.degiroportfolio import DegiroPortfolio
+from portfoliomanager.portfoliomanager import PortfolioManager
+
+SCALES = {
+    'small': {'n_accounts': 10, 'n_assets': 10},
+    'medium': {'n_accounts': 100, 'n_assets': 50},
+    'large': {'n_accounts': 500, 'n_assets': 200},
+}
+BASELINE_FILE = Path(__file__).parent / 'baseline.json'
+DEFAULT_REPEAT = 5
+DEFAULT_TOLERANCE = 1.5
+MIN_SECONDS = 1e-3
+
+Results = dict[str, dict[str, dict[str, float]]]
+
+
+def benchmarks(files: Sequence[tuple[Path, Path]]) -> dict[str, Callable[[], object]]:
+    """Builds the benchmarks of one scale.
+
+    The summary and rebalance benchmarks invalidate the memoized
+    views of every portfolio first, so they time the full computation.
+
+    Args:
+        files (Sequence[tuple[Path, Path]]): The assets and allocation
+            csv files of every account.
+
+    Returns:
+        dict[str, Callable[[], object]]: The benchmarks, by name.
+    """
+    portfolios = [DegiroPortfolio(assets, allocation) for assets, allocation in files]
+    managers = [PortfolioManager(portfolio) for portfolio in portfolios]
+
+    def read_portfolio() -> object:
+        return [DegiroPortfolio._read_portfolio(assets) for assets, _ in files]  # noqa: SLF001
+
+    def read_allocation() -> object:
+        return [DegiroPortfolio._read_allocation(allocation) for _, allocation in files]  # noqa: SLF001
+
+    def summary() -> object:
+        for portfolio in portfolios:
+            portfolio.invalidate_cache()
+        return [portfolio.summary for portfolio in portfolios]
+
+    def rebalance_sell() -> object:
+        for portfolio in portfolios:
+            portfolio.invalidate_cache()
+        return [manager.rebalance_sell() for manager in managers]
+
+    def rebalance_no_sell() -> object:
+        for portfolio in portfolios:
+            portfolio.invalidate_cache()
+        return [manager.rebalance_no_sell() for manager in managers]
+
+    return {
+        'read_portfolio': read_portfolio,
+        'read_allocation': read_allocation,
+        'summary': summary,
+        'rebalance_sell': rebalance_sell,
+        'rebalance_no_sell': rebalance_no_sell,
+    }
+
+
+def measure(benchmark: Callable[[], object], repeat: int) -> dict[str, float]:
+    """Times a benchmark and records its peak memory.
+
+    The peak memory is traced in a separate run, so that tracing does
+    not inflate the timings.
+
+    Args:
+        benchmark (Callable[[], object]): The benchmark to measure.
+        repeat (int): The number of timed runs.
+
+    Returns:
+        dict[str, float]: The best time in seconds and the peak
+            memory in bytes.
+    """
+    seconds = min(timeit.repeat(benchmark, number=1, repeat=repeat))
+
+    tracemalloc.start()
+    try:
+        benchmark()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {'seconds': seconds, 'peak_bytes': peak}
+
+
+def run(scales: Sequence[str], repeat: int = DEFAULT_REPEAT, seed: int = 0) -> Results:
+    """Runs the benchmarks on synthetic Degiro exports.
+
+    Args:
+        scales (Sequence[str]): The names of the scales to run.
+        repeat (int): The number of timed runs of each benchmark.
+            Defaults to 5.
+        seed (int): The seed of the synthetic exports. Defaults to 0.
+
+    Returns:
+        Results: The measurements, by scale and benchmark.
+    """
+    results = {}
+
+    for scale in scales:
+        with tempfile.TemporaryDirectory() as directory:
+            files = generate_accounts(directory, **SCALES[scale], seed=seed)
+            results[scale] = {
+                name: measure(benchmark, repeat) for name, benchmark in benchmarks(files).items()
+            }
+
+    return results
+
+
+def compare(results: Results, baseline: Results, tolerance: float) -> list[str]:
+    """Compares measurements against a baseline.
+
+    Timings below `MIN_SECONDS` are compared as `MIN_SECONDS`, so that
+    the noise of very fast benchmarks is not reported.
+
+    Args:
+        results (Results): The new measurements.
+        baseline (Results): The baseline measurements.
+        tolerance (float): The largest accepted ratio between a new
+            measurement and its baseline.
+
+    Returns:
+        list[str]: A description of every regression.
+    """
+    regressions = []
+
+    for scale, measurements in results.items():
+        for name, measurement in measurements.items():
+            reference = baseline.get(scale, {}).get(name)
+            if reference is None:
+                continue
+
+            for metric, floor in (('seconds', MIN_SECONDS), ('peak_bytes', 0)):
+                ratio = max(measurement[metric], floor) / max(reference[metric], floor, 1e-12)
+                if ratio > tolerance:
+                    regressions.append(
+                        f'{scale}/{name}: {metric} {measurement[metric]:.6g} is {ratio:.2f}x '
+                        f'the baseline {reference[metric]:.6g} (tolerance {tolerance}x)'
+                    )
+
+    return regressions
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Runs the benchmark suite from the command line.
+
+    Args:
+        argv (Sequence[str] | None): The command line arguments.
+
+    Returns:
+        int: 1 if a regression was found, 0 otherwise.
+    """
+    parser = argparse.ArgumentParser(description='Benchmark loading and rebalancing.')
+    parser.add_argument('--scales', nargs='+', choices=SCALES, default=['small', 'medium'])
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--baseline', type=Path, default=BASELINE_FILE)
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument('--save', action='store_true', help='Overwrite the baseline.')
+    args = parser.parse_args(argv)
+
+    results = run(args.scales, args.repeat)
+
+    for scale, measurements in results.items():
+        for name, measurement in measurements.items():
+            print(
+                f'{scale:>8} {name:<18} {measurement["seconds"] * 1000:10.3f} ms '
+                f'{measurement["peak_bytes"] / 2**20:10.3f} MiB'
+            )
+
+    if args.save:
+        baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        args.baseline.write_text(json.dumps(baseline | results, indent=2) + '\n')
+        return 0
+
+    if not args.baseline.exists():
+        print(f'No baseline found at {args.baseline}; run with --save to create one.')
+        return 0
+
+    regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+    for regression in regressions:
+        print(f'REGRESSION {regression}')
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,164 @@
+import csv
+import string
+from pathlib import Path
+
+import numpy as np
+
+CURRENCIES = ('EUR', 'USD', 'GBP', 'CHF')
+COUNTRIES = ('US', 'IE', 'LU', 'DE', 'FR', 'GB', 'NL')
+DEGIRO_HEADER = ('Prodotto', 'Codice', 'Quantità', 'Ultimo', 'Valore', 'Valore in EUR')
+ALLOCATION_HEADER = ('ISIN', 'Expected Percentage')
+ALLOCATION_QUANTUM = 4
+FULL_QUANTA = 100 * ALLOCATION_QUANTUM
+
+
+def isin_check_digit(isin: str) -> str:
+    """Computes the check digit of an ISIN.
+
+    Args:
+        isin (str): The first 11 characters of the ISIN.
+
+    Returns:
+        str: The check digit.
+    """
+    digits = ''.join(str(int(char, 36)) for char in isin)
+    total = 0
+    for position, digit in enumerate(reversed(digits)):
+        value = int(digit) * (2 if position % 2 == 0 else 1)
+        total += value // 10 + value % 10
+    return str((10 - total % 10) % 10)
+
+
+def generate_isins(n: int, rng: np.random.Generator) -> list[str]:
+    """Generates unique, valid ISINs.
+
+    Args:
+        n (int): The number of ISINs.
+        rng (Generator): The random number generator.
+
+    Returns:
+        list[str]: The ISINs.
+    """
+    alphabet = np.array(list(string.digits + string.ascii_uppercase))
+    isins = set()
+    while len(isins) < n:
+        country = COUNTRIES[rng.integers(len(COUNTRIES))]
+        body = country + ''.join(rng.choice(alphabet, 9))
+        isins.add(body + isin_check_digit(body))
+    return sorted(isins)
+
+
+def _decimal_comma(value: float) -> str:
+    return f'{value:.2f}'.replace('.', ',')
+
+
+def generate_account(
+    assets_file: Path,
+    allocation_file: Path,
+    universe: list[str],
+    n_assets: int,
+    rng: np.random.Generator,
+) -> None:
+    """Writes a synthetic Degiro assets csv and its allocation csv.
+
+    The assets csv follows the Italian Degiro export: decimal commas
+    in the 'Ultimo' and 'Valore in EUR' columns, local values prefixed
+    by their currency, and one to three cash rows without an ISIN
+    scattered among the positions. Every held asset has a positive
+    expected percentage, plus one allocated asset that is not held
+    yet. The percentages are multiples of 0.25 so that they sum to
+    exactly 100 in floating point.
+
+    Args:
+        assets_file (Path): The assets csv to write.
+        allocation_file (Path): The allocation csv to write.
+        universe (list[str]): The ISINs to pick the assets from.
+        n_assets (int): The number of assets held.
+        rng (Generator): The random number generator.
+    """
+    isins = rng.choice(universe, min(n_assets + 1, len(universe)), replace=False)
+    held, new = isins[:n_assets], isins[n_assets:]
+
+    amounts = rng.integers(1, 2000, len(held))
+    closings = np.round(rng.uniform(5, 500, len(held)), 2)
+    currencies = rng.choice(CURRENCIES, len(held))
+    rates = np.where(currencies == 'EUR', 1.0, rng.uniform(0.8, 1.2, len(held)))
+
+    rows = [
+        (
+            f'PRODUCT {isin}',
+            isin,
+            str(amount),
+            _decimal_comma(closing),
+            f'{currency} {amount * closing:.2f}',
+            _decimal_comma(amount * closing * rate),
+        )
+        for isin, amount, closing, currency, rate in zip(
+            held, amounts, closings, currencies, rates, strict=True
+        )
+    ]
+    for _ in range(rng.integers(1, 4)):
+        cash = rng.uniform(0, 1000)
+        position = rng.integers(len(rows) + 1)
+        rows.insert(
+            position,
+            ('CASH & CASH FUND (EUR)', '', '', '', f'EUR {cash:.2f}', _decimal_comma(cash)),
+        )
+
+    with assets_file.open('w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(DEGIRO_HEADER)
+        writer.writerows(rows)
+
+    allocated = np.concatenate([held, new])
+    shares = rng.multinomial(FULL_QUANTA - len(allocated), rng.dirichlet(np.ones(len(allocated))))
+    quanta = shares + 1
+
+    with allocation_file.open('w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(ALLOCATION_HEADER)
+        writer.writerows(
+            (isin, quantum / ALLOCATION_QUANTUM)
+            for isin, quantum in zip(allocated, quanta, strict=True)
+        )
+
+
+def generate_accounts(
+    directory: str | Path,
+    n_accounts: int,
+    n_assets: int,
+    *,
+    universe_size: int | None = None,
+    seed: int = 0,
+) -> list[tuple[Path, Path]]:
+    """Writes synthetic Degiro exports for many accounts.
+
+    The accounts draw their assets from a shared universe of ISINs,
+    so a batch of them overlaps like real client books do.
+
+    Args:
+        directory (str | Path): The directory to write to.
+        n_accounts (int): The number of accounts.
+        n_assets (int): The number of assets held by each account.
+        universe_size (int | None): The number of distinct ISINs.
+            Defaults to twice `n_assets`.
+        seed (int): The seed of the random number generator.
+            Defaults to 0.
+
+    Returns:
+        list[tuple[Path, Path]]: The assets and allocation csv files
+            of each account.
+    """
+    rng = np.random.default_rng(seed)
+    universe = generate_isins(universe_size or 2 * n_assets, rng)
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    files = []
+    for account in range(n_accounts):
+        assets_file = directory / f'assets_{account}.csv'
+        allocation_file = directory / f'allocation_{account}.csv'
+        generate_account(assets_file, allocation_file, universe, n_assets, rng)
+        files.append((assets_file, allocation_file))
+
+    return files
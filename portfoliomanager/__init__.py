@@ -1,2 +1,49 @@
-from .degiroportfolio import DegiroPortfolio  # noqa: F401
-from .portfoliomanager import PortfolioManager  # noqa: F401
+import importlib
+from typing import Any
+
+_EXPORTS = {
+    'Allocation': 'allocation',
+    'AllocationRegistry': 'allocation',
+    'BatchPortfolioManager': 'batch',
+    'ConsolidatedPortfolio': 'consolidated',
+    'DegiroPortfolio': 'degiroportfolio',
+    'FeeSchedule': 'fees',
+    'FxRates': 'fx',
+    'HttpQuoteProvider': 'quotes',
+    'LitePortfolio': 'lite',
+    'LitePortfolioManager': 'lite',
+    'LoadResult': 'loader',
+    'PortfolioCache': 'cache',
+    'PortfolioManager': 'portfoliomanager',
+    'PriceHistoryStore': 'history',
+    'Quote': 'quotes',
+    'QuoteFetcher': 'quotes',
+    'StubQuoteServer': 'quotes',
+    'load_portfolios': 'loader',
+}
+
+__all__ = sorted(_EXPORTS)  # noqa: PLE0605
+
+
+def __getattr__(name: str) -> Any:  # noqa: ANN401
+    """Imports the public names on first access.
+
+    Importing the package, or a pandas-free module such as
+    `portfoliomanager.lite`, doesn't import pandas.
+
+    Args:
+        name (str): The name to import.
+
+    Raises:
+        AttributeError: If the name is not exported.
+
+    Returns:
+        Any: The exported class or function.
+    """
+    if name not in _EXPORTS:
+        msg = f'module {__name__!r} has no attribute {name!r}'
+        raise AttributeError(msg)
+
+    value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,212 @@
+import asyncio
+import ssl
+from urllib.parse import urlsplit
+
+MAX_HEADER_LINES = 100
+NO_BODY_STATUSES = (204, 304)
+
+
+class HTTPError(OSError):
+    """An HTTP response with an error status.
+
+    Attributes:
+        status (int): The status code of the response.
+    """
+
+    def __init__(self, status: int, reason: str):
+        """__init__ method.
+
+        Args:
+            status (int): The status code of the response.
+            reason (str): The reason phrase of the response.
+        """
+        super().__init__(f'HTTP {status} {reason}')
+        self.status = status
+
+
+class ConnectionPool:
+    """A pool of keep-alive HTTP/1.1 connections to one server.
+
+    Connections are opened on demand, up to `size` at a time, and
+    returned to the pool after every complete response, so that
+    consecutive requests skip the TCP and TLS handshakes. A connection
+    the server closes, e.g. to end a body without a length, is dropped.
+
+    Attributes:
+        _host (str): The host of the server.
+        _port (int): The port of the server.
+        _ssl (SSLContext | None): The TLS context, for https servers.
+        _timeout (float): The timeout of every request, in seconds.
+        _slots (Semaphore): Limits the number of open connections.
+        _idle (list): The idle connections, most recent last.
+        opened (int): The number of connections opened so far.
+    """
+
+    def __init__(self, url: str, *, size: int = 8, timeout: float = 10.0):
+        """__init__ method.
+
+        Constructs all the necessary attributes for the connection
+        pool object.
+
+        Args:
+            url (str): The base url of the server, http or https.
+            size (int): The maximum number of open connections.
+                Defaults to 8.
+            timeout (float): The timeout of every request, in seconds.
+                Defaults to 10.
+        """
+        parts = urlsplit(url)
+        https = parts.scheme == 'https'
+
+        self._host = parts.hostname
+        self._port = parts.port or (443 if https else 80)
+        self._ssl = ssl.create_default_context() if https else None
+        self._timeout = timeout
+        self._slots = asyncio.Semaphore(size)
+        self._idle = []
+        self.opened = 0
+
+    async def get(self, target: str) -> bytes:
+        """Sends a GET request and returns the body of the response.
+
+        Args:
+            target (str): The path and query of the request.
+
+        Raises:
+            HTTPError: If the response status is not 200.
+            OSError: If the connection fails.
+            TimeoutError: If the request takes longer than the timeout.
+
+        Returns:
+            bytes: The body of the response.
+        """
+        async with self._slots:
+            reader, writer = self._idle.pop() if self._idle else await self._open()
+
+            try:
+                writer.write(
+                    f'GET {target} HTTP/1.1\r\nHost: {self._host}\r\n'
+                    'Connection: keep-alive\r\n\r\n'.encode()
+                )
+                status, reason, headers, body = await asyncio.wait_for(
+                    read_message(reader), self._timeout
+                )
+            except BaseException:
+                writer.close()
+                raise
+
+            if headers.get('connection', '').lower() == 'close' or reader.at_eof():
+                writer.close()
+            else:
+                self._idle.append((reader, writer))
+
+        if status != 200:  # noqa: PLR2004
+            raise HTTPError(status, reason)
+
+        return body
+
+    async def close(self) -> None:
+        """Closes every idle connection."""
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+            await writer.wait_closed()
+
+    async def _open(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        """Opens a new connection to the server."""
+        connection = await asyncio.wait_for(
+            asyncio.open_connection(self._host, self._port, ssl=self._ssl), self._timeout
+        )
+        self.opened += 1
+        return connection
+
+
+async def read_message(reader: asyncio.StreamReader) -> tuple[int, str, dict[str, str], bytes]:
+    """Reads one HTTP/1.1 response.
+
+    The body is delimited by its Content-Length header, or by chunks
+    with a chunked Transfer-Encoding. Without either, the body ends
+    when the server closes the connection, except for the responses
+    that never have one.
+
+    Args:
+        reader (StreamReader): The stream of the connection.
+
+    Raises:
+        ConnectionError: If the connection is closed or the message
+            is malformed.
+
+    Returns:
+        tuple: The status code, the reason phrase, the lower-cased
+            headers and the body.
+    """
+    line = await reader.readline()
+    if not line:
+        msg = 'The connection was closed by the server.'
+        raise ConnectionError(msg)
+
+    try:
+        _, status, reason = line.decode('latin-1').rstrip('\r\n').split(' ', 2)
+        headers = await read_headers(reader)
+        if 'chunked' in headers.get('transfer-encoding', '').lower():
+            body = await read_chunks(reader)
+        elif 'content-length' in headers:
+            body = await reader.readexactly(int(headers['content-length']))
+        elif int(status) < 200 or int(status) in NO_BODY_STATUSES:  # noqa: PLR2004
+            body = b''
+        else:
+            body = await reader.read()
+    except (ValueError, asyncio.IncompleteReadError) as e:
+        msg = 'Malformed HTTP response.'
+        raise ConnectionError(msg) from e
+
+    return int(status), reason, headers, body
+
+
+async def read_chunks(reader: asyncio.StreamReader) -> bytes:
+    """Reads a body with a chunked Transfer-Encoding.
+
+    Args:
+        reader (StreamReader): The stream of the connection.
+
+    Raises:
+        ValueError: If a chunk size is malformed.
+        IncompleteReadError: If the connection is closed mid-body.
+
+    Returns:
+        bytes: The body, without the chunk framing.
+    """
+    chunks = []
+
+    while size := int((await reader.readline()).split(b';', 1)[0], 16):
+        chunks.append(await reader.readexactly(size))
+        await reader.readexactly(2)
+
+    # The trailer fields, if any, end with an empty line.
+    await read_headers(reader)
+    return b''.join(chunks)
+
+
+async def read_headers(reader: asyncio.StreamReader) -> dict[str, str]:
+    """Reads the headers of an HTTP message.
+
+    Args:
+        reader (StreamReader): The stream of the connection.
+
+    Raises:
+        ValueError: If there are too many header lines.
+
+    Returns:
+        dict[str, str]: The headers, with lower-cased names.
+    """
+    headers = {}
+
+    for _ in range(MAX_HEADER_LINES):
+        line = (await reader.readline()).decode('latin-1').rstrip('\r\n')
+        if not line:
+            return headers
+        name, _, value = line.partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    msg = 'Too many HTTP header lines.'
+    raise ValueError(msg)
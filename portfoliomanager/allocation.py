@@ -0,0 +1,166 @@
+import hashlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from portfoliomanager.cache import HASH_CHUNK_SIZE, PortfolioCache
+from portfoliomanager.portfolio import Portfolio, _intern
+
+
+class Allocation:
+    """A model allocation, validated once and shared by portfolios.
+
+    A portfolio built from an `Allocation` references its DataFrame
+    instead of reading its own copy, and every portfolio following the
+    same model is grouped by `BatchPortfolioManager`, which aligns the
+    model with the ISINs of the batch once per model.
+
+    The allocation must not be modified in place: it is shared.
+
+    Attributes:
+        _frame (DataFrame): The allocation, indexed by interned ISINs.
+        _weights (ndarray): The expected percentage of every ISIN,
+            read-only.
+        _source (str): The file the allocation was read from, or ''.
+    """
+
+    def __init__(self, allocation: pd.DataFrame, source: str = ''):
+        """__init__ method.
+
+        Constructs all the necessary attributes for the allocation
+        object.
+
+        Args:
+            allocation (DataFrame): The allocation, indexed by ISIN,
+                with an 'Expected Percentage' column.
+            source (str): The file the allocation was read from.
+                Defaults to ''.
+
+        Raises:
+            ValueError: If the sum of the 'Expected Percentage'
+                column is not 100.
+        """
+        Portfolio._validate_allocation(allocation)  # noqa: SLF001
+
+        self._frame = allocation.set_axis(_intern(allocation.index))
+        self._weights = self._frame['Expected Percentage'].to_numpy(dtype=float, copy=True)
+        self._weights.flags.writeable = False
+        self._source = source
+
+    @classmethod
+    def from_csv(
+        cls, allocation_file: str | Path, *, cache: PortfolioCache | None = None
+    ) -> 'Allocation':
+        """Reads an allocation csv.
+
+        Args:
+            allocation_file (str | Path): The file name of the
+                allocation csv.
+            cache (PortfolioCache | None): The on-disk cache of the
+                validated DataFrame. Defaults to None.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+            ValueError: If the sum of the 'Expected Percentage'
+                column is not 100.
+
+        Returns:
+            Allocation: The allocation.
+        """
+        allocation = Portfolio._read_allocation(allocation_file, cache=cache)  # noqa: SLF001
+        return cls(allocation, str(allocation_file))
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """Returns the shared allocation DataFrame, indexed by ISIN."""
+        return self._frame
+
+    @property
+    def isins(self) -> pd.Index:
+        """Returns the allocated ISINs."""
+        return self._frame.index
+
+    @property
+    def weights(self) -> np.ndarray:
+        """Returns the read-only expected percentage of every ISIN."""
+        return self._weights
+
+    @property
+    def source(self) -> str:
+        """Returns the file the allocation was read from, or ''."""
+        return self._source
+
+    def __len__(self) -> int:
+        """Returns the number of allocated ISINs."""
+        return len(self._frame)
+
+    def __repr__(self) -> str:
+        """Returns the source and size of the allocation."""
+        return f'Allocation({self._source!r}, {len(self)} ISINs)'
+
+
+class AllocationRegistry:
+    """The distinct model allocations of many accounts.
+
+    Every allocation file is hashed, and files with the same content,
+    e.g. one copy of a model per account, are parsed and validated
+    once and resolve to the same `Allocation`.
+
+    Attributes:
+        _cache (PortfolioCache | None): The on-disk cache of the
+            validated DataFrames.
+        _models (dict[str, Allocation]): The allocations, keyed by the
+            content hash of their file.
+    """
+
+    def __init__(self, cache: PortfolioCache | None = None):
+        """__init__ method.
+
+        Constructs all the necessary attributes for the allocation
+        registry object.
+
+        Args:
+            cache (PortfolioCache | None): The on-disk cache of the
+                validated DataFrames. Defaults to None.
+        """
+        self._cache = cache
+        self._models = {}
+
+    @property
+    def models(self) -> list[Allocation]:
+        """Returns the distinct allocations, in the order first read."""
+        return list(self._models.values())
+
+    def __len__(self) -> int:
+        """Returns the number of distinct allocations."""
+        return len(self._models)
+
+    def get(self, allocation_file: str | Path) -> Allocation:
+        """Returns the allocation of a file, parsing it once.
+
+        Args:
+            allocation_file (str | Path): The file name of the
+                allocation csv.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+            ValueError: If the sum of the 'Expected Percentage'
+                column is not 100.
+
+        Returns:
+            Allocation: The allocation shared by every file with the
+                same content.
+        """
+        content = hashlib.blake2b(digest_size=16)
+        with Path(allocation_file).open('rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                content.update(chunk)
+        key = content.hexdigest()
+
+        model = self._models.get(key)
+        if model is None:
+            model = Allocation.from_csv(allocation_file, cache=self._cache)
+            self._models[key] = model
+
+        return model
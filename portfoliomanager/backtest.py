@@ -0,0 +1,307 @@
+from collections.abc import Iterable, Mapping
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from portfoliomanager.portfolio import Portfolio
+
+FREQUENCIES = {'monthly': 'M', 'quarterly': 'Q', 'yearly': 'Y'}
+STRATEGIES = ('sell', 'no_sell')
+DEFAULT_INITIAL = 10000.0
+SCAN_DAYS = 256
+DAYS_PER_YEAR = 365.25
+
+_worker_inputs: tuple[pd.DataFrame, pd.Series] | None = None
+
+
+@dataclass(frozen=True)
+class BacktestResult:
+    """The outcome of a backtest.
+
+    Attributes:
+        values (Series): The value of the portfolio at the close of
+            each date, after that day's rebalance.
+        weights (DataFrame): The current percentage of each asset at
+            the close of each date, dates x ISINs.
+        rebalances (DataFrame): The 'Value', 'Turnover' and
+            'Contribution' of every rebalance, indexed by date.
+            'Turnover' is the value traded as a fraction of the value
+            before the rebalance; 'Contribution' is the cash added by
+            a no-sell rebalance.
+    """
+
+    values: pd.Series
+    weights: pd.DataFrame
+    rebalances: pd.DataFrame
+
+    @property
+    def returns(self) -> pd.Series:
+        """Returns the daily returns, net of the contributions."""
+        contributions = self.rebalances['Contribution'].reindex(self.values.index, fill_value=0)
+        return ((self.values - contributions) / self.values.shift(1) - 1).fillna(0)
+
+    def summary(self) -> dict[str, float]:
+        """Summarizes the backtest.
+
+        Returns:
+            dict[str, float]: The final value, the total contributions,
+                the number of rebalances, the total turnover, the
+                annualized time-weighted return and the maximum
+                drawdown.
+        """
+        growth = (1 + self.returns).cumprod()
+        days = (self.values.index[-1] - self.values.index[0]).days
+
+        return {
+            'final_value': float(self.values.iloc[-1]),
+            'contributions': float(self.rebalances['Contribution'].sum()),
+            'rebalances': len(self.rebalances),
+            'turnover': float(self.rebalances['Turnover'].sum()),
+            'annual_return': float(growth.iloc[-1] ** (DAYS_PER_YEAR / max(days, 1)) - 1),
+            'max_drawdown': float((growth / growth.cummax() - 1).min()),
+        }
+
+
+def backtest(  # noqa: PLR0913
+    prices: pd.DataFrame,
+    allocation: pd.Series | pd.DataFrame,
+    *,
+    strategy: str = 'sell',
+    frequency: str | None = 'monthly',
+    threshold: float | None = None,
+    initial: float = DEFAULT_INITIAL,
+) -> BacktestResult:
+    """Simulates a rebalancing strategy over a history of prices.
+
+    The portfolio is bought at the target allocation on the first
+    date. Between two rebalances the holdings are constant, so the
+    values of a whole stretch of dates are one broadcast multiply of
+    the price matrix by the holdings; the loop only runs once per
+    rebalance, or once per `SCAN_DAYS` dates without one.
+
+    A 'sell' rebalance trades back to the target allocation at no
+    cost, like `rebalance_sell`. A 'no_sell' rebalance only buys,
+    like `rebalance_no_sell`, adding the cash needed to bring every
+    asset up to the most overweight one.
+
+    With a frequency only, the portfolio is rebalanced on the first
+    date of every period. With a threshold only, it is rebalanced on
+    any date where an asset drifts from its expected percentage by
+    more than `threshold` percentage points. With both, the threshold
+    is only checked on the first date of every period.
+
+    Args:
+        prices (DataFrame): The daily closing prices, dates x ISINs,
+            sorted by date, e.g. from `PriceHistoryStore.window`.
+        allocation (Series | DataFrame): The expected percentage of
+            each ISIN, as a Series or as an allocation DataFrame with
+            an 'Expected Percentage' column.
+        strategy (str): 'sell' or 'no_sell'. Defaults to 'sell'.
+        frequency (str | None): 'monthly', 'quarterly', 'yearly' or
+            None. Defaults to 'monthly'.
+        threshold (float | None): The drift band, in percentage
+            points. Defaults to None.
+        initial (float): The value invested on the first date.
+            Defaults to 10000.
+
+    Raises:
+        ValueError: If the strategy or the frequency is unknown, if
+            neither a frequency nor a threshold is given, if the
+            allocation doesn't sum to 100, or if an allocated ISIN
+            has missing prices.
+
+    Returns:
+        BacktestResult: The simulated values, weights and rebalances.
+    """
+    if strategy not in STRATEGIES:
+        msg = f'Unknown strategy {strategy!r}. Expected one of {STRATEGIES}.'
+        raise ValueError(msg)
+
+    if frequency is not None and frequency not in FREQUENCIES:
+        msg = f'Unknown frequency {frequency!r}. Expected one of {tuple(FREQUENCIES)}.'
+        raise ValueError(msg)
+
+    if frequency is None and threshold is None:
+        msg = 'A rebalancing frequency or a drift threshold is required.'
+        raise ValueError(msg)
+
+    expected = _expected_percentages(allocation)
+    matrix = _price_matrix(prices, expected.index)
+    weights = expected.to_numpy(dtype=float)
+    target = weights / weights.sum()
+
+    if frequency is None:
+        candidates = np.ones(len(prices), dtype=bool)
+    else:
+        periods = prices.index.to_period(FREQUENCIES[frequency]).asi8
+        candidates = np.concatenate([[False], periods[1:] != periods[:-1]])
+    candidates[0] = False
+
+    holdings = np.empty_like(matrix)
+    shares = initial * target / matrix[0]
+    rebalances = []
+    row = 0
+
+    while row < len(matrix):
+        stop = min(row + SCAN_DAYS, len(matrix))
+        holdings[row:stop] = shares
+
+        due = candidates[row:stop]
+        if threshold is not None:
+            block = matrix[row:stop] * shares
+            drift = np.abs(block / block.sum(axis=1, keepdims=True) * 100 - weights).max(axis=1)
+            due = due & (drift > threshold)
+
+        hits = np.flatnonzero(due)
+        if not hits.size:
+            row = stop
+            continue
+
+        day = row + hits[0]
+        values = matrix[day] * shares
+        new_values = _rebalanced_values(values, target, strategy)
+        total = values.sum()
+
+        rebalances.append(
+            (
+                prices.index[day],
+                new_values.sum(),
+                np.abs(new_values - values).sum() / total,
+                0.0 if strategy == 'sell' else new_values.sum() - total,
+            )
+        )
+        shares = new_values / matrix[day]
+        holdings[day] = shares
+        row = day + 1
+
+    value_matrix = matrix * holdings
+    totals = value_matrix.sum(axis=1)
+
+    return BacktestResult(
+        values=pd.Series(totals, index=prices.index, name='Value'),
+        weights=pd.DataFrame(
+            np.round(value_matrix / totals[:, np.newaxis] * 100, 2),
+            index=prices.index,
+            columns=expected.index,
+        ),
+        rebalances=pd.DataFrame(
+            rebalances, columns=['Date', 'Value', 'Turnover', 'Contribution']
+        ).set_index('Date'),
+    )
+
+
+def backtest_grid(
+    prices: pd.DataFrame,
+    allocation: pd.Series | pd.DataFrame,
+    grid: Iterable[Mapping[str, Any]],
+    *,
+    max_workers: int | None = None,
+) -> pd.DataFrame:
+    """Backtests many strategy parameters in parallel.
+
+    The prices and the allocation are sent once to every worker
+    process, not once per parameter set.
+
+    Args:
+        prices (DataFrame): The daily closing prices, dates x ISINs.
+        allocation (Series | DataFrame): The expected percentages.
+        grid (Iterable[Mapping[str, Any]]): The keyword arguments of
+            `backtest` to try, e.g. {'strategy': 'sell',
+            'threshold': 5}.
+        max_workers (int | None): The number of worker processes.
+            Defaults to None, which uses every core.
+
+    Raises:
+        ValueError: If a parameter set is invalid.
+
+    Returns:
+        DataFrame: The parameters and the summary of every backtest,
+            one row per parameter set, in the order of `grid`.
+    """
+    grid = [dict(params) for params in grid]
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_worker,
+        initargs=(prices, _expected_percentages(allocation)),
+    ) as executor:
+        summaries = list(executor.map(_run_worker, grid))
+
+    return pd.DataFrame(
+        [params | summary for params, summary in zip(grid, summaries, strict=True)]
+    )
+
+
+def _rebalanced_values(values: np.ndarray, target: np.ndarray, strategy: str) -> np.ndarray:
+    """Calculates the values of the assets after a rebalance.
+
+    Args:
+        values (ndarray): The values of the assets before it.
+        target (ndarray): The target weights, summing to 1.
+        strategy (str): 'sell' or 'no_sell'.
+
+    Returns:
+        ndarray: The values of the assets after the rebalance.
+    """
+    if strategy == 'sell':
+        return values.sum() * target
+
+    return target * (values / target).max()
+
+
+def _expected_percentages(allocation: pd.Series | pd.DataFrame) -> pd.Series:
+    """Extracts the positive expected percentages of an allocation.
+
+    Args:
+        allocation (Series | DataFrame): The expected percentages.
+
+    Raises:
+        ValueError: If the percentages don't sum to 100.
+
+    Returns:
+        Series: The positive expected percentages, indexed by ISIN.
+    """
+    if isinstance(allocation, pd.Series):
+        allocation = allocation.to_frame('Expected Percentage')
+
+    Portfolio._validate_allocation(allocation)  # noqa: SLF001
+    expected = allocation['Expected Percentage']
+    return expected[expected > 0]
+
+
+def _price_matrix(prices: pd.DataFrame, isins: pd.Index) -> np.ndarray:
+    """Aligns the prices on the allocated ISINs.
+
+    Args:
+        prices (DataFrame): The daily closing prices, dates x ISINs.
+        isins (Index): The allocated ISINs.
+
+    Raises:
+        ValueError: If an allocated ISIN has a missing price.
+
+    Returns:
+        ndarray: The prices, dates x allocated ISINs.
+    """
+    matrix = prices.reindex(columns=isins).to_numpy(dtype=float)
+    missing = isins[np.isnan(matrix).any(axis=0) | ~(matrix > 0).all(axis=0)]
+
+    if len(missing):
+        msg = f'Every allocated ISIN needs a positive price on every date: {list(missing)}.'
+        raise ValueError(msg)
+
+    return matrix
+
+
+def _init_worker(prices: pd.DataFrame, allocation: pd.Series) -> None:
+    """Stores the inputs shared by every backtest of a worker."""
+    global _worker_inputs  # noqa: PLW0603
+    _worker_inputs = (prices, allocation)
+
+
+def _run_worker(params: dict[str, Any]) -> dict[str, float]:
+    """Runs one backtest of a grid in a worker process."""
+    prices, allocation = _worker_inputs
+    return backtest(prices, allocation, **params).summary()
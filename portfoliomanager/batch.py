@@ -0,0 +1,428 @@
+from collections.abc import Mapping, Sequence
+from itertools import pairwise
+
+import numpy as np
+import pandas as pd
+
+from portfoliomanager.fees import DEFAULT_TOLERANCE, FeeSchedule, exchange_fees, trade_fees
+from portfoliomanager.portfolio import Portfolio
+from portfoliomanager.solvers import allocate_shares, select_trades, to_cents, water_fill
+
+
+class BatchPortfolioManager:
+    """A class to rebalance many portfolios in one vectorized pass.
+
+    The portfolios are laid out as a dense accounts x ISIN matrix
+    over the sorted union of every ISIN held or allocated, so the
+    rebalance arithmetic runs once for all the accounts instead of
+    once per account.
+
+    The accounts are grouped by model: the portfolios sharing the same
+    allocation, e.g. one `Allocation`, are aligned with the ISINs of
+    the batch once per model, and their rows of expected percentages
+    are gathered from the aligned models.
+
+    Attributes:
+        _portfolios (tuple): The portfolios to manage.
+        _models (list[DataFrame]): The distinct allocations of the
+            accounts, in the order first seen.
+        _groups (ndarray): The model of each account.
+        _isins (Index): The sorted union of all the ISINs.
+        _current (ndarray): The current values, accounts x ISINs.
+        _expected (ndarray): The expected percentages,
+            accounts x ISINs.
+        _totals (ndarray): The total value of each account.
+        _prices (ndarray): The price of one share of each owned
+            asset, accounts x ISINs, NaN where the asset is not owned.
+        _rows (ndarray): The account of each summary row.
+        _cols (ndarray): The ISIN position of each summary row.
+        _indptr (ndarray): The boundaries of each account inside
+            `_rows` and `_cols`.
+        _products (ndarray): The product of each summary row.
+        _expected_dtypes (list): The dtype of the 'Expected
+            Percentage' column of each account summary.
+    """
+
+    def __init__(self, portfolios: Sequence[Portfolio]):
+        """__init__ method.
+
+        Constructs all the necessary attributes for the batch
+        portfolio manager object.
+
+        Args:
+            portfolios (Sequence[Portfolio]): The portfolios to manage.
+
+        Raises:
+            ValueError: If no portfolio is given.
+        """
+        if not portfolios:
+            msg = 'At least one portfolio is required to build a batch.'
+            raise ValueError(msg)
+
+        self._portfolios = tuple(portfolios)
+        assets = [portfolio._as for portfolio in self._portfolios]  # noqa: SLF001
+
+        positions = {}
+        self._models = []
+        groups = []
+        for portfolio in self._portfolios:
+            allocation = portfolio._al  # noqa: SLF001
+            group = positions.setdefault(id(allocation), len(self._models))
+            if group == len(self._models):
+                self._models.append(allocation)
+            groups.append(group)
+        self._groups = np.array(groups, dtype=np.intp)
+
+        asset_rows = np.repeat(np.arange(len(assets)), [len(a) for a in assets])
+        model_rows = np.repeat(np.arange(len(self._models)), [len(m) for m in self._models])
+        asset_isins = np.concatenate([a.index.to_numpy(dtype=object) for a in assets])
+        model_isins = np.concatenate([m.index.to_numpy(dtype=object) for m in self._models])
+
+        self._isins = (
+            pd.Index(np.concatenate([asset_isins, model_isins]), name='ISIN')
+            .unique()
+            .sort_values()
+        )
+        asset_cols = self._isins.get_indexer(asset_isins)
+        model_cols = self._isins.get_indexer(model_isins)
+
+        shape = (len(self._portfolios), len(self._isins))
+        self._current = np.zeros(shape)
+        self._current[asset_rows, asset_cols] = np.concatenate(
+            [a['Current Value'].to_numpy(dtype=float) for a in assets]
+        )
+        weights = np.zeros((len(self._models), shape[1]))
+        weights[model_rows, model_cols] = np.concatenate(
+            [m['Expected Percentage'].to_numpy(dtype=float) for m in self._models]
+        )
+        allocated = np.zeros(weights.shape, dtype=bool)
+        allocated[model_rows, model_cols] = True
+        self._expected = weights[self._groups]
+        self._totals = np.array([portfolio.total_value for portfolio in self._portfolios])
+        self._prices = np.full(shape, np.nan)
+        self._prices[asset_rows, asset_cols] = np.concatenate(
+            [portfolio.prices.to_numpy(dtype=float) for portfolio in self._portfolios]
+        )
+
+        present = allocated[self._groups]
+        present[asset_rows, asset_cols] = True
+        self._rows, self._cols = np.nonzero(present)
+        counts = present.sum(axis=1)
+        self._indptr = np.concatenate([[0], np.cumsum(counts)])
+
+        flat = self._rows * shape[1] + self._cols
+        self._products = np.full(len(flat), np.nan, dtype=object)
+        products = np.concatenate([a['Product'].to_numpy(dtype=object) for a in assets])
+        self._products[np.searchsorted(flat, asset_rows * shape[1] + asset_cols)] = products
+
+        self._expected_dtypes = [
+            self._models[group]['Expected Percentage'].dtype
+            if len(self._models[group]) == count
+            else np.dtype(float)
+            for group, count in zip(self._groups, counts, strict=True)
+        ]
+
+    @property
+    def isins(self) -> pd.Index:
+        """Returns the sorted union of the ISINs of all accounts."""
+        return self._isins
+
+    @property
+    def groups(self) -> np.ndarray:
+        """Returns the model of each account, see `models`."""
+        return self._groups.copy()
+
+    @property
+    def models(self) -> list[pd.DataFrame]:
+        """Returns the distinct allocations of the accounts."""
+        return list(self._models)
+
+    @property
+    def total_values(self) -> np.ndarray:
+        """Returns the total value of each account."""
+        return self._totals.copy()
+
+    @property
+    def current_percentages(self) -> np.ndarray:
+        """Calculates the current percentages, accounts x ISINs."""
+        return np.round(self._current / self._totals[:, np.newaxis] * 100, 2)
+
+    @property
+    def expected_percentages(self) -> np.ndarray:
+        """Returns the expected percentages, accounts x ISINs."""
+        return self._expected.copy()
+
+    def select(self, accounts: Sequence[int]) -> 'BatchPortfolioManager':
+        """Returns a batch of some of the accounts.
+
+        Args:
+            accounts (Sequence[int]): The positions of the accounts to
+                keep, e.g. `DriftReport.accounts`.
+
+        Raises:
+            ValueError: If no account is selected.
+
+        Returns:
+            BatchPortfolioManager: The selected accounts, in the given
+                order.
+        """
+        return BatchPortfolioManager([self._portfolios[account] for account in accounts])
+
+    def expected_values_sell(self) -> np.ndarray:
+        """Calculates the expected values of a sell rebalance.
+
+        Returns:
+            ndarray: The expected values, accounts x ISINs.
+        """
+        return np.round(self._totals[:, np.newaxis] / 100 * self._expected, 2)
+
+    def expected_values_no_sell(self) -> np.ndarray:
+        """Calculates the expected values of a no-sell rebalance.
+
+        Raises:
+            ValueError: If an asset is owned but its expected
+                percentage is 0 in any account.
+
+        Returns:
+            ndarray: The expected values, accounts x ISINs.
+        """
+        mask = (self._expected == 0) & (self._current != 0)
+
+        if mask.any():
+            accounts = np.flatnonzero(mask.any(axis=1)).tolist()
+            msg = (
+                "While performing a no-sell rebalance, you can't set an "
+                'Expected Percentage of 0% in your desired allocation for an '
+                'asset that you currently own. The following accounts own '
+                f'assets whose Expected Percentage is 0%: {accounts}'
+                '\n\nPlease adjust your desired assets allocation and try again.'
+            )
+
+            raise ValueError(msg)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = self.current_percentages / self._expected
+
+        rows = np.arange(len(self._portfolios))
+        max_isin = np.nanargmax(ratio, axis=1)
+        max_current = self._current[rows, max_isin][:, np.newaxis]
+        max_expected = self._expected[rows, max_isin][:, np.newaxis]
+
+        return np.round(self._expected * max_current / max_expected, 2)
+
+    def movements_deposit(self, deposits: float | np.ndarray) -> np.ndarray:
+        """Calculates the movements of a deposit rebalance.
+
+        Args:
+            deposits (float | ndarray): The amount to invest in each
+                account, or one amount for all of them.
+
+        Raises:
+            ValueError: If a deposit is negative.
+
+        Returns:
+            ndarray: The movements, accounts x ISINs, summing to the
+                deposit of each account to the cent.
+        """
+        deposits = np.broadcast_to(np.asarray(deposits, dtype=float), self._totals.shape)
+        buys = water_fill(self._current, self._expected, deposits)
+        return to_cents(buys, deposits) / 100
+
+    def shares(
+        self,
+        movements: np.ndarray,
+        prices: pd.Series | None = None,
+        cash: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """Turns the movements of every account into whole shares.
+
+        Args:
+            movements (ndarray): The movements, accounts x ISINs.
+            prices (Series | None): The price of one share of each
+                ISIN, overriding the prices of every account. Required
+                for the assets that are not owned yet. Defaults to None.
+            cash (ndarray | None): The net cash each account may spend.
+                Defaults to None, which uses the sum of its movements.
+
+        Raises:
+            ValueError: If an asset to buy or sell has no price.
+
+        Returns:
+            ndarray: The number of shares to buy (positive) or sell
+                (negative), accounts x ISINs, as in
+                `PortfolioManager.orders`.
+        """
+        own_prices = self._prices
+        if prices is not None:
+            override = prices.reindex(self._isins).to_numpy(dtype=float)
+            own_prices = np.where(np.isnan(override), own_prices, override)
+
+        return allocate_shares(movements, own_prices, cash)
+
+    def rebalance_sell(self) -> list[pd.DataFrame]:
+        """Rebalance every account with sell operations.
+
+        Returns:
+            list[DataFrame]: One DataFrame per account, in the order
+                the portfolios were given, identical to
+                `PortfolioManager.rebalance_sell`.
+        """
+        return self._frames(self.expected_values_sell())
+
+    def rebalance_no_sell(self) -> list[pd.DataFrame]:
+        """Rebalance every account without sell operations.
+
+        Raises:
+            ValueError: If an asset is owned but its expected
+                percentage is 0 in any account.
+
+        Returns:
+            list[DataFrame]: One DataFrame per account, in the order
+                the portfolios were given, identical to
+                `PortfolioManager.rebalance_no_sell`.
+        """
+        return self._frames(self.expected_values_no_sell())
+
+    def rebalance_deposit(self, deposits: float | np.ndarray) -> list[pd.DataFrame]:
+        """Rebalance every account by spending a deposit.
+
+        Args:
+            deposits (float | ndarray): The amount to invest in each
+                account, or one amount for all of them.
+
+        Raises:
+            ValueError: If a deposit is negative.
+
+        Returns:
+            list[DataFrame]: One DataFrame per account, in the order
+                the portfolios were given, identical to
+                `PortfolioManager.rebalance_deposit`.
+        """
+        movements = self.movements_deposit(deposits)
+        return self._frames(np.round(self._current + movements, 2), movements)
+
+    def movements_fees(
+        self,
+        fees: FeeSchedule | Mapping[str, FeeSchedule],
+        *,
+        tolerance: float = DEFAULT_TOLERANCE,
+        min_trade: float = 0.0,
+        exchanges: pd.Series | None = None,
+    ) -> np.ndarray:
+        """Calculates the movements of a fee-aware rebalance.
+
+        Args:
+            fees (FeeSchedule | Mapping[str, FeeSchedule]): One fee
+                schedule for every exchange, or the schedule of each
+                exchange.
+            tolerance (float): The largest deviation from the expected
+                percentage left untraded, in percentage points.
+                Defaults to 1.
+            min_trade (float): The smallest value traded. Defaults to 0.
+            exchanges (Series | None): The exchange of each ISIN,
+                required with a fee schedule per exchange. Defaults to
+                None.
+
+        Raises:
+            ValueError: If there is a fee schedule per exchange and an
+                ISIN has no exchange, or an exchange has no fee
+                schedule.
+
+        Returns:
+            ndarray: The movements, accounts x ISINs, as in
+                `PortfolioManager.rebalance_fees`.
+        """
+        fixed, rates = exchange_fees(fees, self._isins, exchanges)
+        movements = self.expected_values_sell() - self._current
+        return select_trades(movements, self._totals * tolerance / 100, fixed, rates, min_trade)
+
+    def rebalance_fees(
+        self,
+        fees: FeeSchedule | Mapping[str, FeeSchedule],
+        *,
+        tolerance: float = DEFAULT_TOLERANCE,
+        min_trade: float = 0.0,
+        exchanges: pd.Series | None = None,
+    ) -> list[pd.DataFrame]:
+        """Rebalance every account with the fewest and cheapest trades.
+
+        Args:
+            fees (FeeSchedule | Mapping[str, FeeSchedule]): One fee
+                schedule for every exchange, or the schedule of each
+                exchange.
+            tolerance (float): The largest deviation from the expected
+                percentage left untraded, in percentage points.
+                Defaults to 1.
+            min_trade (float): The smallest value traded. Defaults to 0.
+            exchanges (Series | None): The exchange of each ISIN,
+                required with a fee schedule per exchange. Defaults to
+                None.
+
+        Raises:
+            ValueError: If there is a fee schedule per exchange and an
+                ISIN has no exchange, or an exchange has no fee
+                schedule.
+
+        Returns:
+            list[DataFrame]: One DataFrame per account, in the order
+                the portfolios were given, identical to
+                `PortfolioManager.rebalance_fees`.
+        """
+        movements = self.movements_fees(
+            fees, tolerance=tolerance, min_trade=min_trade, exchanges=exchanges
+        )
+        fixed, rates = exchange_fees(fees, self._isins, exchanges)
+        return self._frames(
+            np.round(self._current + movements, 2),
+            movements,
+            trade_fees(movements, fixed, rates),
+        )
+
+    def _frames(
+        self,
+        expected_values: np.ndarray,
+        movements: np.ndarray | None = None,
+        fees: np.ndarray | None = None,
+    ) -> list[pd.DataFrame]:
+        """Splits the batch matrices into one DataFrame per account.
+
+        Args:
+            expected_values (ndarray): The expected values,
+                accounts x ISINs.
+            movements (ndarray | None): The movements, accounts x
+                ISINs. Defaults to None, which subtracts the current
+                values from the expected values.
+            fees (ndarray | None): The fee of every movement, accounts
+                x ISINs, added as a 'Fee' column. Defaults to None.
+
+        Returns:
+            list[DataFrame]: One rebalance DataFrame per account.
+        """
+        current_percentages = self.current_percentages
+        if movements is None:
+            movements = expected_values - self._current
+        isins = self._isins.to_numpy()[self._cols]
+
+        columns = {
+            'Product': self._products,
+            'Current Value': self._current[self._rows, self._cols],
+            'Expected Value': expected_values[self._rows, self._cols],
+            'Current Percentage': current_percentages[self._rows, self._cols],
+            'Expected Percentage': self._expected[self._rows, self._cols],
+            'Movement': movements[self._rows, self._cols],
+        }
+        if fees is not None:
+            columns['Fee'] = fees[self._rows, self._cols]
+
+        frames = []
+        for (start, stop), expected_dtype in zip(
+            pairwise(self._indptr), self._expected_dtypes, strict=True
+        ):
+            frame = pd.DataFrame(
+                {name: values[start:stop] for name, values in columns.items()},
+                index=pd.Index(isins[start:stop], name='ISIN'),
+            )
+            frame['Expected Percentage'] = frame['Expected Percentage'].astype(expected_dtype)
+            frames.append(frame)
+
+        return frames
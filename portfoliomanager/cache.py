@@ -0,0 +1,296 @@
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CACHE_FORMAT_VERSION = 1
+DEFAULT_MAX_BYTES = 256 * 2**20
+HASH_CHUNK_SIZE = 2**20
+
+
+class PortfolioCache:
+    """A persistent on-disk cache of cleaned portfolio DataFrames.
+
+    Every entry is stored as an uncompressed NumPy `.npz` archive with
+    one array per column, keyed by the path, size, modification time
+    and content hash of the input file. Entries are evicted least
+    recently used first once the cache grows beyond `max_bytes`.
+
+    Attributes:
+        enabled (bool): Whether the cache is used. When False,
+            `fetch` always rebuilds the DataFrame and stores nothing.
+        _directory (Path): The directory holding the cache entries.
+        _max_bytes (int): The maximum total size of the entries.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path | None = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        *,
+        enabled: bool = True,
+    ):
+        """__init__ method.
+
+        Constructs all the necessary attributes for the portfolio
+        cache object.
+
+        Args:
+            directory (str | Path | None): The directory holding the
+                cache entries. Defaults to '~/.cache/portfoliomanager'.
+            max_bytes (int): The maximum total size of the entries.
+                Defaults to 256 MiB.
+            enabled (bool): Whether the cache is used.
+                Defaults to True.
+        """
+        if directory is None:
+            directory = Path.home() / '.cache' / 'portfoliomanager'
+
+        self._directory = Path(directory)
+        self._max_bytes = max_bytes
+        self.enabled = enabled
+
+    @property
+    def directory(self) -> Path:
+        """Returns the directory holding the cache entries."""
+        return self._directory
+
+    @staticmethod
+    def fingerprint(file: str | Path, namespace: str) -> str:
+        """Computes the cache key of an input file.
+
+        Args:
+            file (str | Path): The input file.
+            namespace (str): Distinguishes entries built from the same
+                file by different cleaning processes.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+
+        Returns:
+            str: The cache key.
+        """
+        path = Path(file).resolve()
+        stat = path.stat()
+
+        content = hashlib.blake2b()
+        with path.open('rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                content.update(chunk)
+
+        key = (
+            f'{CACHE_FORMAT_VERSION}|{namespace}|{path}|{stat.st_size}|'
+            f'{stat.st_mtime_ns}|{content.hexdigest()}'
+        )
+        return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+    def fetch(
+        self, file: str | Path, namespace: str, build: Callable[[], pd.DataFrame]
+    ) -> pd.DataFrame:
+        """Returns the cached DataFrame of a file or builds it.
+
+        Args:
+            file (str | Path): The input file.
+            namespace (str): Distinguishes entries built from the same
+                file by different cleaning processes.
+            build (Callable[[], DataFrame]): Builds the DataFrame from
+                the input file on a cache miss.
+
+        Returns:
+            DataFrame: The cached or freshly built DataFrame.
+        """
+        if not self.enabled:
+            return build()
+
+        try:
+            key = self.fingerprint(file, namespace)
+        except OSError:
+            return build()
+
+        cached = self._load(key)
+        if cached is not None:
+            return cached
+
+        df = build()
+        self._store(key, df)
+        return df
+
+    def clear(self) -> None:
+        """Removes every entry from the cache."""
+        for entry in self._entries():
+            entry.unlink(missing_ok=True)
+
+    def _entries(self) -> list[Path]:
+        """Lists the cache entries.
+
+        Returns:
+            list[Path]: The paths of the cache entries.
+        """
+        if not self._directory.is_dir():
+            return []
+
+        return list(self._directory.glob('*.npz'))
+
+    def _load(self, key: str) -> pd.DataFrame | None:
+        """Loads a cache entry.
+
+        A corrupted entry is removed and treated as a miss.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            DataFrame | None: The cached DataFrame, or None on a miss.
+        """
+        path = self._directory / f'{key}.npz'
+
+        try:
+            with np.load(path, allow_pickle=False) as archive:
+                df = decode_frame({name: archive[name] for name in archive.files})
+        except FileNotFoundError:
+            return None
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            with contextlib.suppress(OSError):
+                path.unlink(missing_ok=True)
+            return None
+
+        with contextlib.suppress(OSError):
+            os.utime(path)
+
+        return df
+
+    def _store(self, key: str, df: pd.DataFrame) -> None:
+        """Stores a DataFrame in the cache and evicts old entries.
+
+        DataFrames with columns that can't be stored as plain arrays,
+        such as object columns mixing strings and numbers, are not
+        cached, and neither are they when the cache directory can't be
+        written, e.g. because it is read-only or full.
+
+        Args:
+            key (str): The cache key.
+            df (DataFrame): The DataFrame to store.
+        """
+        arrays = encode_frame(df)
+        if arrays is None:
+            return
+
+        tmp = None
+
+        try:
+            self._directory.mkdir(parents=True, exist_ok=True)
+            # A unique temporary file per writer, so that concurrent
+            # threads and processes storing the same key don't collide.
+            with tempfile.NamedTemporaryFile(
+                dir=self._directory, suffix='.tmp', delete=False
+            ) as f:
+                tmp = Path(f.name)
+                np.savez(f, **arrays)
+            tmp.replace(self._directory / f'{key}.npz')
+            self._evict()
+        except OSError:
+            if tmp is not None:
+                with contextlib.suppress(OSError):
+                    tmp.unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        """Removes the least recently used entries above `max_bytes`."""
+        entries = []
+        for entry in self._entries():
+            with contextlib.suppress(FileNotFoundError):
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda e: e[0]):
+            if total <= self._max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            total -= size
+
+
+def _encode_values(values: pd.Index | pd.Series) -> tuple[str, list[np.ndarray]] | None:
+    """Encodes a column or index as plain NumPy arrays.
+
+    Args:
+        values (Index | Series): The values to encode.
+
+    Returns:
+        tuple[str, list[ndarray]] | None: The kind of the values and
+            their arrays, or None if they can't be encoded.
+    """
+    if values.dtype != object:
+        array = values.to_numpy()
+        if array.dtype.hasobject:
+            return None
+        return 'plain', [array]
+
+    mask = np.asarray(pd.isna(values))
+    strings = values[~mask]
+    if not all(isinstance(value, str) for value in strings):
+        return None
+
+    array = np.asarray(values, dtype=object).copy()
+    array[mask] = ''
+    return 'string', [array.astype(str), np.asarray(mask)]
+
+
+def encode_frame(df: pd.DataFrame) -> dict[str, np.ndarray] | None:
+    """Encodes a DataFrame as a mapping of plain NumPy arrays.
+
+    Args:
+        df (DataFrame): The DataFrame to encode.
+
+    Returns:
+        dict[str, ndarray] | None: The arrays, or None if the
+            DataFrame can't be encoded.
+    """
+    arrays = {}
+    kinds = []
+
+    for position, values in enumerate([df.index, *(df[col] for col in df.columns)]):
+        encoded = _encode_values(values)
+        if encoded is None:
+            return None
+
+        kind, parts = encoded
+        kinds.append(kind)
+        for part_position, part in enumerate(parts):
+            arrays[f'{position}_{part_position}'] = part
+
+    meta = {'index': df.index.name, 'columns': list(df.columns), 'kinds': kinds}
+    arrays['meta'] = np.array(json.dumps(meta))
+    return arrays
+
+
+def decode_frame(arrays: dict[str, np.ndarray]) -> pd.DataFrame:
+    """Decodes a DataFrame from the arrays built by `encode_frame`.
+
+    Args:
+        arrays (dict[str, ndarray]): The arrays to decode.
+
+    Returns:
+        DataFrame: The decoded DataFrame.
+    """
+    meta = json.loads(str(arrays['meta']))
+    decoded = []
+
+    for position, kind in enumerate(meta['kinds']):
+        values = arrays[f'{position}_0']
+        if kind == 'string':
+            values = values.astype(object)
+            values[arrays[f'{position}_1']] = np.nan
+        decoded.append(values)
+
+    index, *columns = decoded
+    return pd.DataFrame(
+        dict(zip(meta['columns'], columns, strict=True)),
+        index=pd.Index(index, name=meta['index']),
+    )
@@ -0,0 +1,219 @@
+from collections.abc import Sequence
+from itertools import pairwise
+
+import numpy as np
+import pandas as pd
+
+from portfoliomanager import metrics
+from portfoliomanager.fx import FxRates
+from portfoliomanager.portfolio import Portfolio
+
+
+class ConsolidatedPortfolio(Portfolio):
+    """Many accounts summed and compared with one target allocation.
+
+    The union of the ISINs of every account is built once; each
+    holding is mapped onto it by integer position and the amounts and
+    values are summed with one `bincount` each, instead of chaining
+    outer merges. The result behaves like any other portfolio: it has
+    a `summary` and can be rebalanced with `PortfolioManager`.
+
+    Attributes:
+        _accounts (tuple[Portfolio, ...]): The consolidated accounts.
+        _codes (ndarray): The position of every holding of every
+            account in the consolidated assets.
+        _indptr (ndarray): The boundaries of each account inside
+            `_codes`.
+        _shares (ndarray): The share of every holding in the value of
+            its consolidated asset.
+        _isins (Index): The consolidated assets `_codes` point to.
+    """
+
+    def __init__(
+        self,
+        accounts: Sequence[Portfolio],
+        allocation_file: str = 'allocation.csv',
+        currency: str | None = None,
+        *,
+        fx: FxRates | None = None,
+    ):
+        """__init__ method.
+
+        Constructs all the necessary attributes for the consolidated
+        portfolio object.
+
+        Args:
+            accounts (Sequence[Portfolio]): The accounts to consolidate.
+            allocation_file (str): The file name of the target
+                allocation csv. Defaults to 'allocation.csv'.
+            currency (str | None): The currency of the consolidated
+                portfolio. Defaults to None, the currency of the first
+                account.
+            fx (FxRates | None): The exchange rates used to convert the
+                accounts held in another currency. Defaults to None.
+
+        Raises:
+            ValueError: If no account is given, or the accounts are in
+                several currencies and no exchange rates are given.
+        """
+        label = f'consolidated:{allocation_file}'
+
+        with metrics.portfolio_label(label):
+            allocation = self.__class__._read_allocation(allocation_file)  # noqa: SLF001
+        self._consolidate(accounts, allocation, currency, fx, label)
+
+    @classmethod
+    def from_frames(
+        cls,
+        accounts: Sequence[Portfolio],
+        allocation: pd.DataFrame,
+        currency: str | None = None,
+        *,
+        fx: FxRates | None = None,
+    ) -> 'ConsolidatedPortfolio':
+        """Consolidates accounts against an allocation DataFrame.
+
+        Args:
+            accounts (Sequence[Portfolio]): The accounts to consolidate.
+            allocation (DataFrame): The target allocation, indexed by
+                ISIN, with an 'Expected Percentage' column.
+            currency (str | None): The currency of the consolidated
+                portfolio. Defaults to None, the currency of the first
+                account.
+            fx (FxRates | None): The exchange rates used to convert the
+                accounts held in another currency. Defaults to None.
+
+        Raises:
+            ValueError: If no account is given, the accounts are in
+                several currencies and no exchange rates are given, or
+                the allocation doesn't sum to 100.
+
+        Returns:
+            ConsolidatedPortfolio: The consolidated portfolio.
+        """
+        Portfolio._validate_allocation(allocation)  # noqa: SLF001
+
+        consolidated = cls.__new__(cls)
+        consolidated._consolidate(accounts, allocation, currency, fx, 'consolidated')  # noqa: SLF001
+        return consolidated
+
+    @property
+    def accounts(self) -> tuple[Portfolio, ...]:
+        """Returns the consolidated accounts."""
+        return self._accounts
+
+    def account_values(self) -> pd.DataFrame:
+        """Returns the value of every asset in every account.
+
+        Every holding keeps its share of the current value of its
+        consolidated asset, so the values follow `update_prices`,
+        `update_positions`, `refresh_closing` and currency changes of
+        the consolidated portfolio, and always sum to its values.
+
+        Returns:
+            DataFrame: The values in the consolidated currency,
+                ISINs x account positions, 0 where an account doesn't
+                hold an asset.
+        """
+        current = self._as['Current Value'].reindex(self._isins, fill_value=0)
+        holdings = current.to_numpy(dtype=float)[self._codes] * self._shares
+
+        values = np.zeros((len(self._isins), len(self._accounts)))
+        for account, (start, stop) in enumerate(pairwise(self._indptr)):
+            values[self._codes[start:stop], account] = holdings[start:stop]
+
+        return pd.DataFrame(values, index=self._isins, columns=range(len(self._accounts)))
+
+    def _consolidate(
+        self,
+        accounts: Sequence[Portfolio],
+        allocation: pd.DataFrame,
+        currency: str | None,
+        fx: FxRates | None,
+        label: str,
+    ) -> None:
+        """Sums the holdings of the accounts.
+
+        The consolidated assets have no 'Local Value' column, since an
+        asset can be held in several accounts.
+
+        Args:
+            accounts (Sequence[Portfolio]): The accounts to consolidate.
+            allocation (DataFrame): The target allocation.
+            currency (str | None): The consolidated currency.
+            fx (FxRates | None): The exchange rates.
+            label (str): The label of the portfolio in stage metrics.
+
+        Raises:
+            ValueError: If no account is given, or the accounts are in
+                several currencies and no exchange rates are given.
+        """
+        if not accounts:
+            msg = 'At least one account is required to build a consolidated portfolio.'
+            raise ValueError(msg)
+
+        self._accounts = tuple(accounts)
+        currency = currency or self._accounts[0].currency
+
+        assets = [account._as for account in self._accounts]  # noqa: SLF001
+        lengths = [len(a) for a in assets]
+        self._indptr = np.concatenate([[0], np.cumsum(lengths)])
+
+        isins = np.concatenate([a.index.to_numpy(dtype=object) for a in assets])
+        index = pd.Index(isins, name='ISIN').unique()
+        self._codes = index.get_indexer(isins)
+
+        rates = np.repeat(
+            [self._rate(account.currency, currency, fx) for account in self._accounts], lengths
+        )
+        values = np.concatenate([a['Current Value'].to_numpy(dtype=float) for a in assets]) * rates
+        amounts = np.concatenate([a['Amount'].to_numpy(dtype=float) for a in assets])
+
+        # The first holding of every consolidated asset, in index order.
+        _, first = np.unique(self._codes, return_index=True)
+
+        assets = pd.DataFrame(
+            {
+                'Product': np.concatenate([a['Product'].to_numpy(dtype=object) for a in assets])[
+                    first
+                ],
+                'Amount': np.bincount(self._codes, weights=amounts, minlength=len(index)),
+                'Closing': np.concatenate([a['Closing'].to_numpy(dtype=float) for a in assets])[
+                    first
+                ],
+                'Current Value': np.bincount(self._codes, weights=values, minlength=len(index)),
+            },
+            index=index,
+        )
+        totals = assets['Current Value'].to_numpy()[self._codes]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self._shares = np.where(totals != 0, values / totals, 0)
+        self._isins = index
+        self._init_frames(assets, allocation, currency, fx=fx, label=label)
+
+    @staticmethod
+    def _rate(currency: str, target: str, fx: FxRates | None) -> float:
+        """Returns the rate converting an account to the portfolio.
+
+        Args:
+            currency (str): The currency of the account.
+            target (str): The currency of the portfolio.
+            fx (FxRates | None): The exchange rates.
+
+        Raises:
+            ValueError: If the currencies differ and there are no
+                exchange rates.
+
+        Returns:
+            float: The exchange rate.
+        """
+        if currency == target:
+            return 1.0
+
+        if fx is None:
+            msg = (
+                f'Exchange rates are required to consolidate accounts in {currency} into {target}.'
+            )
+            raise ValueError(msg)
+
+        return fx.rate(currency, target)
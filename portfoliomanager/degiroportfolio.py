@@ -1,13 +1,17 @@
 import pandas as pd
 
+from portfoliomanager import metrics
 from portfoliomanager.portfolio import Portfolio
 
+DEGIRO_COLUMNS = ('Product', 'ISIN', 'Amount', 'Closing', 'Local Value', 'Current Value')
+
 
 class DegiroPortfolio(Portfolio):
     """A subclass of Portfolio that represents a Degiro portfolio."""
 
     @staticmethod
-    def _replace_columns(assets: pd.DataFrame) -> pd.DataFrame:
+    @metrics.stage('replace_columns')
+    def _replace_columns(assets: pd.DataFrame, *, local_value: bool = True) -> pd.DataFrame:
         """Replaces the column names in a DataFrame.
 
         The columns are renamed to: 'Product', 'ISIN', 'Amount',
@@ -15,6 +19,8 @@ class DegiroPortfolio(Portfolio):
 
         Args:
             assets (DataFrame): The DataFrame to process.
+            local_value (bool): Whether the DataFrame has the 'Local
+                Value' column. Defaults to True.
 
         Raises:
             ValueError: If the DataFrame doesn't have the
@@ -24,14 +30,7 @@ class DegiroPortfolio(Portfolio):
             DataFrame: The processed DataFrame.
         """
         try:
-            columns = (
-                'Product',
-                'ISIN',
-                'Amount',
-                'Closing',
-                'Local Value',
-                'Current Value',
-            )
+            columns = tuple(c for c in DEGIRO_COLUMNS if local_value or c != 'Local Value')
             assets.columns = pd.Index(columns)
         except ValueError:
             msg = (
@@ -43,9 +42,15 @@ class DegiroPortfolio(Portfolio):
         return assets
 
     @staticmethod
+    @metrics.stage('convert_str_columns_to_float')
     def _convert_str_columns_to_float(assets: pd.DataFrame) -> pd.DataFrame:
         """Converts the 'Current Value' and 'Closing' columns to float.
 
+        Columns that are already numeric are left untouched. Any other
+        column, including one mixing strings and numbers, has its
+        decimal commas replaced with vectorized string operations
+        before being cast to float.
+
         Args:
             assets (DataFrame): The DataFrame to process.
 
@@ -56,17 +61,84 @@ class DegiroPortfolio(Portfolio):
             DataFrame: The processed DataFrame.
         """
         for col in ('Current Value', 'Closing'):
-            if all(assets[col].apply(lambda x: isinstance(x, str))):
-                try:
-                    assets[col] = assets[col].apply(lambda x: x.replace(',', '.')).astype('float')
-                except ValueError:
-                    msg = f'Failed to convert column {col} to float. Check for non-numeric values.'
-                    raise ValueError(msg) from None
+            if pd.api.types.is_numeric_dtype(assets[col]):
+                continue
+
+            try:
+                assets[col] = (
+                    assets[col].astype(str).str.replace(',', '.', regex=False).astype('float')
+                )
+            except ValueError:
+                msg = f'Failed to convert column {col} to float. Check for non-numeric values.'
+                raise ValueError(msg) from None
 
         return assets
 
     @staticmethod
-    def _clean_portfolio(assets: pd.DataFrame) -> pd.DataFrame:
+    def _parse_local_values(local_values: pd.Series) -> pd.DataFrame:
+        """Splits the 'Local Value' column into currency and amount.
+
+        Degiro exports local values as a currency code followed by the
+        amount, e.g. 'USD 25000.00'.
+
+        Args:
+            local_values (Series): The 'Local Value' column.
+
+        Raises:
+            ValueError: If a value can't be split into a currency and
+                an amount.
+
+        Returns:
+            DataFrame: The 'Local Currency' and 'Local Value' columns.
+        """
+        parts = local_values.astype(str).str.strip().str.split(' ', n=1, expand=True)
+
+        msg = 'Failed to parse column Local Value. Expected values such as "USD 25000.00".'
+        try:
+            amounts = parts[1].str.replace(',', '.', regex=False).astype('float')
+        except (KeyError, ValueError):
+            raise ValueError(msg) from None
+
+        if (amounts.isna() & local_values.notna()).any():
+            raise ValueError(msg)
+
+        return pd.DataFrame({'Local Currency': parts[0], 'Local Value': amounts})
+
+    @staticmethod
+    def _format_local_values(local_values: pd.DataFrame) -> pd.Series:
+        """Joins currencies and amounts into Degiro local values.
+
+        Args:
+            local_values (DataFrame): The 'Local Currency' and 'Local
+                Value' columns, as returned by `_parse_local_values`.
+
+        Returns:
+            Series: The local values, e.g. 'USD 25000.00'.
+        """
+        return (
+            local_values['Local Currency'] + ' ' + local_values['Local Value'].map('{:.2f}'.format)
+        )
+
+    @staticmethod
+    def _compact_usecols(header: pd.Index) -> list[int] | None:
+        """Returns the positions of every column but 'Local Value'.
+
+        Args:
+            header (Index): The column names of the portfolio csv.
+
+        Returns:
+            list[int] | None: The positions to parse, None if the csv
+                doesn't have the Degiro columns, so that every column
+                is parsed and `_replace_columns` reports the mismatch.
+        """
+        if len(header) != len(DEGIRO_COLUMNS):
+            return None
+
+        skipped = DEGIRO_COLUMNS.index('Local Value')
+        return [position for position in range(len(header)) if position != skipped]
+
+    @staticmethod
+    def _clean_portfolio(assets: pd.DataFrame, *, local_value: bool = True) -> pd.DataFrame:
         """Cleans a portfolio DataFrame.
 
         The cleaning process includes replacing column names,
@@ -75,11 +147,13 @@ class DegiroPortfolio(Portfolio):
 
         Args:
             assets (DataFrame): The DataFrame to clean.
+            local_value (bool): Whether the DataFrame has the 'Local
+                Value' column. Defaults to True.
 
         Returns:
             DataFrame: The cleaned DataFrame.
         """
-        assets = DegiroPortfolio._replace_columns(assets)
+        assets = DegiroPortfolio._replace_columns(assets, local_value=local_value)
         assets = DegiroPortfolio._dropna_isin(assets)
         assets = DegiroPortfolio._set_index_isin(assets)
         return DegiroPortfolio._convert_str_columns_to_float(assets)
@@ -0,0 +1,133 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from portfoliomanager.batch import BatchPortfolioManager
+
+Band = float | pd.Series | None
+
+
+@dataclass(frozen=True)
+class DriftReport:
+    """The accounts and assets outside their drift bands.
+
+    Attributes:
+        accounts (list[int]): The positions of the accounts with at
+            least one breach, in the batch.
+        breaches (DataFrame): The 'Current Percentage', 'Expected
+            Percentage' and 'Drift' of every asset outside its band,
+            indexed by account position and ISIN.
+        total_drift (ndarray): The drift of every account, half the
+            sum of the absolute drifts of its assets: the percentage
+            of the portfolio a sell rebalance would trade.
+    """
+
+    accounts: list[int]
+    breaches: pd.DataFrame
+    total_drift: np.ndarray
+
+
+class DriftMonitor:
+    """Screens many accounts for drift from their allocation.
+
+    The bands are checked on the accounts x ISIN matrices of a batch,
+    so screening every account costs a few array operations, and only
+    the accounts that breach a band need to be rebalanced.
+
+    An asset breaches when its drift, the current minus the expected
+    percentage, exceeds the absolute band in percentage points, or
+    exceeds the relative band as a fraction of the expected
+    percentage. An account breaches when one of its assets does, or
+    when its total drift exceeds the total band.
+
+    Attributes:
+        _absolute (float | Series | None): The absolute band.
+        _relative (float | Series | None): The relative band.
+        _total (float | None): The total band of every account.
+    """
+
+    def __init__(
+        self, *, absolute: Band = None, relative: Band = None, total: float | None = None
+    ):
+        """__init__ method.
+
+        Constructs all the necessary attributes for the drift monitor
+        object.
+
+        Args:
+            absolute (float | Series | None): The absolute band, in
+                percentage points, for every asset or per ISIN.
+                Defaults to None, no absolute band.
+            relative (float | Series | None): The relative band, as a
+                fraction of the expected percentage, for every asset
+                or per ISIN. Defaults to None, no relative band.
+            total (float | None): The total band of every account, in
+                percentage points. Defaults to None, no total band.
+
+        Raises:
+            ValueError: If no band is given.
+        """
+        if absolute is None and relative is None and total is None:
+            msg = 'At least one drift band is required.'
+            raise ValueError(msg)
+
+        self._absolute = absolute
+        self._relative = relative
+        self._total = total
+
+    def screen(self, batch: BatchPortfolioManager) -> DriftReport:
+        """Finds the accounts and assets outside their bands.
+
+        Args:
+            batch (BatchPortfolioManager): The accounts to screen.
+
+        Returns:
+            DriftReport: The breaching accounts and assets.
+        """
+        current = batch.current_percentages
+        expected = batch.expected_percentages
+        drift = current - expected
+        magnitude = np.abs(drift)
+
+        breached = np.zeros(drift.shape, dtype=bool)
+        if self._absolute is not None:
+            breached |= magnitude > _band(self._absolute, batch.isins)
+        if self._relative is not None:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                relative = np.where(magnitude > 0, magnitude / expected, 0)
+            breached |= relative > _band(self._relative, batch.isins)
+
+        total_drift = np.round(magnitude.sum(axis=1) / 2, 2)
+        accounts = breached.any(axis=1)
+        if self._total is not None:
+            accounts |= total_drift > self._total
+
+        rows, cols = np.nonzero(breached)
+        breaches = pd.DataFrame(
+            {
+                'Current Percentage': current[rows, cols],
+                'Expected Percentage': expected[rows, cols],
+                'Drift': np.round(drift[rows, cols], 2),
+            },
+            index=pd.MultiIndex.from_arrays([rows, batch.isins[cols]], names=['Account', 'ISIN']),
+        )
+
+        return DriftReport(np.flatnonzero(accounts).tolist(), breaches, total_drift)
+
+
+def _band(band: float | pd.Series, isins: pd.Index) -> float | np.ndarray:
+    """Aligns a band on the ISINs of a batch.
+
+    Args:
+        band (float | Series): One band, or a band per ISIN.
+        isins (Index): The ISINs of the batch.
+
+    Returns:
+        float | ndarray: The band, or the band of every ISIN, infinite
+            for the ISINs without one.
+    """
+    if isinstance(band, pd.Series):
+        return band.reindex(isins).fillna(np.inf).to_numpy(dtype=float)
+
+    return band
@@ -0,0 +1,114 @@
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+FULL_PERCENTAGE = 100
+DEFAULT_TOLERANCE = 1.0
+
+
+@dataclass(frozen=True)
+class FeeSchedule:
+    """The cost of one trade on an exchange.
+
+    Attributes:
+        fixed (float): The fixed cost of every trade, in the currency
+            of the portfolio.
+        percentage (float): The cost proportional to the value traded,
+            in percent, e.g. 0.05 for 5 basis points.
+    """
+
+    fixed: float = 0.0
+    percentage: float = 0.0
+
+    def __post_init__(self) -> None:
+        """Validates the fees.
+
+        Raises:
+            ValueError: If a fee is negative, or the percentage is 100
+                or more.
+        """
+        if self.fixed < 0 or not 0 <= self.percentage < FULL_PERCENTAGE:
+            msg = (
+                'The fixed fee must not be negative and the percentage fee '
+                f'must be in [0, 100), got {self.fixed} and {self.percentage}.'
+            )
+            raise ValueError(msg)
+
+    def cost(self, trades: np.ndarray) -> np.ndarray:
+        """Calculates the cost of trades.
+
+        Args:
+            trades (ndarray): The values to buy (positive) or sell
+                (negative).
+
+        Returns:
+            ndarray: The cost of every trade, 0 where nothing is traded.
+        """
+        trades = np.asarray(trades, dtype=float)
+        return np.where(trades != 0, self.fixed + np.abs(trades) * self.percentage / 100, 0)
+
+
+def exchange_fees(
+    fees: FeeSchedule | Mapping[str, FeeSchedule],
+    isins: pd.Index,
+    exchanges: pd.Series | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Looks up the fee schedule of every ISIN.
+
+    Args:
+        fees (FeeSchedule | Mapping[str, FeeSchedule]): One schedule for
+            every exchange, or the schedule of each exchange.
+        isins (Index): The ISINs.
+        exchanges (Series | None): The exchange of each ISIN, required
+            with a schedule per exchange. Defaults to None.
+
+    Raises:
+        ValueError: If there is a schedule per exchange and an ISIN has
+            no exchange, or an exchange has no fee schedule.
+
+    Returns:
+        tuple[ndarray, ndarray]: The fixed fee and the percentage fee,
+            as a fraction, of every ISIN.
+    """
+    if isinstance(fees, FeeSchedule):
+        return np.full(len(isins), fees.fixed), np.full(len(isins), fees.percentage / 100)
+
+    if exchanges is None:
+        msg = 'A fee schedule per exchange needs the exchange of every ISIN.'
+        raise ValueError(msg)
+
+    keys = exchanges.reindex(isins)
+    if keys.isna().any():
+        msg = f'The ISINs {list(isins[keys.isna().to_numpy()])} have no exchange.'
+        raise ValueError(msg)
+    keys = pd.Index(keys.to_numpy())
+
+    missing = keys.difference(pd.Index(list(fees)))
+    if len(missing):
+        msg = f'The exchanges {list(missing)} have no fee schedule.'
+        raise ValueError(msg)
+
+    schedules = [fees[key] for key in keys]
+    return (
+        np.array([schedule.fixed for schedule in schedules], dtype=float),
+        np.array([schedule.percentage / 100 for schedule in schedules], dtype=float),
+    )
+
+
+def trade_fees(trades: np.ndarray, fixed: np.ndarray, rates: np.ndarray) -> np.ndarray:
+    """Calculates the fee of every trade.
+
+    Args:
+        trades (ndarray): The values to buy (positive) or sell
+            (negative), accounts x assets.
+        fixed (ndarray): The fixed fee of every asset.
+        rates (ndarray): The percentage fee of every asset, as a
+            fraction.
+
+    Returns:
+        ndarray: The fees, accounts x assets, rounded to the cent, 0
+            where nothing is traded.
+    """
+    return np.round(np.where(trades != 0, fixed + np.abs(trades) * rates, 0), 2)
@@ -0,0 +1,140 @@
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class FxRates:
+    """A dense matrix of exchange rates between many currencies.
+
+    The rates are given against a single base currency and the full
+    currencies x currencies matrix is triangulated through it once,
+    when the object is built. A single `FxRates` can then be shared by
+    any number of portfolios, and converting a column of values is one
+    indexed lookup and one vectorized multiply.
+
+    Attributes:
+        _base (str): The base currency.
+        _currencies (Index): The currencies, in matrix order.
+        _matrix (ndarray): The rate from each currency (rows) to each
+            currency (columns): an amount in currency i times
+            `_matrix[i, j]` is the same amount in currency j.
+    """
+
+    def __init__(self, rates: Mapping[str, float], base: str = 'EUR'):
+        """__init__ method.
+
+        Constructs all the necessary attributes for the FX rates
+        object.
+
+        Args:
+            rates (Mapping[str, float]): The value of one unit of each
+                currency in the base currency, e.g. {'USD': 0.87} for
+                a EUR base.
+            base (str): The base currency. Defaults to 'EUR'.
+
+        Raises:
+            ValueError: If a rate is not positive.
+        """
+        values = {base: 1.0, **{currency: float(rate) for currency, rate in rates.items()}}
+
+        if not all(rate > 0 for rate in values.values()):
+            msg = 'Every exchange rate must be positive.'
+            raise ValueError(msg)
+
+        self._base = base
+        self._currencies = pd.Index(list(values), name='Currency')
+        to_base = np.fromiter(values.values(), dtype=float, count=len(values))
+        self._matrix = to_base[:, np.newaxis] / to_base[np.newaxis, :]
+
+    @classmethod
+    def from_quotes(cls, quotes: Mapping[str, float], base: str = 'EUR') -> 'FxRates':
+        """Builds the rates from market quotes against the base.
+
+        Args:
+            quotes (Mapping[str, float]): The units of each currency
+                bought by one unit of the base currency, e.g.
+                {'USD': 1.08} for EURUSD.
+            base (str): The base currency. Defaults to 'EUR'.
+
+        Returns:
+            FxRates: The exchange rates.
+        """
+        return cls({currency: 1 / quote for currency, quote in quotes.items()}, base)
+
+    @property
+    def base(self) -> str:
+        """Returns the base currency."""
+        return self._base
+
+    @property
+    def currencies(self) -> pd.Index:
+        """Returns the currencies of the matrix."""
+        return self._currencies
+
+    @property
+    def matrix(self) -> pd.DataFrame:
+        """Returns the rates from each currency (rows) to each other."""
+        return pd.DataFrame(self._matrix, index=self._currencies, columns=self._currencies)
+
+    def rate(self, source: str, target: str) -> float:
+        """Returns the rate converting `source` amounts to `target`.
+
+        Args:
+            source (str): The currency to convert from.
+            target (str): The currency to convert to.
+
+        Raises:
+            ValueError: If a currency is unknown.
+
+        Returns:
+            float: The exchange rate.
+        """
+        return float(self.rates_to([source], target)[0])
+
+    def rates_to(self, sources: Sequence[str] | pd.Series, target: str) -> np.ndarray:
+        """Returns the rates converting many currencies to one.
+
+        Args:
+            sources (Sequence[str] | Series): The currency of every
+                amount to convert.
+            target (str): The currency to convert to.
+
+        Raises:
+            ValueError: If a currency is unknown.
+
+        Returns:
+            ndarray: The exchange rate of every source currency.
+        """
+        rows = self._currencies.get_indexer(sources)
+        column = self._currencies.get_indexer([target])[0]
+
+        if column < 0 or (rows < 0).any():
+            requested = {*np.asarray(sources, dtype=object)[rows < 0], target}
+            unknown = sorted(requested - {*self._currencies})
+            msg = f'No exchange rate available for the currencies {unknown}.'
+            raise ValueError(msg)
+
+        return self._matrix[rows, column]
+
+    def convert(
+        self, values: pd.Series, sources: str | Sequence[str] | pd.Series, target: str
+    ) -> pd.Series:
+        """Converts a column of amounts to one currency.
+
+        Args:
+            values (Series): The amounts to convert.
+            sources (str | Sequence[str] | Series): The currency of all
+                the amounts, or of each one.
+            target (str): The currency to convert to.
+
+        Raises:
+            ValueError: If a currency is unknown.
+
+        Returns:
+            Series: The amounts in the target currency.
+        """
+        if isinstance(sources, str):
+            return values * self.rate(sources, target)
+
+        return values * self.rates_to(sources, target)
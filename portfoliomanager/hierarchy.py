@@ -0,0 +1,225 @@
+from collections.abc import Sequence
+
+import numpy as np
+import pandas as pd
+
+from portfoliomanager.portfolio import Portfolio
+
+DEFAULT_LEVELS = ('Asset Class', 'Region')
+UNALLOCATED = 'Unallocated'
+
+
+class AllocationTree:
+    """A hierarchical allocation, e.g. asset class -> region -> ISIN.
+
+    The tree is compiled once into one array of group codes per level,
+    aligned on the ISINs of the allocation, so the rollup of the
+    current and expected weights of a portfolio at any level is one
+    `bincount` on precomputed codes, and no groupby object is built
+    per query.
+
+    Attributes:
+        _levels (tuple[str, ...]): The levels, from the root to the
+            ISINs, e.g. ('Asset Class', 'Region', 'ISIN').
+        _isins (Index): The allocated ISINs.
+        _allocation (DataFrame): The allocation, indexed by ISIN.
+        _codes (dict[str, ndarray]): The group of every ISIN at each
+            level.
+        _labels (dict[str, MultiIndex]): The groups of each level.
+        _expected (dict[str, ndarray]): The expected percentage of
+            every group of each level.
+    """
+
+    def __init__(self, allocation: pd.DataFrame, levels: Sequence[str] = DEFAULT_LEVELS):
+        """__init__ method.
+
+        Constructs all the necessary attributes for the allocation
+        tree object.
+
+        Args:
+            allocation (DataFrame): The allocation, indexed by ISIN,
+                with one column per level and an 'Expected Percentage'
+                column.
+            levels (Sequence[str]): The columns of the levels above
+                the ISINs, from the root. Defaults to ('Asset Class',
+                'Region').
+
+        Raises:
+            ValueError: If a level column is missing, or the sum of the
+                'Expected Percentage' column is not 100.
+        """
+        missing = [level for level in levels if level not in allocation.columns]
+        if missing:
+            msg = f'The allocation has no column for the levels {missing}.'
+            raise ValueError(msg)
+
+        Portfolio._validate_allocation(allocation)  # noqa: SLF001
+
+        self._levels = (*levels, 'ISIN')
+        self._isins = allocation.index
+        self._allocation = allocation[[*levels, 'Expected Percentage']]
+        expected = allocation['Expected Percentage'].to_numpy(dtype=float)
+
+        self._codes = {}
+        self._labels = {}
+        self._expected = {}
+        paths = allocation[list(levels)].astype(str).assign(ISIN=allocation.index)
+        for depth, level in enumerate(self._levels, start=1):
+            codes, labels = pd.factorize(pd.MultiIndex.from_frame(paths.iloc[:, :depth]))
+            self._codes[level] = codes
+            self._labels[level] = labels.set_names(self._levels[:depth])
+            self._expected[level] = np.bincount(codes, weights=expected, minlength=len(labels))
+
+    @classmethod
+    def from_csv(
+        cls, allocation_file: str, levels: Sequence[str] = DEFAULT_LEVELS
+    ) -> 'AllocationTree':
+        """Reads a hierarchical allocation csv.
+
+        Args:
+            allocation_file (str): The file name of the allocation csv,
+                with an 'ISIN' column, one column per level and an
+                'Expected Percentage' column.
+            levels (Sequence[str]): The columns of the levels above
+                the ISINs, from the root. Defaults to ('Asset Class',
+                'Region').
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+            ValueError: If a level column is missing, or the sum of the
+                'Expected Percentage' column is not 100.
+
+        Returns:
+            AllocationTree: The compiled allocation.
+        """
+        allocation = Portfolio._read_file(allocation_file)  # noqa: SLF001
+        return cls(Portfolio._set_index_isin(allocation), levels)  # noqa: SLF001
+
+    @property
+    def levels(self) -> tuple[str, ...]:
+        """Returns the levels, from the root to the ISINs."""
+        return self._levels
+
+    @property
+    def allocation(self) -> pd.DataFrame:
+        """Returns the flat allocation, indexed by ISIN."""
+        return self._allocation[['Expected Percentage']].copy()
+
+    def expected(self, level: str) -> pd.Series:
+        """Returns the expected percentage of every group of a level.
+
+        Args:
+            level (str): The level.
+
+        Raises:
+            ValueError: If the level is unknown.
+
+        Returns:
+            Series: The expected percentages, indexed by group.
+        """
+        self._check_level(level)
+        return pd.Series(
+            self._expected[level], index=self._labels[level], name='Expected Percentage'
+        )
+
+    def rollup(self, portfolio: Portfolio, level: str) -> pd.DataFrame:
+        """Sums the current and expected weights at a level.
+
+        Assets held by the portfolio but not in the tree are grouped
+        under 'Unallocated' with an expected percentage of 0.
+
+        Args:
+            portfolio (Portfolio): The portfolio.
+            level (str): The level.
+
+        Raises:
+            ValueError: If the level is unknown.
+
+        Returns:
+            DataFrame: A DataFrame shaped like `Portfolio.summary`,
+                indexed by group.
+        """
+        self._check_level(level)
+
+        assets = portfolio._as  # noqa: SLF001
+        values = assets['Current Value'].to_numpy(dtype=float)
+        positions = self._isins.get_indexer(assets.index)
+        held = positions >= 0
+
+        groups = len(self._labels[level])
+        codes = np.empty(len(positions), dtype=np.intp)
+        codes[held] = self._codes[level][positions[held]]
+
+        labels = self._labels[level]
+        if not held.all():
+            if level == 'ISIN':
+                codes[~held] = groups + np.arange((~held).sum())
+                extra = [
+                    (*[UNALLOCATED] * (len(self._levels) - 1), isin)
+                    for isin in assets.index[~held]
+                ]
+            else:
+                codes[~held] = groups
+                extra = [(UNALLOCATED,) * labels.nlevels]
+            labels = labels.append(pd.MultiIndex.from_tuples(extra, names=labels.names))
+
+        current = np.bincount(codes, weights=values, minlength=len(labels))
+        expected = np.zeros(len(labels))
+        expected[:groups] = self._expected[level]
+
+        if level == 'ISIN':
+            products = assets['Product'].reindex(labels.get_level_values('ISIN')).to_numpy()
+        else:
+            products = labels.get_level_values(-1).to_numpy()
+
+        return pd.DataFrame(
+            {
+                'Product': products,
+                'Current Value': current,
+                'Current Percentage': np.round(current / portfolio.total_value * 100, 2),
+                'Expected Percentage': expected,
+            },
+            index=labels,
+        )
+
+    def at_level(self, portfolio: Portfolio, level: str) -> Portfolio:
+        """Views a portfolio as holding the groups of a level.
+
+        The view can be rebalanced with `PortfolioManager` like any
+        portfolio: its movements are the value to move into or out of
+        every group.
+
+        Args:
+            portfolio (Portfolio): The portfolio.
+            level (str): The level.
+
+        Raises:
+            ValueError: If the level is unknown.
+
+        Returns:
+            Portfolio: The portfolio of the groups of the level.
+        """
+        rollup = self.rollup(portfolio, level)
+
+        return Portfolio.from_assets(
+            rollup[['Product']].assign(
+                Amount=np.nan, Closing=np.nan, **{'Current Value': rollup['Current Value']}
+            ),
+            rollup[['Expected Percentage']],
+            portfolio.currency,
+            fx=portfolio.fx,
+            label=f'{portfolio._label}:{level}',  # noqa: SLF001
+        )
+
+    def _check_level(self, level: str) -> None:
+        """Checks that a level belongs to the tree.
+
+        Args:
+            level (str): The level.
+
+        Raises:
+            ValueError: If the level is unknown.
+        """
+        if level not in self._codes:
+            msg = f'Unknown level {level!r}. Expected one of {self._levels}.'
+            raise ValueError(msg)
@@ -0,0 +1,290 @@
+import json
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_ISIN_CAPACITY = 1024
+META_FILE = 'meta.json'
+DATES_FILE = 'dates.i8'
+
+DateLike = str | date | np.datetime64 | pd.Timestamp
+
+
+class PriceHistoryStore:
+    """A local store of daily closing prices, one column per ISIN.
+
+    The prices are kept on disk as a dense dates x ISINs float64 array
+    in a raw row-major file, next to a file of int64 day numbers and a
+    JSON file with the width of the rows and the ISIN of every column.
+    Both arrays are memory-mapped for reading, so opening a store reads
+    nothing but its metadata, and a date range is a zero-copy slice of
+    the mapping.
+
+    Every row is `capacity` columns wide, so new days are appended at
+    the end of the files without rewriting the earlier ones; new ISINs
+    take the next free column. The prices are only copied, to a new
+    file, when the number of ISINs outgrows the capacity, which then
+    doubles. The metadata is replaced atomically after the data is
+    written, so an interrupted append leaves the store at its previous
+    state.
+
+    Attributes:
+        _directory (Path): The directory holding the store files.
+        _capacity (int): The number of columns of every row.
+        _isins (list[str]): The ISIN of every used column.
+        _columns (dict[str, int]): The column of every ISIN.
+        _days (ndarray): The day number of every row, since 1970-01-01.
+        _rows (dict[int, int]): The row of every day number.
+        _prices (ndarray): The memory-mapped prices, dates x capacity.
+    """
+
+    def __init__(self, directory: str | Path, *, isin_capacity: int = DEFAULT_ISIN_CAPACITY):
+        """__init__ method.
+
+        Opens the store in `directory`, creating it if needed.
+
+        Args:
+            directory (str | Path): The directory holding the store
+                files.
+            isin_capacity (int): The number of columns of every row of
+                a new store. Ignored when the store already exists.
+                Defaults to 1024.
+        """
+        self._directory = Path(directory)
+
+        meta_file = self._directory / META_FILE
+        if meta_file.exists():
+            meta = json.loads(meta_file.read_text())
+        else:
+            self._directory.mkdir(parents=True, exist_ok=True)
+            (self._directory / DATES_FILE).touch()
+            (self._directory / _prices_file(isin_capacity)).touch()
+            meta = {'capacity': isin_capacity, 'isins': [], 'days': 0}
+            self._write_meta(meta)
+
+        self._capacity = meta['capacity']
+        self._isins = meta['isins']
+        self._columns = {isin: col for col, isin in enumerate(self._isins)}
+        self._map(meta['days'])
+
+    @property
+    def isins(self) -> pd.Index:
+        """Returns the ISINs of the store, in column order."""
+        return pd.Index(self._isins, dtype=object, name='ISIN')
+
+    @property
+    def dates(self) -> pd.DatetimeIndex:
+        """Returns the dates of the store, in ascending order."""
+        return pd.DatetimeIndex(
+            self._days.astype('datetime64[D]').astype('datetime64[ns]'), name='Date'
+        )
+
+    def __len__(self) -> int:
+        """Returns the number of dates in the store."""
+        return len(self._days)
+
+    def price(self, isin: str, day: DateLike) -> float:
+        """Returns the closing price of an ISIN on a date.
+
+        Args:
+            isin (str): The ISIN of the asset.
+            day (DateLike): The date of the price.
+
+        Raises:
+            KeyError: If the ISIN or the date is not in the store.
+
+        Returns:
+            float: The closing price, NaN if the asset had no price on
+                that date.
+        """
+        return float(self._prices[self._rows[_day_number(day)], self._columns[isin]])
+
+    def prices_on(self, day: DateLike) -> pd.Series:
+        """Returns the latest closing prices as of a date.
+
+        Args:
+            day (DateLike): The date of the prices. If the store has
+                no prices on that date, the last earlier date is used.
+
+        Raises:
+            ValueError: If the date is before the first date of the
+                store.
+
+        Returns:
+            Series: The closing price of every ISIN, indexed by ISIN.
+        """
+        row = self._rows.get(_day_number(day))
+        if row is None:
+            row = int(np.searchsorted(self._days, _day_number(day), side='right')) - 1
+            if row < 0:
+                msg = f'The price history has no prices on or before {day}.'
+                raise ValueError(msg)
+
+        return pd.Series(
+            self._prices[row, : len(self._isins)], index=self.isins, name='Price', copy=False
+        )
+
+    def window(self, start: DateLike | None = None, end: DateLike | None = None) -> pd.DataFrame:
+        """Returns the closing prices of a date range.
+
+        The DataFrame wraps a slice of the memory-mapped file, without
+        copying it, so it is read-only.
+
+        Args:
+            start (DateLike | None): The first date, inclusive.
+                Defaults to None, the first date of the store.
+            end (DateLike | None): The last date, inclusive.
+                Defaults to None, the last date of the store.
+
+        Returns:
+            DataFrame: The closing prices, dates x ISINs.
+        """
+        first = 0 if start is None else np.searchsorted(self._days, _day_number(start))
+        last = (
+            len(self._days)
+            if end is None
+            else np.searchsorted(self._days, _day_number(end), side='right')
+        )
+
+        return pd.DataFrame(
+            self._prices[first:last, : len(self._isins)],
+            index=self.dates[first:last],
+            columns=self.isins,
+            copy=False,
+        )
+
+    def append(self, prices: pd.DataFrame) -> None:
+        """Appends the closing prices of new dates.
+
+        Args:
+            prices (DataFrame): The closing prices, indexed by date,
+                with one column per ISIN. The dates must be unique and
+                later than the last date of the store.
+
+        Raises:
+            ValueError: If a date is not later than the last date of
+                the store, or the dates are not unique.
+        """
+        days = _day_number(prices.index)
+        if not (np.diff(days) > 0).all():
+            prices = prices.sort_index()
+            days = _day_number(prices.index)
+            if not (np.diff(days) > 0).all():
+                msg = 'The dates of the prices to append must be unique.'
+                raise ValueError(msg)
+
+        if len(self._days) and len(days) and days[0] <= self._days[-1]:
+            msg = (
+                'The dates of the prices to append must be later than the '
+                f'last date of the price history, {self.dates[-1].date()}.'
+            )
+            raise ValueError(msg)
+
+        isins = self._isins + [isin for isin in prices.columns if isin not in self._columns]
+        if len(isins) > self._capacity:
+            self._grow(max(2 * self._capacity, len(isins)))
+
+        columns = {isin: col for col, isin in enumerate(isins)}
+        block = np.full((len(days), self._capacity), np.nan)
+        block[:, [columns[isin] for isin in prices.columns]] = prices.to_numpy(dtype=float)
+
+        committed = len(self._days)
+        self._write_rows(DATES_FILE, days.astype(np.int64), committed * 8)
+        self._write_rows(_prices_file(self._capacity), block, committed * self._capacity * 8)
+        self._write_meta(
+            {'capacity': self._capacity, 'isins': isins, 'days': committed + len(days)}
+        )
+
+        self._isins = isins
+        self._columns = columns
+        self._map(committed + len(days))
+
+    def _map(self, n_days: int) -> None:
+        """Memory-maps the first `n_days` rows of the store files.
+
+        Args:
+            n_days (int): The number of committed rows.
+        """
+        if n_days == 0:
+            self._days = np.empty(0, dtype=np.int64)
+            self._prices = np.empty((0, self._capacity))
+        else:
+            self._days = np.memmap(
+                self._directory / DATES_FILE, dtype=np.int64, mode='r', shape=(n_days,)
+            )
+            self._prices = np.memmap(
+                self._directory / _prices_file(self._capacity),
+                dtype=np.float64,
+                mode='r',
+                shape=(n_days, self._capacity),
+            )
+
+        self._rows = {day: row for row, day in enumerate(self._days.tolist())}
+
+    def _write_rows(self, name: str, rows: np.ndarray, offset: int) -> None:
+        """Writes rows at the end of the committed part of a file.
+
+        Any bytes past `offset`, left by an interrupted append, are
+        overwritten.
+
+        Args:
+            name (str): The name of the file.
+            rows (ndarray): The rows to write.
+            offset (int): The size of the committed part of the file.
+        """
+        with (self._directory / name).open('r+b') as f:
+            f.truncate(offset)
+            f.seek(offset)
+            f.write(np.ascontiguousarray(rows).tobytes())
+
+    def _write_meta(self, meta: dict) -> None:
+        """Atomically replaces the metadata of the store.
+
+        Args:
+            meta (dict): The capacity, the ISINs and the number of
+                committed dates.
+        """
+        tmp = self._directory / f'{META_FILE}.tmp'
+        tmp.write_text(json.dumps(meta))
+        tmp.replace(self._directory / META_FILE)
+
+    def _grow(self, capacity: int) -> None:
+        """Copies the prices to a new file with wider rows.
+
+        The new file is only used once the metadata is replaced, so
+        the old one is removed last.
+
+        Args:
+            capacity (int): The new number of columns of every row.
+        """
+        prices = np.full((len(self._days), capacity), np.nan)
+        prices[:, : self._capacity] = self._prices
+        (self._directory / _prices_file(capacity)).write_bytes(prices.tobytes())
+
+        self._write_meta({'capacity': capacity, 'isins': self._isins, 'days': len(self._days)})
+        old_file = self._directory / _prices_file(self._capacity)
+        self._capacity = capacity
+        self._prices = prices
+        old_file.unlink()
+
+
+def _day_number(day: DateLike | pd.Index) -> int | np.ndarray:
+    """Converts dates to day numbers since 1970-01-01.
+
+    Args:
+        day (DateLike | Index): One date or an index of dates.
+
+    Returns:
+        int | ndarray: The day number of every date.
+    """
+    if isinstance(day, pd.Index):
+        return pd.DatetimeIndex(day).to_numpy(dtype='datetime64[D]').astype(np.int64)
+
+    return int(np.datetime64(pd.Timestamp(day), 'D').astype(np.int64))
+
+
+def _prices_file(capacity: int) -> str:
+    """Returns the name of the prices file with rows of `capacity`."""
+    return f'prices_{capacity}.f8'
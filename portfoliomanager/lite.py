@@ -0,0 +1,349 @@
+import csv
+from array import array
+from collections.abc import Iterator, Mapping, Sequence
+from typing import Any
+
+FULL_PERCENTAGE = 100
+
+
+def _round(value: float) -> float:
+    """Rounds to 2 decimals like `np.round`, halves to even."""
+    return round(value * 100) / 100
+
+
+def sell_values(total: float, expected: Sequence[float]) -> list[float]:
+    """Computes the values of a rebalance with sell operations.
+
+    Args:
+        total (float): The total value of the portfolio.
+        expected (Sequence[float]): The expected percentage of every
+            ISIN.
+
+    Returns:
+        list[float]: The value of every ISIN after the rebalance.
+    """
+    return [_round(total / 100 * percentage) for percentage in expected]
+
+
+def no_sell_values(
+    values: Sequence[float], expected: Sequence[float], current: Sequence[float]
+) -> list[float]:
+    """Computes the values of a rebalance without sell operations.
+
+    The ISIN furthest above its expected percentage keeps its value,
+    and every other ISIN is bought up to match it. Owned ISINs with an
+    expected percentage of 0 must be rejected by the caller.
+
+    Args:
+        values (Sequence[float]): The current value of every ISIN.
+        expected (Sequence[float]): The expected percentage of every
+            ISIN.
+        current (Sequence[float]): The current percentage of every
+            ISIN.
+
+    Returns:
+        list[float]: The value of every ISIN after the rebalance.
+    """
+    top = max(
+        (i for i in range(len(expected)) if expected[i] != 0),
+        key=lambda i: current[i] / expected[i],
+    )
+    return [_round(percentage * values[top] / expected[top]) for percentage in expected]
+
+
+def _to_float(value: str) -> float:
+    """Parses a number with a decimal comma or point."""
+    return float(value.replace(',', '.'))
+
+
+class LiteFrame:
+    """A small column-oriented table, converted to pandas on demand.
+
+    Attributes:
+        _index (tuple[str, ...]): The ISINs of the rows.
+        _columns (dict[str, list]): The values of every column.
+    """
+
+    __slots__ = ('_columns', '_index')
+
+    def __init__(self, index: tuple[str, ...], columns: dict[str, list]):
+        """__init__ method.
+
+        Constructs all the necessary attributes for the lite frame
+        object.
+
+        Args:
+            index (tuple[str, ...]): The ISINs of the rows.
+            columns (dict[str, list]): The values of every column.
+        """
+        self._index = index
+        self._columns = columns
+
+    @property
+    def index(self) -> tuple[str, ...]:
+        """Returns the ISINs of the rows."""
+        return self._index
+
+    @property
+    def columns(self) -> tuple[str, ...]:
+        """Returns the names of the columns."""
+        return tuple(self._columns)
+
+    def __len__(self) -> int:
+        """Returns the number of rows."""
+        return len(self._index)
+
+    def __getitem__(self, column: str) -> list:
+        """Returns the values of a column."""
+        return self._columns[column]
+
+    def rows(self) -> Iterator[tuple[str, dict[str, Any]]]:
+        """Iterates over the rows.
+
+        Yields:
+            tuple[str, dict[str, Any]]: The ISIN and the values of each
+                row.
+        """
+        names = tuple(self._columns)
+        for isin, values in zip(
+            self._index, zip(*self._columns.values(), strict=True), strict=True
+        ):
+            yield isin, dict(zip(names, values, strict=True))
+
+    def to_frame(self) -> Any:  # noqa: ANN401
+        """Converts the table to a DataFrame, importing pandas.
+
+        Returns:
+            DataFrame: The same table as returned by `PortfolioManager`.
+        """
+        import pandas as pd  # noqa: PLC0415
+
+        return pd.DataFrame(self._columns, index=pd.Index(self._index, name='ISIN'))
+
+
+class LitePortfolio:
+    """A portfolio held in plain arrays, without pandas.
+
+    Meant for one small rebalance per process or request, where
+    importing pandas and building DataFrames costs more than the
+    arithmetic. The holdings are aligned once with the allocation on
+    the sorted union of their ISINs, like `Portfolio.summary`.
+
+    Attributes:
+        _isins (tuple[str, ...]): The held and allocated ISINs, sorted.
+        _products (list[str | None]): The product of every ISIN, None
+            if it is not held.
+        _values (array): The current value of every ISIN.
+        _expected (array): The expected percentage of every ISIN.
+        _currency (str): The currency of the portfolio.
+        _total (float): The total value of the portfolio.
+    """
+
+    __slots__ = ('_currency', '_expected', '_isins', '_products', '_total', '_values')
+
+    def __init__(
+        self,
+        holdings: Sequence[tuple[str, str, float]],
+        allocation: Mapping[str, float],
+        currency: str = 'EUR',
+    ):
+        """__init__ method.
+
+        Constructs all the necessary attributes for the lite portfolio
+        object.
+
+        Args:
+            holdings (Sequence[tuple[str, str, float]]): The ISIN, the
+                product and the current value of every holding. The
+                values of repeated ISINs are summed.
+            allocation (Mapping[str, float]): The expected percentage
+                of every ISIN.
+            currency (str): The currency of the portfolio.
+                Defaults to 'EUR'.
+
+        Raises:
+            ValueError: If the expected percentages don't sum to 100.
+        """
+        if sum(allocation.values()) != FULL_PERCENTAGE:
+            msg = 'The total sum of percentages in the "Expected Percentage" column is not 100%'
+            raise ValueError(msg)
+
+        products = {}
+        values = {}
+        for isin, product, value in holdings:
+            products.setdefault(isin, product)
+            values[isin] = values.get(isin, 0.0) + value
+
+        self._isins = tuple(sorted(values.keys() | allocation.keys()))
+        self._products = [products.get(isin) for isin in self._isins]
+        self._values = array('d', (values.get(isin, 0.0) for isin in self._isins))
+        self._expected = array('d', (allocation.get(isin, 0.0) for isin in self._isins))
+        self._currency = currency
+        self._total = sum(values.values())
+
+    @classmethod
+    def from_csv(
+        cls, assets_file: str, allocation_file: str, currency: str = 'EUR'
+    ) -> 'LitePortfolio':
+        """Reads a Degiro assets csv and an allocation csv.
+
+        Args:
+            assets_file (str): The file name of the Degiro assets csv.
+            allocation_file (str): The file name of the allocation csv.
+            currency (str): The currency of the portfolio.
+                Defaults to 'EUR'.
+
+        Raises:
+            FileNotFoundError: If a file does not exist.
+            ValueError: If a value can't be converted to float, or the
+                expected percentages don't sum to 100.
+
+        Returns:
+            LitePortfolio: The portfolio.
+        """
+        with open(assets_file, newline='', encoding='utf-8') as file:  # noqa: PTH123
+            reader = csv.reader(file)
+            next(reader)
+            try:
+                holdings = [
+                    (row[1], row[0], _to_float(row[5])) for row in reader if row and row[1]
+                ]
+            except ValueError:
+                msg = (
+                    'Failed to convert column Current Value to float. '
+                    'Check for non-numeric values.'
+                )
+                raise ValueError(msg) from None
+
+        with open(allocation_file, newline='', encoding='utf-8') as file:  # noqa: PTH123
+            allocation = {
+                row['ISIN']: float(row['Expected Percentage']) for row in csv.DictReader(file)
+            }
+
+        return cls(holdings, allocation, currency)
+
+    @property
+    def currency(self) -> str:
+        """Returns the currency of the portfolio."""
+        return self._currency
+
+    @property
+    def total_value(self) -> float:
+        """Returns the total value of the portfolio."""
+        return self._total
+
+    @property
+    def summary(self) -> LiteFrame:
+        """Returns the summary of the portfolio."""
+        return LiteFrame(
+            self._isins,
+            {
+                'Product': list(self._products),
+                'Current Value': list(self._values),
+                'Current Percentage': self._current_percentages(),
+                'Expected Percentage': list(self._expected),
+            },
+        )
+
+    def _current_percentages(self) -> list[float]:
+        """Returns the current percentage of every ISIN."""
+        return [_round(value / self._total * 100) for value in self._values]
+
+
+class LitePortfolioManager:
+    """Rebalances a `LitePortfolio`, like `PortfolioManager`.
+
+    Attributes:
+        _portfolio (LitePortfolio): The portfolio to manage.
+    """
+
+    __slots__ = ('_portfolio',)
+
+    def __init__(self, portfolio: LitePortfolio):
+        """__init__ method.
+
+        Constructs all the necessary attributes for the lite portfolio
+        manager object.
+
+        Args:
+            portfolio (LitePortfolio): The portfolio to manage.
+        """
+        self._portfolio = portfolio
+
+    def rebalance_sell(self) -> LiteFrame:
+        """Rebalance with sell operations.
+
+        Returns:
+            LiteFrame: The same table as
+                `PortfolioManager.rebalance_sell`.
+        """
+        portfolio = self._portfolio
+        expected_values = sell_values(portfolio._total, portfolio._expected)  # noqa: SLF001
+        return self._frame(expected_values, portfolio._current_percentages())  # noqa: SLF001
+
+    def rebalance_no_sell(self) -> LiteFrame:
+        """Rebalance without sell operations.
+
+        Raises:
+            ValueError: If an asset is owned but its expected percentage
+                is 0.
+
+        Returns:
+            LiteFrame: The same table as
+                `PortfolioManager.rebalance_no_sell`.
+        """
+        portfolio = self._portfolio
+        values = portfolio._values  # noqa: SLF001
+        expected = portfolio._expected  # noqa: SLF001
+
+        owned = [
+            product
+            for product, value, percentage in zip(
+                portfolio._products,  # noqa: SLF001
+                values,
+                expected,
+                strict=True,
+            )
+            if percentage == 0 and value != 0
+        ]
+        if owned:
+            msg = (
+                "While performing a no-sell rebalance, you can't set an "
+                'Expected Percentage of 0% in your desired allocation for an '
+                'asset that you currently own. The following assets are '
+                f'currently owned but their Expected Percentage is 0%: {owned}.'
+                '\n\nPlease adjust your desired assets allocation and try again.'
+            )
+            raise ValueError(msg)
+
+        current = portfolio._current_percentages()  # noqa: SLF001
+        return self._frame(no_sell_values(values, expected, current), current)
+
+    def _frame(self, expected_values: list[float], current: list[float]) -> LiteFrame:
+        """Builds the table of a rebalance.
+
+        Args:
+            expected_values (list[float]): The value of every ISIN after
+                the rebalance.
+            current (list[float]): The current percentage of every ISIN.
+
+        Returns:
+            LiteFrame: The rebalance.
+        """
+        portfolio = self._portfolio
+        values = portfolio._values  # noqa: SLF001
+
+        return LiteFrame(
+            portfolio._isins,  # noqa: SLF001
+            {
+                'Product': list(portfolio._products),  # noqa: SLF001
+                'Current Value': list(values),
+                'Expected Value': expected_values,
+                'Current Percentage': current,
+                'Expected Percentage': list(portfolio._expected),  # noqa: SLF001
+                'Movement': [
+                    expected - value
+                    for expected, value in zip(expected_values, values, strict=True)
+                ],
+            },
+        )
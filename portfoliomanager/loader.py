@@ -0,0 +1,169 @@
+import re
+from collections.abc import Iterable, Mapping
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from portfoliomanager.allocation import AllocationRegistry
+from portfoliomanager.batch import BatchPortfolioManager
+from portfoliomanager.degiroportfolio import DegiroPortfolio
+from portfoliomanager.portfolio import Portfolio
+
+ASSETS_PATTERN = re.compile(r'assets_(?P<key>.+)\.csv')
+ALLOCATION_PATTERN = re.compile(r'allocation_(?P<key>.+)\.csv')
+
+
+@dataclass(frozen=True)
+class LoadResult:
+    """The outcome of loading many portfolios.
+
+    Attributes:
+        portfolios (dict[str, Portfolio]): The loaded portfolios, in a
+            deterministic order.
+        errors (dict[str, Exception]): The error raised while loading
+            each portfolio that could not be loaded.
+    """
+
+    portfolios: dict[str, Portfolio] = field(default_factory=dict)
+    errors: dict[str, Exception] = field(default_factory=dict)
+
+    def batch(self) -> BatchPortfolioManager:
+        """Returns a batch manager over the loaded portfolios.
+
+        Returns:
+            BatchPortfolioManager: The batch manager, with the accounts
+                in the order of `portfolios`.
+        """
+        return BatchPortfolioManager(list(self.portfolios.values()))
+
+
+def find_portfolio_files(directory: str | Path) -> dict[str, tuple[Path | None, Path | None]]:
+    """Pairs the assets and allocation csv files of a directory.
+
+    'assets_*.csv' and 'allocation_*.csv' files are paired by the
+    part of their name after the prefix, e.g. 'assets_42.csv' with
+    'allocation_42.csv'.
+
+    Args:
+        directory (str | Path): The directory to scan.
+
+    Returns:
+        dict[str, tuple[Path | None, Path | None]]: The assets and
+            allocation file of each key, sorted by key. A file is None
+            when its counterpart is missing.
+    """
+    assets = {}
+    allocations = {}
+
+    for path in Path(directory).iterdir():
+        if match := ASSETS_PATTERN.fullmatch(path.name):
+            assets[match['key']] = path
+        elif match := ALLOCATION_PATTERN.fullmatch(path.name):
+            allocations[match['key']] = path
+
+    return {key: (assets.get(key), allocations.get(key)) for key in sorted(assets | allocations)}
+
+
+def load_portfolios(
+    files: str | Path | Mapping[str, tuple[Path, Path]] | Iterable[tuple[Path, Path]],
+    portfolio_cls: type[Portfolio] = DegiroPortfolio,
+    *,
+    max_workers: int | None = None,
+    share_allocations: bool = False,
+    **kwargs: Any,  # noqa: ANN401
+) -> LoadResult:
+    """Loads many portfolios in parallel across a process pool.
+
+    Every `Exception` raised while loading a portfolio, such as a
+    `ValueError` from a malformed csv, a `KeyError` from a missing
+    column or an `OSError` from an unreadable file, is collected in the
+    result under its key instead of aborting the whole batch.
+
+    With `share_allocations`, the allocation files are read in this
+    process first, once per distinct content, and every portfolio
+    following the same model references the same `Allocation`, which
+    `LoadResult.batch` then aligns once per model.
+
+    Args:
+        files (str | Path | Mapping | Iterable): A directory of
+            'assets_*.csv' and 'allocation_*.csv' files, a mapping of
+            keys to (assets, allocation) file pairs, or an iterable of
+            such pairs keyed by their position.
+        portfolio_cls (type[Portfolio]): The class of the portfolios.
+            Defaults to DegiroPortfolio.
+        max_workers (int | None): The number of worker processes.
+            Defaults to None, which uses every core.
+        share_allocations (bool): Whether to share the allocations with
+            the same content between the portfolios. Defaults to False.
+        **kwargs: Passed to the constructor of every portfolio, e.g.
+            'currency', 'cache' or 'compact'.
+
+    Returns:
+        LoadResult: The loaded portfolios and the collected errors,
+            ordered by key for a directory and by input order otherwise.
+    """
+    pairs = _pairs(files)
+    result = LoadResult()
+    registry = AllocationRegistry(kwargs.get('cache')) if share_allocations else None
+    models = {}
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for key, (assets_file, allocation_file) in pairs.items():
+            if assets_file is None or allocation_file is None:
+                msg = f'Missing assets or allocation file for {key!r}.'
+                result.errors[key] = FileNotFoundError(msg)
+                continue
+
+            if registry is not None:
+                try:
+                    models[key] = registry.get(allocation_file)
+                except Exception as e:  # noqa: BLE001
+                    result.errors[key] = e
+                    continue
+
+            futures[key] = executor.submit(
+                portfolio_cls, assets_file, models.get(key, allocation_file), **kwargs
+            )
+
+        for key, future in futures.items():
+            error = future.exception()
+            if error is None:
+                portfolio = future.result()
+                if key in models:
+                    # Unpickled models are copies: share them again.
+                    portfolio.set_allocation(models[key])
+                if kwargs.get('compact'):
+                    # Unpickled strings are copies: intern them again.
+                    portfolio.compact()
+                result.portfolios[key] = portfolio
+            elif isinstance(error, Exception):
+                result.errors[key] = error
+            else:
+                raise error
+
+    return result
+
+
+def _pairs(
+    files: str | Path | Mapping[str, tuple[Path, Path]] | Iterable[tuple[Path, Path]],
+) -> dict[str, tuple[Path | None, Path | None]]:
+    """Returns the assets and allocation files of each key.
+
+    Args:
+        files (str | Path | Mapping | Iterable): A directory, a mapping
+            of keys to file pairs, or an iterable of file pairs.
+
+    Returns:
+        dict[str, tuple[Path | None, Path | None]]: The file pairs,
+            keyed by the names of a directory, the keys of a mapping or
+            the positions of an iterable.
+    """
+    if isinstance(files, str | Path):
+        return find_portfolio_files(files)
+
+    if isinstance(files, Mapping):
+        return dict(files)
+
+    return {str(position): pair for position, pair in enumerate(files)}
@@ -0,0 +1,40 @@
+from collections.abc import Iterable
+
+import pandas as pd
+
+from portfoliomanager.portfolio import Portfolio
+
+
+def memory_usage(portfolios: Iterable[Portfolio]) -> pd.DataFrame:
+    """Reports the memory held by many portfolios.
+
+    Each portfolio counts its own strings, while the 'Total' row
+    counts every string once, however many portfolios share it, so it
+    shows the memory saved by compact portfolios.
+
+    Args:
+        portfolios (Iterable[Portfolio]): The portfolios.
+
+    Returns:
+        DataFrame: The `Portfolio.memory_usage` of every portfolio,
+            indexed by label, followed by a 'Total' row.
+    """
+    portfolios = list(portfolios)
+    usage = pd.DataFrame(
+        [portfolio.memory_usage() for portfolio in portfolios],
+        index=pd.Index(
+            [portfolio._label for portfolio in portfolios],  # noqa: SLF001
+            dtype=object,
+            name='Portfolio',
+        ),
+    )
+
+    strings = {}
+    for portfolio in portfolios:
+        strings.update(portfolio._strings())  # noqa: SLF001
+
+    total = usage.sum()
+    total['Strings'] = sum(strings.values())
+    total['Total'] = total.drop('Total').sum()
+    usage.loc['Total'] = total
+    return usage
@@ -0,0 +1,392 @@
+import contextlib
+import functools
+import json
+import time
+import tracemalloc
+from collections import defaultdict
+from collections.abc import Callable, Iterator
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, TypeVar
+
+import pandas as pd
+
+F = TypeVar('F', bound=Callable[..., Any])
+
+_current_label: ContextVar[str | None] = ContextVar('portfolio_label', default=None)
+
+
+@dataclass(frozen=True)
+class StageMetric:
+    """The measurements of one run of a pipeline stage.
+
+    Attributes:
+        portfolio (str | None): The portfolio the stage ran for.
+        stage (str): The name of the stage.
+        seconds (float): The wall-clock duration of the stage.
+        rows (int | None): The number of rows the stage returned.
+        memory_bytes (int | None): The change in traced memory over the
+            stage, or None when memory is not traced.
+    """
+
+    portfolio: str | None
+    stage: str
+    seconds: float
+    rows: int | None
+    memory_bytes: int | None
+
+
+class MetricsSink:
+    """A destination for stage metrics."""
+
+    def emit(self, metric: StageMetric) -> None:
+        """Method to be implemented.
+
+        Placeholder for a method that receives one stage metric.
+
+        Raises:
+            NotImplementedError: This method needs to be implemented
+                in a subclass.
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Releases the resources held by the sink."""
+
+
+class InMemorySink(MetricsSink):
+    """A sink that keeps every metric in memory.
+
+    Attributes:
+        metrics (list[StageMetric]): The metrics received so far.
+    """
+
+    def __init__(self):
+        """__init__ method.
+
+        Constructs all the necessary attributes for the in-memory sink
+        object.
+        """
+        self.metrics = []
+
+    def emit(self, metric: StageMetric) -> None:
+        """Stores a stage metric.
+
+        Args:
+            metric (StageMetric): The metric to store.
+        """
+        self.metrics.append(metric)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Returns every metric as a DataFrame, one row per run."""
+        return pd.DataFrame(
+            [asdict(metric) for metric in self.metrics],
+            columns=['portfolio', 'stage', 'seconds', 'rows', 'memory_bytes'],
+        )
+
+    def aggregate(self) -> pd.DataFrame:
+        """Aggregates the metrics by stage.
+
+        Returns:
+            DataFrame: The number of runs, the total, mean and maximum
+                duration, and the total rows and memory of each stage.
+        """
+        return (
+            self.to_frame()
+            .groupby('stage', sort=False)
+            .agg(
+                calls=('seconds', 'size'),
+                total_seconds=('seconds', 'sum'),
+                mean_seconds=('seconds', 'mean'),
+                max_seconds=('seconds', 'max'),
+                rows=('rows', 'sum'),
+                memory_bytes=('memory_bytes', 'sum'),
+            )
+        )
+
+
+class JsonLinesSink(MetricsSink):
+    """A sink that appends every metric to a JSON lines file.
+
+    Attributes:
+        _file (TextIO): The open JSON lines file.
+    """
+
+    def __init__(self, path: str | Path):
+        """__init__ method.
+
+        Constructs all the necessary attributes for the JSON lines
+        sink object.
+
+        Args:
+            path (str | Path): The JSON lines file to append to.
+        """
+        self._file = Path(path).open('a')  # noqa: SIM115
+
+    def emit(self, metric: StageMetric) -> None:
+        """Writes a stage metric as one JSON line.
+
+        Args:
+            metric (StageMetric): The metric to write.
+        """
+        self._file.write(json.dumps(asdict(metric)) + '\n')
+
+    def close(self) -> None:
+        """Closes the JSON lines file."""
+        self._file.close()
+
+
+class PrometheusSink(MetricsSink):
+    """A sink that aggregates metrics into Prometheus counters.
+
+    The counters are labelled by stage only, to keep their cardinality
+    independent of the number of portfolios. The memory of a stage is
+    a gauge, not a counter: it sums the change in traced memory of
+    every run, which is negative when a stage frees more than it
+    allocates.
+
+    Attributes:
+        _counters (dict): The counters of each stage.
+    """
+
+    COUNTERS = (
+        (
+            'calls',
+            'portfoliomanager_stage_calls_total',
+            'counter',
+            'Number of runs of each stage.',
+        ),
+        (
+            'seconds',
+            'portfoliomanager_stage_duration_seconds_total',
+            'counter',
+            'Time spent in each stage.',
+        ),
+        (
+            'rows',
+            'portfoliomanager_stage_rows_total',
+            'counter',
+            'Rows returned by each stage.',
+        ),
+        (
+            'memory_bytes',
+            'portfoliomanager_stage_memory_bytes',
+            'gauge',
+            'Net change in traced memory over the runs of each stage.',
+        ),
+    )
+
+    def __init__(self):
+        """__init__ method.
+
+        Constructs all the necessary attributes for the Prometheus
+        sink object.
+        """
+        self._counters = defaultdict(lambda: dict.fromkeys(('calls', 'seconds', 'rows'), 0))
+
+    def emit(self, metric: StageMetric) -> None:
+        """Adds a stage metric to the counters of its stage.
+
+        Args:
+            metric (StageMetric): The metric to add.
+        """
+        counters = self._counters[metric.stage]
+        counters['calls'] += 1
+        counters['seconds'] += metric.seconds
+        counters['rows'] += metric.rows or 0
+        if metric.memory_bytes is not None:
+            counters['memory_bytes'] = counters.get('memory_bytes', 0) + metric.memory_bytes
+
+    def render(self) -> str:
+        """Renders the counters in the Prometheus text format.
+
+        Returns:
+            str: The text exposition of the counters.
+        """
+        lines = []
+
+        for key, name, kind, description in self.COUNTERS:
+            samples = [
+                f'{name}{{stage="{stage}"}} {counters[key]}'
+                for stage, counters in self._counters.items()
+                if key in counters
+            ]
+            if samples:
+                lines += [f'# HELP {name} {description}', f'# TYPE {name} {kind}', *samples]
+
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsRecorder:
+    """Measures pipeline stages and forwards them to sinks.
+
+    Attributes:
+        _sinks (tuple[MetricsSink, ...]): The sinks receiving metrics.
+        _trace_memory (bool): Whether memory deltas are recorded.
+    """
+
+    def __init__(self, *sinks: MetricsSink, trace_memory: bool = False):
+        """__init__ method.
+
+        Constructs all the necessary attributes for the metrics
+        recorder object.
+
+        Args:
+            *sinks (MetricsSink): The sinks receiving metrics.
+            trace_memory (bool): Whether memory deltas are recorded
+                with tracemalloc. Defaults to False.
+        """
+        self._sinks = sinks
+        self._trace_memory = trace_memory
+
+    def record(
+        self,
+        stage: str,
+        func: Callable[..., Any],
+        *args: Any,  # noqa: ANN401
+        **kwargs: Any,  # noqa: ANN401
+    ) -> Any:  # noqa: ANN401
+        """Runs a stage and emits its metrics.
+
+        Args:
+            stage (str): The name of the stage.
+            func (Callable): The function implementing the stage.
+            *args: The positional arguments of the function.
+            **kwargs: The keyword arguments of the function.
+
+        Returns:
+            Any: The result of the function.
+        """
+        trace_memory = self._trace_memory and tracemalloc.is_tracing()
+        memory_before = tracemalloc.get_traced_memory()[0] if trace_memory else 0
+        start = time.perf_counter()
+
+        result = func(*args, **kwargs)
+
+        seconds = time.perf_counter() - start
+        memory = tracemalloc.get_traced_memory()[0] - memory_before if trace_memory else None
+        rows = len(result) if isinstance(result, pd.DataFrame | pd.Series) else None
+
+        metric = StageMetric(_label(args), stage, seconds, rows, memory)
+        for sink in self._sinks:
+            sink.emit(metric)
+
+        return result
+
+
+_recorder: MetricsRecorder | None = None
+_started_tracemalloc = False
+
+
+def enable(*sinks: MetricsSink, trace_memory: bool = False) -> None:
+    """Starts recording the pipeline stages.
+
+    Args:
+        *sinks (MetricsSink): The sinks receiving metrics.
+        trace_memory (bool): Whether memory deltas are recorded with
+            tracemalloc, which slows the pipeline down noticeably.
+            Defaults to False.
+    """
+    global _recorder, _started_tracemalloc  # noqa: PLW0603
+
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _started_tracemalloc = True
+
+    _recorder = MetricsRecorder(*sinks, trace_memory=trace_memory)
+
+
+def disable() -> None:
+    """Stops recording the pipeline stages."""
+    global _recorder, _started_tracemalloc  # noqa: PLW0603
+
+    _recorder = None
+    if _started_tracemalloc:
+        tracemalloc.stop()
+        _started_tracemalloc = False
+
+
+@contextlib.contextmanager
+def instrument(*sinks: MetricsSink, trace_memory: bool = False) -> Iterator[None]:
+    """Records the pipeline stages inside a `with` block.
+
+    The sinks are closed when the block exits.
+
+    Args:
+        *sinks (MetricsSink): The sinks receiving metrics.
+        trace_memory (bool): Whether memory deltas are recorded with
+            tracemalloc. Defaults to False.
+
+    Yields:
+        None
+    """
+    enable(*sinks, trace_memory=trace_memory)
+    try:
+        yield
+    finally:
+        disable()
+        for sink in sinks:
+            sink.close()
+
+
+@contextlib.contextmanager
+def portfolio_label(label: str) -> Iterator[None]:
+    """Attributes the stages run inside a `with` block to a portfolio.
+
+    Args:
+        label (str): The label of the portfolio.
+
+    Yields:
+        None
+    """
+    token = _current_label.set(label)
+    try:
+        yield
+    finally:
+        _current_label.reset(token)
+
+
+def stage(name: str) -> Callable[[F], F]:
+    """Marks a function as a pipeline stage.
+
+    When recording is disabled the wrapper only checks a module
+    global before calling the function.
+
+    Args:
+        name (str): The name of the stage.
+
+    Returns:
+        Callable: The decorator.
+    """
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+            recorder = _recorder
+            if recorder is None:
+                return func(*args, **kwargs)
+            return recorder.record(name, func, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _label(args: tuple) -> str | None:
+    """Finds the label of the portfolio a stage runs for.
+
+    Args:
+        args (tuple): The positional arguments of the stage.
+
+    Returns:
+        str | None: The label of the portfolio owning the stage, or
+            the label set with `portfolio_label`.
+    """
+    if args:
+        owner = getattr(args[0], '_portfolio', args[0])
+        label = getattr(owner, '_label', None)
+        if isinstance(label, str):
+            return label
+
+    return _current_label.get()
@@ -1,6 +1,21 @@
+import os
+import sys
+from collections.abc import Iterator
+from typing import TYPE_CHECKING
+
+import numpy as np
 import pandas as pd
 
+from portfoliomanager import metrics
+from portfoliomanager.cache import PortfolioCache
+from portfoliomanager.fx import FxRates
+from portfoliomanager.history import DateLike, PriceHistoryStore
+
+if TYPE_CHECKING:
+    from portfoliomanager.allocation import Allocation
+
 FULL_PERCENTAGE = 100
+SUMMED_COLUMNS = ('Amount', 'Current Value')
 
 
 class Portfolio:
@@ -9,14 +24,26 @@ class Portfolio:
     Attributes:
         _as (DataFrame): A DataFrame containing assets data.
         _al (DataFrame): A DataFrame containing allocation data.
+        _model (Allocation | None): The shared allocation `_al` belongs
+            to, None if the portfolio owns its allocation.
         _currency (str): The currency of the portfolio.
+        _cache (dict): The memoized derived views of the portfolio,
+            such as 'summary' and 'total_value'.
+        _label (str): The label of the portfolio in stage metrics.
+        _fx (FxRates | None): The exchange rates used to change the
+            currency of the portfolio.
     """
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         assets_file: str = 'assets.csv',
-        allocation_file: str = 'allocation.csv',
+        allocation_file: 'str | Allocation' = 'allocation.csv',
         currency: str = 'EUR',
+        *,
+        cache: PortfolioCache | None = None,
+        chunksize: int | None = None,
+        fx: FxRates | None = None,
+        compact: bool = False,
     ):
         """__init__ method.
 
@@ -26,38 +53,448 @@ class Portfolio:
         Args:
             assets_file (str): The file name of the assets csv.
                 Defaults to 'assets.csv'.
-            allocation_file (str): The file name of the allocation csv.
-                Defaults to 'allocation.csv'.
+            allocation_file (str | Allocation): The file name of the
+                allocation csv, or a shared allocation, which is
+                referenced instead of read again. Defaults to
+                'allocation.csv'.
             currency (str): The currency of the portfolio.
                 Defaults to 'EUR'.
+            cache (PortfolioCache | None): The on-disk cache of the
+                cleaned assets and allocation. Defaults to None, which
+                always parses the files.
+            chunksize (int | None): The number of rows of the assets
+                csv parsed and cleaned at a time. Defaults to None,
+                which reads the whole file at once.
+            fx (FxRates | None): The exchange rates used to change the
+                currency of the portfolio. Defaults to None.
+            compact (bool): Whether to store the portfolio in compact
+                mode, see `compact`. The 'Local Value' column is not
+                even parsed when the subclass knows where it is.
+                Defaults to False.
+        """
+        label = str(assets_file)
+
+        with metrics.portfolio_label(label):
+            assets = self.__class__._read_portfolio(  # noqa: SLF001
+                assets_file, cache=cache, chunksize=chunksize, compact=compact
+            )
+            allocation = allocation_file
+            if isinstance(allocation_file, str | os.PathLike):
+                allocation = self.__class__._read_allocation(allocation_file, cache=cache)  # noqa: SLF001
+        self._init_frames(assets, allocation, currency, fx=fx, label=label)
+
+        if compact:
+            self.compact()
+
+    @classmethod
+    def from_assets(
+        cls,
+        assets: pd.DataFrame,
+        allocation: 'pd.DataFrame | Allocation',
+        currency: str = 'EUR',
+        *,
+        fx: FxRates | None = None,
+        label: str = '',
+    ) -> 'Portfolio':
+        """Builds a portfolio from cleaned DataFrames.
+
+        Unlike `set_allocation`, the allocation is not validated, so
+        that views whose percentages are sums of groups can be built.
+
+        Args:
+            assets (DataFrame): The cleaned assets DataFrame, indexed
+                by ISIN. Without a 'Local Value' column, `local_values`
+                is not available.
+            allocation (DataFrame | Allocation): The allocation
+                DataFrame, indexed by ISIN, or a shared allocation.
+            currency (str): The currency of the portfolio.
+                Defaults to 'EUR'.
+            fx (FxRates | None): The exchange rates used to change the
+                currency of the portfolio. Defaults to None.
+            label (str): The label of the portfolio in stage metrics.
+                Defaults to ''.
+
+        Returns:
+            Portfolio: The portfolio.
+        """
+        portfolio = cls.__new__(cls)
+        portfolio._init_frames(assets, allocation, currency, fx=fx, label=label)  # noqa: SLF001
+        return portfolio
+
+    def _init_frames(
+        self,
+        assets: pd.DataFrame,
+        allocation: 'pd.DataFrame | Allocation',
+        currency: str,
+        *,
+        fx: FxRates | None,
+        label: str,
+    ) -> None:
+        """Sets the attributes shared by every way to build a portfolio.
+
+        Args:
+            assets (DataFrame): The cleaned assets DataFrame.
+            allocation (DataFrame | Allocation): The allocation.
+            currency (str): The currency of the portfolio.
+            fx (FxRates | None): The exchange rates.
+            label (str): The label of the portfolio in stage metrics.
         """
-        self._as = self.__class__._read_portfolio(assets_file)  # noqa: SLF001
-        self._al = self.__class__._read_allocation(allocation_file)  # noqa: SLF001
+        self._cache = {}
+        self._label = label
+        self._as = assets
+        if isinstance(allocation, pd.DataFrame):
+            self._model = None
+            self._al = allocation
+        else:
+            self._model = allocation
+            self._al = allocation.frame
         self._currency = currency
+        self._fx = fx
 
     @property
     def currency(self) -> str:
         """Returns the currency of the portfolio."""
         return self._currency
 
+    @currency.setter
+    def currency(self, currency: str) -> None:
+        """Changes the currency of the portfolio.
+
+        Every 'Current Value' is converted with one multiply by the
+        exchange rate between the old and the new currency.
+
+        Args:
+            currency (str): The new currency of the portfolio.
+
+        Raises:
+            ValueError: If the portfolio has no exchange rates, or they
+                don't include one of the currencies.
+        """
+        if currency == self._currency:
+            return
+
+        if self._fx is None:
+            msg = 'Exchange rates are required to change the currency of the portfolio.'
+            raise ValueError(msg)
+
+        self._as['Current Value'] = self._fx.convert(
+            self._as['Current Value'], self._currency, currency
+        )
+        self._currency = currency
+        self.invalidate_cache()
+
+    @property
+    def model(self) -> 'Allocation | None':
+        """Returns the shared allocation, None if not shared."""
+        return self._model
+
+    @property
+    def fx(self) -> FxRates | None:
+        """Returns the exchange rates of the portfolio."""
+        return self._fx
+
+    @fx.setter
+    def fx(self, fx: FxRates | None) -> None:
+        """Sets the exchange rates of the portfolio.
+
+        Args:
+            fx (FxRates | None): The new exchange rates.
+        """
+        self._fx = fx
+
+    @property
+    def local_values(self) -> pd.DataFrame:
+        """Returns the value of each asset in its local currency.
+
+        The 'Local Value' column is parsed once and memoized until the
+        cache is invalidated.
+
+        Raises:
+            ValueError: If the assets have no 'Local Value' column, e.g.
+                the portfolio was compacted.
+        """
+        if 'Local Value' not in self._as.columns:
+            msg = (
+                "The portfolio has no 'Local Value' column: it was compacted "
+                'or built without local values.'
+            )
+            raise ValueError(msg)
+
+        if 'local_values' not in self._cache:
+            self._cache['local_values'] = self.__class__._parse_local_values(  # noqa: SLF001
+                self._as['Local Value']
+            )
+
+        return self._cache['local_values'].copy()
+
+    def revalue_local(self) -> None:
+        """Recomputes 'Current Value' from the local values.
+
+        The local value of every asset is converted to the currency of
+        the portfolio with the exchange rates of the portfolio, in one
+        vectorized multiply.
+
+        Raises:
+            ValueError: If the portfolio has no exchange rates, or they
+                don't include one of the currencies.
+        """
+        if self._fx is None:
+            msg = 'Exchange rates are required to convert the local values.'
+            raise ValueError(msg)
+
+        local = self.local_values
+        self._as['Current Value'] = self._fx.convert(
+            local['Local Value'], local['Local Currency'], self._currency
+        )
+        self.invalidate_cache()
+
     @property
     def total_value(self) -> float:
-        """Calculates and returns the total value of the portfolio."""
-        return self._as['Current Value'].sum()
+        """Calculates and returns the total value of the portfolio.
+
+        The value is computed once and memoized until the cache is
+        invalidated.
+        """
+        if 'total_value' not in self._cache:
+            self._cache['total_value'] = self._as['Current Value'].sum()
+
+        return self._cache['total_value']
 
     @property
     def summary(self) -> pd.DataFrame:
         """Generates and returns a summary of the portfolio.
 
         The summary includes the product, current value, current
-        percentage, and expected percentage.
+        percentage, and expected percentage. It is computed once and
+        memoized until the cache is invalidated; every access returns
+        a copy, so callers are free to modify it.
+        """
+        if 'summary' not in self._cache:
+            self._cache['summary'] = self._build_summary()
+        elif self._cache.pop('stale_percentages', False):
+            summary = self._cache['summary']
+            summary['Current Percentage'] = (
+                summary['Current Value'] / self.total_value * 100
+            ).round(2)
+
+        return self._cache['summary'].copy()
+
+    def current_percentage(self, isin: str) -> float:
+        """Returns the current percentage of one asset.
+
+        Args:
+            isin (str): The ISIN of the asset.
+
+        Raises:
+            KeyError: If the asset is not owned.
+
+        Returns:
+            float: The current percentage, rounded like the summary.
+        """
+        return round(float(self._as.loc[isin, 'Current Value']) / self.total_value * 100, 2)
+
+    def update_prices(self, prices: pd.Series) -> None:
+        """Applies new prices to a few owned assets.
+
+        Only the changed rows are touched: their 'Current Value',
+        'Closing' and 'Local Value', the running total value and the
+        rows of the memoized summary. The current percentages, which
+        all depend on the total, are recomputed with one vectorized
+        division the next time the summary is read. The local values
+        move with the current values, at unchanged exchange rates.
+
+        Args:
+            prices (Series): The new price of one share in the currency
+                of the portfolio, indexed by ISIN.
+
+        Raises:
+            KeyError: If an asset is not owned.
+            ValueError: If an ISIN is repeated.
+        """
+        positions = self._positions(prices.index)
+        amounts = self._as['Amount'].to_numpy(dtype=float)[positions]
+        old_values = self._as['Current Value'].to_numpy(dtype=float)[positions]
+        new_values = amounts * prices.to_numpy(dtype=float)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where(old_values != 0, new_values / old_values, np.nan)
+        old_closing = self._as['Closing'].to_numpy(dtype=float)[positions]
+        _write(
+            self._as,
+            positions,
+            'Closing',
+            np.where(np.isnan(ratio), old_closing, old_closing * ratio),
+        )
+
+        self._set_values(prices.index, positions, old_values, new_values)
+
+    def update_positions(self, amounts: pd.Series) -> None:
+        """Applies new share amounts to a few owned assets.
+
+        Each asset keeps its current price. Like `update_prices`, only
+        the changed rows and the running aggregates are touched.
+
+        Args:
+            amounts (Series): The new number of shares held, indexed by
+                ISIN.
+
+        Raises:
+            KeyError: If an asset is not owned.
+            ValueError: If an ISIN is repeated, or the price of an asset
+                is unknown because it is held with an amount of 0.
+        """
+        positions = self._positions(amounts.index)
+        old_amounts = self._as['Amount'].to_numpy(dtype=float)[positions]
+        old_values = self._as['Current Value'].to_numpy(dtype=float)[positions]
+
+        if (old_amounts == 0).any():
+            msg = (
+                'The price of an asset held with an amount of 0 is unknown: '
+                f'{list(amounts.index[old_amounts == 0])}. Use set_assets instead.'
+            )
+            raise ValueError(msg)
+
+        new_amounts = amounts.to_numpy(dtype=float)
+        _write(self._as, positions, 'Amount', new_amounts)
+        self._set_values(
+            amounts.index, positions, old_values, old_values / old_amounts * new_amounts
+        )
+
+    def _positions(self, isins: pd.Index) -> np.ndarray:
+        """Finds the rows of some owned assets.
+
+        Args:
+            isins (Index): The ISINs of the assets.
+
+        Raises:
+            KeyError: If an asset is not owned.
+            ValueError: If an ISIN is repeated.
+
+        Returns:
+            ndarray: The position of every asset in the assets.
         """
-        summary = self._as.drop(['Amount', 'Closing', 'Local Value'], axis=1)
+        if not isins.is_unique:
+            repeated = list(isins[isins.duplicated()].unique())
+            msg = f'Every asset must be updated once, got repeated ISINs: {repeated}.'
+            raise ValueError(msg)
+
+        positions = self._as.index.get_indexer(isins)
+
+        if (positions < 0).any():
+            msg = f'Assets not in the portfolio: {list(isins[positions < 0])}.'
+            raise KeyError(msg)
+
+        return positions
+
+    def _set_values(
+        self,
+        isins: pd.Index,
+        positions: np.ndarray,
+        old_values: np.ndarray,
+        new_values: np.ndarray,
+    ) -> None:
+        """Writes new values and updates the memoized aggregates.
+
+        The 'Local Value' of the changed assets is scaled like their
+        'Current Value', or left as is when it was 0.
+
+        Args:
+            isins (Index): The ISINs of the changed assets.
+            positions (ndarray): Their rows in the assets.
+            old_values (ndarray): Their previous 'Current Value'.
+            new_values (ndarray): Their new 'Current Value'.
+        """
+        if 'Local Value' in self._as.columns:
+            column = self._as.columns.get_loc('Local Value')
+            local = self.__class__._parse_local_values(self._as.iloc[positions, column])  # noqa: SLF001
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ratio = np.where(old_values != 0, new_values / old_values, 1.0)
+            local['Local Value'] = local['Local Value'] * ratio
+            self._as.iloc[positions, column] = self.__class__._format_local_values(local)  # noqa: SLF001
+            self._cache.pop('local_values', None)
+
+        _write(self._as, positions, 'Current Value', new_values)
+
+        if 'total_value' in self._cache:
+            self._cache['total_value'] += new_values.sum() - old_values.sum()
+
+        if 'summary' in self._cache:
+            summary = self._cache['summary']
+            _write(summary, summary.index.get_indexer(isins), 'Current Value', new_values)
+            self._cache['stale_percentages'] = True
+
+    @property
+    def prices(self) -> pd.Series:
+        """Returns the price of one share of each owned asset.
+
+        The prices are in the currency of the portfolio, derived from
+        the current value and amount of each asset, since the
+        'Closing' column is quoted in the local currency of the asset.
+        """
+        return (self._as['Current Value'] / self._as['Amount']).rename('Price')
+
+    def refresh_closing(self, closing: pd.Series, products: pd.Series | None = None) -> None:
+        """Replaces the closing prices of the assets in place.
+
+        'Current Value' is scaled by the change of each closing price,
+        which keeps the exchange rate implied by the export for the
+        assets quoted in another currency. Assets missing from
+        `closing`, or without a previous closing price, keep their
+        values.
+
+        Args:
+            closing (Series): The new closing prices in the local
+                currency of each asset, indexed by ISIN.
+            products (Series | None): The new print names of the
+                assets, indexed by ISIN. Defaults to None.
+        """
+        new_closing = closing.reindex(self._as.index)
+        ratio = (new_closing / self._as['Closing']).where(self._as['Closing'] > 0)
+        updated = ratio.notna()
+
+        self._as.loc[updated, 'Current Value'] = (
+            self._as.loc[updated, 'Current Value'] * ratio[updated]
+        ).round(2)
+        self._as['Closing'] = new_closing.fillna(self._as['Closing'])
+        if products is not None:
+            self._as['Product'] = products.reindex(self._as.index).fillna(self._as['Product'])
+
+        self.invalidate_cache()
+
+    def revalue(self, store: PriceHistoryStore, day: DateLike) -> pd.Series:
+        """Values the holdings of the portfolio as of a date.
+
+        The prices are read from a price history store, in the
+        currency of the portfolio, without re-reading the csv files.
+
+        Args:
+            store (PriceHistoryStore): The store of the daily prices.
+            day (DateLike): The date of the valuation. If the store has
+                no prices on that date, the last earlier date is used.
+
+        Raises:
+            ValueError: If the date is before the first date of the
+                store.
+
+        Returns:
+            Series: The value of every owned asset, indexed by ISIN,
+                NaN for the assets without a price in the store.
+        """
+        prices = store.prices_on(day).reindex(self._as.index)
+        return (self._as['Amount'] * prices).rename('Current Value')
+
+    @metrics.stage('summary')
+    def _build_summary(self) -> pd.DataFrame:
+        """Builds the summary of the portfolio.
+
+        Returns:
+            DataFrame: The summary of the portfolio.
+        """
+        summary = self._as.drop(['Amount', 'Closing', 'Local Value'], axis=1, errors='ignore')
         summary = summary.merge(self._al, how='outer', left_index=True, right_index=True)
         summary = summary.fillna({'Current Value': 0, 'Expected Percentage': 0})
-        summary['Current Percentage'] = (summary['Current Value'] / self.total_value * 100).apply(
-            lambda x: round(x, 2)
-        )
+        current = summary['Current Value'] / self.total_value * 100
+        summary['Current Percentage'] = current.round(2)
 
         return summary[
             [
@@ -68,12 +505,129 @@ class Portfolio:
             ]
         ]
 
+    def compact(self, *, float_dtype: str = 'float64') -> None:
+        """Shrinks the memory held by the portfolio.
+
+        Drops the 'Local Value' column, which only `local_values` reads,
+        and interns the ISINs and product names, so every compact
+        portfolio holding the same asset shares one copy of its
+        strings. The float columns can also be narrowed, e.g. to
+        'float32', at the cost of precision: values above 100000 are
+        no longer exact to the cent.
+
+        Args:
+            float_dtype (str): The dtype of the float columns.
+                Defaults to 'float64'.
+        """
+        assets = self._as.drop(columns='Local Value', errors='ignore')
+        assets.index = _intern(assets.index)
+        assets['Product'] = _intern(assets['Product'])
+        floats = assets.select_dtypes('float').columns
+        assets[floats] = assets[floats].astype(float_dtype)
+
+        self._as = assets
+        if self._model is None:
+            self._al = self._al.set_axis(_intern(self._al.index))
+        self.invalidate_cache()
+
+    def memory_usage(self) -> pd.Series:
+        """Reports the memory held by the portfolio.
+
+        The strings are counted apart, once each, because interned
+        strings are shared between portfolios.
+
+        Returns:
+            Series: The bytes of the 'Assets', the 'Allocation' and the
+                memoized views in the 'Cache' without their strings,
+                of the 'Strings', and their 'Total'.
+        """
+        cache = self._cache.values()
+        usage = pd.Series(
+            {
+                'Assets': self._as.memory_usage(deep=False).sum(),
+                'Allocation': self._al.memory_usage(deep=False).sum(),
+                'Cache': sum(
+                    value.memory_usage(deep=False).sum()
+                    if isinstance(value, pd.DataFrame)
+                    else sys.getsizeof(value)
+                    for value in cache
+                ),
+                'Strings': sum(self._strings().values()),
+            },
+            name='Bytes',
+        )
+        usage['Total'] = usage.sum()
+        return usage
+
+    def _strings(self) -> dict[int, int]:
+        """Finds the strings held by the portfolio.
+
+        Returns:
+            dict[int, int]: The size of every string, keyed by its id.
+        """
+        frames = [self._as, self._al]
+        frames += [value for value in self._cache.values() if isinstance(value, pd.DataFrame)]
+
+        strings = {}
+        for frame in frames:
+            for values in (frame.index, *(frame[col] for col in frame.columns)):
+                if values.dtype == object:
+                    strings.update(
+                        (id(value), sys.getsizeof(value))
+                        for value in values
+                        if isinstance(value, str)
+                    )
+
+        return strings
+
+    def invalidate_cache(self) -> None:
+        """Discards the memoized summary and total value.
+
+        Must be called after modifying the assets or the allocation
+        DataFrames in place.
+        """
+        self._cache.clear()
+
+    def set_assets(self, assets: pd.DataFrame) -> None:
+        """Replaces the assets of the portfolio.
+
+        Args:
+            assets (DataFrame): The cleaned assets DataFrame, indexed
+                by ISIN.
+        """
+        self._as = assets
+        self.invalidate_cache()
+
+    def set_allocation(self, allocation: 'pd.DataFrame | Allocation') -> None:
+        """Replaces the allocation of the portfolio.
+
+        Args:
+            allocation (DataFrame | Allocation): The allocation
+                DataFrame, indexed by ISIN, or a shared allocation,
+                which is already validated.
+
+        Raises:
+            ValueError: If the sum of the 'Expected Percentage'
+                column is not 100.
+        """
+        if isinstance(allocation, pd.DataFrame):
+            Portfolio._validate_allocation(allocation)
+            self._model = None
+            self._al = allocation
+        else:
+            self._model = allocation
+            self._al = allocation.frame
+        self.invalidate_cache()
+
     @staticmethod
-    def _read_file(file: str) -> pd.DataFrame:
+    @metrics.stage('read_file')
+    def _read_file(file: str, *, usecols: list[int] | None = None) -> pd.DataFrame:
         """Reads a csv file and returns a DataFrame.
 
         Args:
             file (str): The file name of the csv.
+            usecols (list[int] | None): The positions of the columns to
+                parse. Defaults to None, which parses every column.
 
         Raises:
             FileNotFoundError: If the file does not exist.
@@ -82,11 +636,74 @@ class Portfolio:
             DataFrame: The DataFrame constructed from the csv file.
         """
         try:
-            return pd.read_csv(file)
+            return pd.read_csv(file, usecols=usecols)
         except FileNotFoundError as e:
             print(e)
             raise FileNotFoundError(e) from None
 
+    @staticmethod
+    def _read_file_chunks(
+        file: str, chunksize: int, *, usecols: list[int] | None = None
+    ) -> Iterator[pd.DataFrame]:
+        """Reads a csv file in chunks.
+
+        Args:
+            file (str): The file name of the csv.
+            chunksize (int): The number of rows of each chunk.
+            usecols (list[int] | None): The positions of the columns to
+                parse. Defaults to None, which parses every column.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+
+        Yields:
+            DataFrame: The DataFrame constructed from each chunk.
+        """
+        try:
+            with pd.read_csv(file, chunksize=chunksize, usecols=usecols) as reader:
+                yield from reader
+        except FileNotFoundError as e:
+            print(e)
+            raise FileNotFoundError(e) from None
+
+    @staticmethod
+    def _read_header(file: str) -> pd.Index:
+        """Reads the column names of a csv file.
+
+        Args:
+            file (str): The file name of the csv.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+
+        Returns:
+            Index: The column names.
+        """
+        try:
+            return pd.read_csv(file, nrows=0).columns
+        except FileNotFoundError as e:
+            print(e)
+            raise FileNotFoundError(e) from None
+
+    @staticmethod
+    def _aggregate_isin(df: pd.DataFrame) -> pd.DataFrame:
+        """Aggregates the rows of a DataFrame sharing the same ISIN.
+
+        The 'Amount' and 'Current Value' columns are summed, every
+        other column keeps its first non-null value.
+
+        Args:
+            df (DataFrame): The DataFrame to process, indexed by ISIN.
+
+        Returns:
+            DataFrame: The processed DataFrame.
+        """
+        if df.index.is_unique:
+            return df
+
+        aggregations = {col: 'sum' if col in SUMMED_COLUMNS else 'first' for col in df.columns}
+        return df.groupby(level=0, sort=False).agg(aggregations)
+
     @staticmethod
     def _replace_columns(df: pd.DataFrame) -> pd.DataFrame:
         """Method to be implemented.
@@ -101,6 +718,7 @@ class Portfolio:
         raise NotImplementedError
 
     @staticmethod
+    @metrics.stage('dropna_isin')
     def _dropna_isin(df: pd.DataFrame) -> pd.DataFrame:
         """Drops NaN values from the 'ISIN' column in a DataFrame.
 
@@ -113,6 +731,7 @@ class Portfolio:
         return df.dropna(subset=['ISIN'])
 
     @staticmethod
+    @metrics.stage('set_index_isin')
     def _set_index_isin(df: pd.DataFrame) -> pd.DataFrame:
         """Sets the 'ISIN' column as the index of a DataFrame.
 
@@ -137,6 +756,50 @@ class Portfolio:
         """
         raise NotImplementedError
 
+    @staticmethod
+    def _parse_local_values(local_values: pd.Series) -> pd.DataFrame:
+        """Method to be implemented.
+
+        Placeholder for a method that splits the 'Local Value' column
+        into a currency and an amount.
+
+        Raises:
+            NotImplementedError: This method needs to be implemented
+                in a subclass.
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def _format_local_values(local_values: pd.DataFrame) -> pd.Series:
+        """Method to be implemented.
+
+        Placeholder for the inverse of `_parse_local_values`, which
+        joins a currency and an amount into a 'Local Value'.
+
+        Raises:
+            NotImplementedError: This method needs to be implemented
+                in a subclass.
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def _compact_usecols(header: pd.Index) -> list[int] | None:  # noqa: ARG004
+        """Returns the columns to parse for a compact portfolio.
+
+        A subclass that knows where the 'Local Value' column is returns
+        the positions of every other column, so that it is never
+        parsed, and its `_clean_portfolio` must then accept
+        `local_value=False`.
+
+        Args:
+            header (Index): The column names of the portfolio csv.
+
+        Returns:
+            list[int] | None: The positions to parse, None to parse
+                every column and drop 'Local Value' afterwards.
+        """
+        return None
+
     @staticmethod
     def _clean_portfolio(df: pd.DataFrame) -> pd.DataFrame:
         """Method to be implemented.
@@ -150,16 +813,136 @@ class Portfolio:
         raise NotImplementedError
 
     @classmethod
-    def _read_portfolio(cls, portfolio_file: str) -> pd.DataFrame:
+    def _read_portfolio(
+        cls,
+        portfolio_file: str,
+        *,
+        cache: PortfolioCache | None = None,
+        chunksize: int | None = None,
+        compact: bool = False,
+    ) -> pd.DataFrame:
         """Reads a portfolio file and cleans the resulting DataFrame.
 
         Args:
             portfolio_file (str): The file name of the portfolio csv.
+            cache (PortfolioCache | None): The on-disk cache of the
+                cleaned DataFrame. Defaults to None.
+            chunksize (int | None): The number of rows parsed and
+                cleaned at a time. Defaults to None, which reads the
+                whole file at once.
+            compact (bool): Whether to skip the 'Local Value' column,
+                if `_compact_usecols` locates it. Defaults to False.
 
         Returns:
             DataFrame: The cleaned portfolio DataFrame.
         """
-        return cls._clean_portfolio(Portfolio._read_file(portfolio_file))
+        usecols = None
+        if compact:
+            usecols = cls._compact_usecols(Portfolio._read_header(portfolio_file))
+
+        def read() -> pd.DataFrame:
+            if chunksize is None:
+                return cls._clean_parsed(
+                    Portfolio._read_file(portfolio_file, usecols=usecols), usecols
+                )
+            return cls._stream_portfolio(portfolio_file, chunksize, usecols=usecols)
+
+        if cache is None:
+            return read()
+
+        namespace = f'{cls.__module__}.{cls.__qualname__}'
+        if chunksize is not None:
+            namespace = f'{namespace}.stream'
+        if usecols is not None:
+            namespace = f'{namespace}.compact'
+
+        return cache.fetch(portfolio_file, namespace, read)
+
+    @classmethod
+    def _stream_portfolio(
+        cls, portfolio_file: str, chunksize: int, *, usecols: list[int] | None = None
+    ) -> pd.DataFrame:
+        """Reads a portfolio file in chunks and cleans each of them.
+
+        Every chunk is cleaned and aggregated by ISIN as soon as it is
+        parsed, and the aggregates are concatenated and aggregated once
+        at the end, so the peak memory is bounded by the chunk size and
+        the aggregated rows rather than by the size of the file.
+
+        Args:
+            portfolio_file (str): The file name of the portfolio csv.
+            chunksize (int): The number of rows of each chunk.
+            usecols (list[int] | None): The positions of the columns to
+                parse, see `_compact_usecols`. Defaults to None.
+
+        Returns:
+            DataFrame: The cleaned portfolio DataFrame, with one row
+                per ISIN.
+        """
+        aggregates = [
+            cls._aggregate_holdings(cls._clean_parsed(chunk, usecols))
+            for chunk in Portfolio._read_file_chunks(portfolio_file, chunksize, usecols=usecols)
+        ]
+
+        if not aggregates:
+            return cls._clean_parsed(
+                Portfolio._read_file(portfolio_file, usecols=usecols), usecols
+            )
+
+        return cls._aggregate_holdings(pd.concat(aggregates))
+
+    @classmethod
+    def _aggregate_holdings(cls, df: pd.DataFrame) -> pd.DataFrame:
+        """Aggregates the rows of a DataFrame sharing the same ISIN.
+
+        Like `_aggregate_isin`, and the 'Local Value' column, if any,
+        is summed too, so that it stays in step with 'Current Value'.
+
+        Args:
+            df (DataFrame): The cleaned DataFrame, indexed by ISIN.
+
+        Raises:
+            ValueError: If the rows of an ISIN have local values in
+                several currencies.
+
+        Returns:
+            DataFrame: The processed DataFrame.
+        """
+        if df.index.is_unique:
+            return df
+
+        aggregated = Portfolio._aggregate_isin(df)
+        if 'Local Value' not in df.columns:
+            return aggregated
+
+        grouped = cls._parse_local_values(df['Local Value']).groupby(level=0, sort=False)
+        currencies = grouped['Local Currency'].nunique()
+        if (currencies > 1).any():
+            msg = (
+                'Every holding of an ISIN must have the same local currency, got '
+                f'{list(currencies.index[currencies > 1])}.'
+            )
+            raise ValueError(msg)
+
+        local = grouped.agg({'Local Currency': 'first', 'Local Value': 'sum'})
+        aggregated['Local Value'] = cls._format_local_values(local)
+        return aggregated
+
+    @classmethod
+    def _clean_parsed(cls, df: pd.DataFrame, usecols: list[int] | None) -> pd.DataFrame:
+        """Cleans a DataFrame parsed with or without 'Local Value'.
+
+        Args:
+            df (DataFrame): The parsed DataFrame.
+            usecols (list[int] | None): The positions it was parsed
+                with, see `_compact_usecols`.
+
+        Returns:
+            DataFrame: The cleaned DataFrame.
+        """
+        if usecols is None:
+            return cls._clean_portfolio(df)
+        return cls._clean_portfolio(df, local_value=False)
 
     @staticmethod
     def _validate_allocation_percentage_sum(allocation: pd.DataFrame) -> bool:
@@ -177,11 +960,15 @@ class Portfolio:
         return allocation['Expected Percentage'].sum() == FULL_PERCENTAGE
 
     @staticmethod
-    def _read_allocation(allocation_file: str) -> pd.DataFrame:
+    def _read_allocation(
+        allocation_file: str, *, cache: PortfolioCache | None = None
+    ) -> pd.DataFrame:
         """Reads allocation file and validates the resulting DataFrame.
 
         Args:
             allocation_file (str): The file name of the allocation csv.
+            cache (PortfolioCache | None): The on-disk cache of the
+                validated DataFrame. Defaults to None.
 
         Raises:
             ValueError: If the sum of the 'Expected Percentage'
@@ -190,10 +977,63 @@ class Portfolio:
         Returns:
             DataFrame: The validated allocation DataFrame.
         """
-        allocation = Portfolio._read_file(allocation_file)
 
+        def read() -> pd.DataFrame:
+            allocation = Portfolio._read_file(allocation_file)
+            Portfolio._validate_allocation(allocation)
+            return Portfolio._set_index_isin(allocation)
+
+        if cache is None:
+            return read()
+
+        return cache.fetch(allocation_file, 'allocation', read)
+
+    @staticmethod
+    def _validate_allocation(allocation: pd.DataFrame) -> None:
+        """Validates an allocation DataFrame.
+
+        Args:
+            allocation (DataFrame): The DataFrame to validate.
+
+        Raises:
+            ValueError: If the sum of the 'Expected Percentage'
+                column is not 100.
+        """
         if not Portfolio._validate_allocation_percentage_sum(allocation):
             msg = 'The total sum of percentages in the "Expected Percentage" column is not 100%'
             raise ValueError(msg)
 
-        return Portfolio._set_index_isin(allocation)
+
+def _write(frame: pd.DataFrame, positions: np.ndarray, column: str, values: np.ndarray) -> None:
+    """Writes values into some rows of a column, keeping its dtype.
+
+    Args:
+        frame (DataFrame): The DataFrame to write into.
+        positions (ndarray): The rows to write.
+        column (str): The column to write.
+        values (ndarray): The new values.
+    """
+    frame.iloc[positions, frame.columns.get_loc(column)] = np.asarray(
+        values, dtype=frame[column].dtype
+    )
+
+
+def _intern(values: pd.Index | pd.Series) -> pd.Index | pd.Series:
+    """Replaces the strings of an index or a column by interned ones.
+
+    Args:
+        values (Index | Series): The strings.
+
+    Returns:
+        Index | Series: The same strings, shared with every other
+            interned copy.
+    """
+    interned = np.array(
+        [sys.intern(value) if isinstance(value, str) else value for value in values],
+        dtype=object,
+    )
+
+    if isinstance(values, pd.Index):
+        return pd.Index(interned, name=values.name, dtype=object)
+
+    return pd.Series(interned, index=values.index, name=values.name, dtype=object)
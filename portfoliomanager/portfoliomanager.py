@@ -1,6 +1,13 @@
+from collections.abc import Mapping
+
+import numpy as np
 import pandas as pd
 
+from portfoliomanager import metrics
+from portfoliomanager.fees import DEFAULT_TOLERANCE, FeeSchedule, exchange_fees, trade_fees
+from portfoliomanager.lite import no_sell_values, sell_values
 from portfoliomanager.portfolio import Portfolio
+from portfoliomanager.solvers import allocate_shares, select_trades, to_cents, water_fill
 
 
 class PortfolioManager:
@@ -21,6 +28,7 @@ class PortfolioManager:
         """
         self._portfolio = portfolio
 
+    @metrics.stage('rebalance_sell')
     def rebalance_sell(self) -> pd.DataFrame:
         """Rebalance with sell operations.
 
@@ -32,9 +40,9 @@ class PortfolioManager:
                 values, percentages, and movements.
         """
         summary = self._portfolio.summary
-        summary['Expected Value'] = (
-            self._portfolio.total_value / 100 * summary['Expected Percentage']
-        ).round(2)
+        summary['Expected Value'] = sell_values(
+            self._portfolio.total_value, summary['Expected Percentage'].tolist()
+        )
 
         summary['Movement'] = summary['Expected Value'] - summary['Current Value']
         return summary[
@@ -48,6 +56,7 @@ class PortfolioManager:
             ]
         ]
 
+    @metrics.stage('rebalance_no_sell')
     def rebalance_no_sell(self) -> pd.DataFrame:
         """Rebalance without sell operations.
 
@@ -78,13 +87,11 @@ class PortfolioManager:
 
             raise ValueError(msg)
 
-        max_isin = (summary['Current Percentage'] / summary['Expected Percentage']).idxmax()
-
-        summary['Expected Value'] = (
-            summary['Expected Percentage']
-            * summary.loc[max_isin]['Current Value']
-            / summary.loc[max_isin]['Expected Percentage']
-        ).round(2)
+        summary['Expected Value'] = no_sell_values(
+            summary['Current Value'].tolist(),
+            summary['Expected Percentage'].tolist(),
+            summary['Current Percentage'].tolist(),
+        )
 
         summary['Movement'] = summary['Expected Value'] - summary['Current Value']
 
@@ -98,3 +105,150 @@ class PortfolioManager:
                 'Movement',
             ]
         ]
+
+    @metrics.stage('rebalance_deposit')
+    def rebalance_deposit(self, deposit: float) -> pd.DataFrame:
+        """Rebalance without sell operations by spending a deposit.
+
+        Spends exactly `deposit`, rounded to the cent, filling the most
+        underweight assets first until they reach a common weight.
+        Unlike `rebalance_no_sell`, the cash needed is bounded, and
+        assets owned with an expected percentage of 0 are simply not
+        bought.
+
+        Args:
+            deposit (float): The amount to invest.
+
+        Raises:
+            ValueError: If the deposit is negative.
+
+        Returns:
+            DataFrame: A DataFrame showing the current and expected
+                values, percentages, and movements.
+        """
+        summary = self._portfolio.summary
+        current = summary['Current Value'].to_numpy(dtype=float)
+
+        buys = water_fill(current, summary['Expected Percentage'].to_numpy(dtype=float), deposit)
+        summary['Movement'] = to_cents(buys, deposit)[0] / 100
+        summary['Expected Value'] = np.round(current + summary['Movement'], 2)
+
+        return summary[
+            [
+                'Product',
+                'Current Value',
+                'Expected Value',
+                'Current Percentage',
+                'Expected Percentage',
+                'Movement',
+            ]
+        ]
+
+    @metrics.stage('rebalance_fees')
+    def rebalance_fees(
+        self,
+        fees: FeeSchedule | Mapping[str, FeeSchedule],
+        *,
+        tolerance: float = DEFAULT_TOLERANCE,
+        min_trade: float = 0.0,
+        exchanges: pd.Series | None = None,
+    ) -> pd.DataFrame:
+        """Rebalance with the fewest and cheapest trades.
+
+        Only the assets whose current percentage is further than
+        `tolerance` from their expected percentage are traded back to
+        it, and the cash they need, fees included, is raised by selling
+        the overweight assets that are cheapest to sell, see
+        `select_trades`. The other assets are left as they are.
+
+        Args:
+            fees (FeeSchedule | Mapping[str, FeeSchedule]): One fee
+                schedule for every exchange, or the schedule of each
+                exchange.
+            tolerance (float): The largest deviation from the expected
+                percentage left untraded, in percentage points.
+                Defaults to 1.
+            min_trade (float): The smallest value traded. Defaults to 0.
+            exchanges (Series | None): The exchange of each ISIN,
+                required with a fee schedule per exchange. Defaults to
+                None.
+
+        Raises:
+            ValueError: If there is a fee schedule per exchange and an
+                ISIN has no exchange, or an exchange has no fee
+                schedule.
+
+        Returns:
+            DataFrame: A DataFrame showing the current and expected
+                values, percentages, movements and the fee of every
+                movement.
+        """
+        rebalance = self.rebalance_sell()
+        fixed, rates = exchange_fees(fees, rebalance.index, exchanges)
+        band = self._portfolio.total_value * tolerance / 100
+
+        movements = select_trades(
+            rebalance['Movement'].to_numpy(dtype=float), band, fixed, rates, min_trade
+        )[0]
+        rebalance['Movement'] = movements
+        rebalance['Expected Value'] = np.round(rebalance['Current Value'] + movements, 2)
+        rebalance['Fee'] = trade_fees(movements, fixed, rates)
+
+        return rebalance
+
+    @metrics.stage('orders')
+    def orders(
+        self,
+        rebalance: pd.DataFrame,
+        prices: pd.Series | None = None,
+        cash: float | None = None,
+    ) -> pd.DataFrame:
+        """Turns the movements of a rebalance into whole-share orders.
+
+        The movements are truncated to whole shares, then the cash
+        left over is handed out one share at a time to the asset with
+        the largest remaining deviation from its movement, so the
+        orders never spend more than the movements and every asset
+        ends within one share of its movement.
+
+        Args:
+            rebalance (DataFrame): The result of one of the rebalance
+                methods.
+            prices (Series | None): The price of one share of each
+                ISIN, in the currency of the portfolio, overriding the
+                prices of the portfolio. Required for the assets that
+                are not owned yet. Defaults to None.
+            cash (float | None): The net cash the orders may spend.
+                Defaults to None, which uses the sum of the movements.
+
+        Raises:
+            ValueError: If an asset to buy or sell has no price.
+
+        Returns:
+            DataFrame: A DataFrame showing the price, the movement, the
+                number of shares to buy (positive) or sell (negative)
+                and the value of the order of each asset.
+        """
+        own_prices = self._portfolio.prices
+        if prices is not None:
+            own_prices = prices.combine_first(own_prices)
+        price = own_prices.reindex(rebalance.index).rename('Price')
+
+        missing = (rebalance['Movement'] != 0) & ~(price > 0)
+        if missing.any():
+            msg = (
+                'A price is required for every asset to buy or sell. The '
+                'following assets have no price:\n\n'
+                f'{rebalance[missing][["Product", "Movement"]]}'
+                '\n\nPlease pass their prices and try again.'
+            )
+
+            raise ValueError(msg)
+
+        orders = rebalance[['Product']].assign(Price=price, Movement=rebalance['Movement'])
+        orders['Shares'] = allocate_shares(
+            orders['Movement'].to_numpy(dtype=float), price.to_numpy(dtype=float), cash
+        )[0]
+        orders['Order Value'] = (orders['Shares'] * price.fillna(0)).round(2)
+
+        return orders
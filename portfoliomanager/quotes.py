@@ -0,0 +1,389 @@
+import asyncio
+import json
+import time
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from dataclasses import asdict, dataclass
+from urllib.parse import parse_qs, quote, urlsplit
+
+import pandas as pd
+
+from portfoliomanager._http import ConnectionPool, HTTPError, read_headers
+from portfoliomanager.portfolio import Portfolio
+
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_TTL = 300.0
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.1
+
+
+@dataclass(frozen=True)
+class Quote:
+    """The latest quote of an asset.
+
+    Attributes:
+        isin (str): The ISIN of the asset.
+        name (str | None): The print name of the asset.
+        close (float): The latest closing price, in the local currency
+            of the asset.
+    """
+
+    isin: str
+    name: str | None
+    close: float
+
+
+class QuoteProvider:
+    """A source of asset quotes."""
+
+    async def fetch(self, isins: Sequence[str]) -> list[Quote]:
+        """Method to be implemented.
+
+        Placeholder for a method that fetches the quotes of one batch
+        of ISINs. ISINs unknown to the source are left out.
+
+        Raises:
+            NotImplementedError: This method needs to be implemented
+                in a subclass.
+        """
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """Releases the resources held by the provider."""
+
+
+class HttpQuoteProvider(QuoteProvider):
+    """A quote provider backed by an HTTP JSON API.
+
+    Every batch is one `GET {url}/quotes?isins=ISIN1,ISIN2,...` request
+    over a pool of keep-alive connections. The response is expected as
+    `{"quotes": [{"isin": ..., "name": ..., "close": ...}, ...]}`.
+
+    Attributes:
+        _path (str): The path of the quotes endpoint.
+        _pool (ConnectionPool): The pooled connections to the API.
+    """
+
+    def __init__(self, url: str, *, pool_size: int = 8, timeout: float = 10.0):
+        """__init__ method.
+
+        Constructs all the necessary attributes for the HTTP quote
+        provider object.
+
+        Args:
+            url (str): The base url of the API.
+            pool_size (int): The maximum number of open connections.
+                Defaults to 8.
+            timeout (float): The timeout of every request, in seconds.
+                Defaults to 10.
+        """
+        self._path = urlsplit(url).path.rstrip('/') + '/quotes'
+        self._pool = ConnectionPool(url, size=pool_size, timeout=timeout)
+
+    @property
+    def connections_opened(self) -> int:
+        """Returns the number of connections opened so far."""
+        return self._pool.opened
+
+    async def fetch(self, isins: Sequence[str]) -> list[Quote]:
+        """Fetches the quotes of one batch of ISINs.
+
+        Args:
+            isins (Sequence[str]): The ISINs to quote.
+
+        Raises:
+            HTTPError: If the API answers with an error status.
+            OSError: If the connection fails.
+            ValueError: If the response is not valid JSON.
+
+        Returns:
+            list[Quote]: The quotes found.
+        """
+        body = await self._pool.get(f'{self._path}?isins={quote(",".join(isins), safe=",")}')
+        return [
+            Quote(item['isin'], item.get('name'), float(item['close']))
+            for item in json.loads(body)['quotes']
+        ]
+
+    async def close(self) -> None:
+        """Closes the pooled connections."""
+        await self._pool.close()
+
+
+class QuoteFetcher:
+    """Fetches quotes in concurrent batches, with retries and a cache.
+
+    Attributes:
+        _provider (QuoteProvider): The source of the quotes.
+        _batch_size (int): The number of ISINs of every request.
+        _max_concurrency (int): The number of requests in flight.
+        _ttl (float): How long a quote stays cached, in seconds.
+        _retries (int): The number of retries of a failed request.
+        _backoff (float): The delay before the first retry, in
+            seconds, doubled after every retry.
+        _clock (Callable[[], float]): The clock of the cache.
+        _cache (dict[str, tuple[float, Quote]]): The cached quotes
+            and their expiry time, by ISIN.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        provider: QuoteProvider,
+        *,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        ttl: float = DEFAULT_TTL,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """__init__ method.
+
+        Constructs all the necessary attributes for the quote fetcher
+        object.
+
+        Args:
+            provider (QuoteProvider): The source of the quotes.
+            batch_size (int): The number of ISINs of every request.
+                Defaults to 50.
+            max_concurrency (int): The number of requests in flight.
+                Defaults to 4.
+            ttl (float): How long a quote stays cached, in seconds.
+                Defaults to 300.
+            retries (int): The number of retries of a request failing
+                with a connection error, a timeout, or a 429 or 5xx
+                status. Defaults to 3.
+            backoff (float): The delay before the first retry, in
+                seconds, doubled after every retry. Defaults to 0.1.
+            clock (Callable[[], float]): The clock of the cache.
+                Defaults to `time.monotonic`.
+        """
+        self._provider = provider
+        self._batch_size = batch_size
+        self._max_concurrency = max_concurrency
+        self._ttl = ttl
+        self._retries = retries
+        self._backoff = backoff
+        self._clock = clock
+        self._cache = {}
+
+    async def fetch(self, isins: Iterable[str]) -> dict[str, Quote]:
+        """Fetches the quotes of many ISINs.
+
+        Duplicate ISINs are requested once, and ISINs with a fresh
+        cached quote are not requested at all.
+
+        Args:
+            isins (Iterable[str]): The ISINs to quote.
+
+        Raises:
+            OSError: If a request still fails after every retry.
+
+        Returns:
+            dict[str, Quote]: The quotes found, by ISIN.
+        """
+        now = self._clock()
+        quotes = {}
+        missing = []
+
+        for isin in dict.fromkeys(isins):
+            cached = self._cache.get(isin)
+            if cached is not None and cached[0] > now:
+                quotes[isin] = cached[1]
+            else:
+                missing.append(isin)
+
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+        batches = [
+            missing[i : i + self._batch_size] for i in range(0, len(missing), self._batch_size)
+        ]
+        results = await asyncio.gather(*(self._fetch_batch(b, semaphore) for b in batches))
+
+        expiry = self._clock() + self._ttl
+        for batch in results:
+            for q in batch:
+                self._cache[q.isin] = (expiry, q)
+                quotes[q.isin] = q
+
+        return quotes
+
+    async def refresh(self, portfolios: Sequence[Portfolio]) -> dict[str, Quote]:
+        """Refreshes the closing prices of many portfolios in place.
+
+        The ISINs of every portfolio are fetched together, then each
+        portfolio gets the quotes of its own assets.
+
+        Args:
+            portfolios (Sequence[Portfolio]): The portfolios to refresh.
+
+        Raises:
+            OSError: If a request still fails after every retry.
+
+        Returns:
+            dict[str, Quote]: The quotes found, by ISIN.
+        """
+        quotes = await self.fetch(
+            isin
+            for portfolio in portfolios
+            for isin in portfolio._as.index  # noqa: SLF001
+        )
+
+        closing = pd.Series({isin: q.close for isin, q in quotes.items()}, dtype=float)
+        products = pd.Series(
+            {isin: q.name for isin, q in quotes.items() if q.name is not None}, dtype=object
+        )
+        for portfolio in portfolios:
+            portfolio.refresh_closing(closing, products)
+
+        return quotes
+
+    def clear(self) -> None:
+        """Empties the cache."""
+        self._cache.clear()
+
+    async def _fetch_batch(self, isins: list[str], semaphore: asyncio.Semaphore) -> list[Quote]:
+        """Fetches one batch, retrying with an exponential backoff.
+
+        Args:
+            isins (list[str]): The ISINs of the batch.
+            semaphore (Semaphore): Limits the requests in flight.
+
+        Raises:
+            OSError: If the request still fails after every retry.
+
+        Returns:
+            list[Quote]: The quotes found.
+        """
+        for attempt in range(self._retries):
+            try:
+                async with semaphore:
+                    return await self._provider.fetch(isins)
+            except (OSError, asyncio.TimeoutError) as e:
+                if not _retryable(e):
+                    raise
+            await asyncio.sleep(self._backoff * 2**attempt)
+
+        async with semaphore:
+            return await self._provider.fetch(isins)
+
+
+def _retryable(error: Exception) -> bool:
+    """Tells whether a failed request is worth retrying.
+
+    Args:
+        error (Exception): The error of the request.
+
+    Returns:
+        bool: False for HTTP client errors other than 429.
+    """
+    if isinstance(error, HTTPError):
+        return error.status == 429 or error.status >= 500  # noqa: PLR2004
+
+    return True
+
+
+class StubQuoteServer:
+    """A local HTTP server answering quote requests, for offline use.
+
+    It serves the same API as `HttpQuoteProvider` expects, from a
+    fixed mapping of quotes, on an ephemeral port of 127.0.0.1.
+
+    Attributes:
+        quotes (dict[str, Quote]): The quotes served, by ISIN.
+        failures (int): The number of requests still to be answered
+            with a 503 status.
+        requests (list[list[str]]): The ISINs of every request served.
+        connections (int): The number of connections accepted.
+        _server (Server | None): The running server.
+    """
+
+    def __init__(self, quotes: Mapping[str, Quote] | Iterable[Quote], *, failures: int = 0):
+        """__init__ method.
+
+        Constructs all the necessary attributes for the stub server
+        object.
+
+        Args:
+            quotes (Mapping[str, Quote] | Iterable[Quote]): The quotes
+                to serve.
+            failures (int): The number of requests to answer with a
+                503 status first. Defaults to 0.
+        """
+        if isinstance(quotes, Mapping):
+            quotes = quotes.values()
+        self.quotes = {q.isin: q for q in quotes}
+        self.failures = failures
+        self.requests = []
+        self.connections = 0
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        """Returns the base url of the running server."""
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f'http://{host}:{port}'
+
+    async def start(self) -> None:
+        """Starts serving on an ephemeral port."""
+        self._server = await asyncio.start_server(self._handle, '127.0.0.1', 0)
+
+    async def stop(self) -> None:
+        """Stops serving."""
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def __aenter__(self) -> 'StubQuoteServer':
+        """Starts the server when entering an `async with` block."""
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        """Stops the server when leaving an `async with` block."""
+        await self.stop()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serves the requests of one keep-alive connection.
+
+        Args:
+            reader (StreamReader): The stream of the connection.
+            writer (StreamWriter): The stream of the connection.
+        """
+        self.connections += 1
+
+        try:
+            while line := await reader.readline():
+                _, target, _ = line.decode('latin-1').split(' ', 2)
+                await read_headers(reader)
+                status, body = self._respond(target)
+                writer.write(
+                    f'HTTP/1.1 {status}\r\nContent-Type: application/json\r\n'
+                    f'Content-Length: {len(body)}\r\n\r\n'.encode()
+                    + body
+                )
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    def _respond(self, target: str) -> tuple[str, bytes]:
+        """Builds the response to one request.
+
+        Args:
+            target (str): The path and query of the request.
+
+        Returns:
+            tuple[str, bytes]: The status line and the body.
+        """
+        parts = urlsplit(target)
+        if not parts.path.endswith('/quotes'):
+            return '404 Not Found', b'{}'
+
+        if self.failures > 0:
+            self.failures -= 1
+            return '503 Service Unavailable', b'{}'
+
+        isins = ','.join(parse_qs(parts.query).get('isins', [''])).split(',')
+        self.requests.append(isins)
+        quotes = [asdict(self.quotes[isin]) for isin in isins if isin in self.quotes]
+        return '200 OK', json.dumps({'quotes': quotes}).encode()
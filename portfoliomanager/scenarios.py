@@ -0,0 +1,127 @@
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from portfoliomanager.portfolio import Portfolio
+
+
+@dataclass(frozen=True)
+class ScenarioResult:
+    """The rebalances of one portfolio under many allocations.
+
+    Attributes:
+        movements (DataFrame): The movement of every ISIN in a sell
+            rebalance, candidates x ISINs.
+        no_sell_movements (DataFrame): The movement of every ISIN in a
+            no-sell rebalance, candidates x ISINs, NaN for the
+            candidates that can't be reached without selling.
+        turnover (Series): The value traded by the sell rebalance of
+            every candidate, as a fraction of the total value.
+        no_sell_cash (Series): The cash a no-sell rebalance of every
+            candidate needs, NaN if it would have to sell an asset
+            with an expected percentage of 0.
+    """
+
+    movements: pd.DataFrame
+    no_sell_movements: pd.DataFrame
+    turnover: pd.Series
+    no_sell_cash: pd.Series
+
+    def summary(self) -> pd.DataFrame:
+        """Returns the turnover and no-sell cash of every candidate."""
+        return pd.DataFrame({'Turnover': self.turnover, 'No-sell Cash': self.no_sell_cash})
+
+
+def read_candidates(files: Mapping[str, str | Path] | Iterable[str | Path]) -> pd.DataFrame:
+    """Reads many allocation csv files into one weight matrix.
+
+    Args:
+        files (Mapping | Iterable): The allocation files, keyed by
+            candidate name, or an iterable keyed by position.
+
+    Raises:
+        FileNotFoundError: If a file does not exist.
+        ValueError: If an allocation doesn't sum to 100.
+
+    Returns:
+        DataFrame: The expected percentages, candidates x ISINs, 0
+            for the ISINs a candidate doesn't allocate.
+    """
+    if not isinstance(files, Mapping):
+        files = dict(enumerate(files))
+
+    return (
+        pd.DataFrame(
+            {
+                name: Portfolio._read_allocation(file)['Expected Percentage']  # noqa: SLF001
+                for name, file in files.items()
+            }
+        )
+        .T.fillna(0)
+        .rename_axis(index='Candidate', columns='ISIN')
+    )
+
+
+def evaluate_allocations(portfolio: Portfolio, candidates: pd.DataFrame) -> ScenarioResult:
+    """Rebalances one portfolio under many candidate allocations.
+
+    The holdings already parsed by the portfolio are aligned once with
+    the ISINs of the candidates, and the rebalances of every candidate
+    are computed with one broadcast over the candidates x ISINs
+    matrix, with the same rounding as `PortfolioManager`.
+
+    Args:
+        portfolio (Portfolio): The portfolio.
+        candidates (DataFrame): The expected percentages, candidates x
+            ISINs, e.g. from `read_candidates`.
+
+    Raises:
+        ValueError: If a candidate doesn't sum to 100.
+
+    Returns:
+        ScenarioResult: The movements, turnover and no-sell cash of
+            every candidate.
+    """
+    weights_frame = candidates.fillna(0)
+    # The same check as a real allocation, so that every candidate
+    # accepted here can be loaded as one.
+    invalid = [
+        name
+        for name, weights in weights_frame.iterrows()
+        if not Portfolio._validate_allocation_percentage_sum(  # noqa: SLF001
+            weights.rename('Expected Percentage').to_frame()
+        )
+    ]
+    if invalid:
+        msg = f'The expected percentages of the candidates {list(invalid)} do not sum to 100%.'
+        raise ValueError(msg)
+
+    held = portfolio._as['Current Value']  # noqa: SLF001
+    isins = held.index.union(weights_frame.columns).rename('ISIN')
+    values = held.groupby(level=0).sum().reindex(isins, fill_value=0).to_numpy(dtype=float)
+    weights = weights_frame.reindex(columns=isins, fill_value=0).to_numpy(dtype=float)
+    total = portfolio.total_value
+
+    movements = np.round(total / 100 * weights, 2) - values
+
+    current = np.round(values / total * 100, 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = np.where(weights > 0, current / weights, np.where(values != 0, np.inf, -np.inf))
+    top = ratios.argmax(axis=1)
+    rows = np.arange(len(weights))
+    reachable = np.isfinite(ratios[rows, top])
+    top_weights = np.where(reachable, weights[rows, top], 1)[:, np.newaxis]
+    no_sell = np.round(weights * values[top][:, np.newaxis] / top_weights, 2) - values
+    no_sell[~reachable] = np.nan
+
+    return ScenarioResult(
+        movements=pd.DataFrame(movements, index=candidates.index, columns=isins),
+        no_sell_movements=pd.DataFrame(no_sell, index=candidates.index, columns=isins),
+        turnover=pd.Series(
+            np.abs(movements).sum(axis=1) / total, index=candidates.index, name='Turnover'
+        ),
+        no_sell_cash=pd.Series(no_sell.sum(axis=1), index=candidates.index, name='No-sell Cash'),
+    )
@@ -0,0 +1,336 @@
+import asyncio
+import contextlib
+import json
+import logging
+import os
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any
+from urllib.parse import unquote, urlsplit
+
+import pandas as pd
+
+from portfoliomanager._http import read_headers
+from portfoliomanager.degiroportfolio import DegiroPortfolio
+from portfoliomanager.loader import find_portfolio_files
+from portfoliomanager.portfolio import Portfolio
+from portfoliomanager.portfoliomanager import PortfolioManager
+
+DEFAULT_POLL_INTERVAL = 1.0
+VIEWS = ('summary', 'rebalance_sell', 'rebalance_no_sell')
+
+Stamp = tuple[int, int]
+
+logger = logging.getLogger(__name__)
+
+
+class RebalanceService:
+    """A resident HTTP/JSON service rebalancing parsed portfolios.
+
+    The portfolios are parsed once and kept in memory. A watcher polls
+    the modification time and size of their files and re-parses, in
+    worker threads, only the portfolios whose files changed. Every
+    reload builds a new snapshot of the portfolios and swaps it in one
+    assignment, so requests never wait on a lock: each one reads the
+    snapshot current when it starts. The responses are computed in
+    worker threads, so a slow rebalance doesn't hold up the other
+    connections.
+
+    Endpoints, all GET:
+        /portfolios: the keys of the portfolios and the errors of the
+            last reload of each failing one.
+        /portfolios/{key}/summary
+        /portfolios/{key}/rebalance_sell
+        /portfolios/{key}/rebalance_no_sell
+
+    Attributes:
+        errors (dict[str, str]): The error of the last reload of every
+            portfolio that failed to load. A portfolio that fails to
+            reload keeps serving its previous version.
+        _files (str | Path | dict): The directory scanned for files, or
+            the assets and allocation files of each key.
+        _portfolio_cls (type[Portfolio]): The class of the portfolios.
+        _kwargs (dict): Passed to the constructor of every portfolio.
+        _poll_interval (float): The seconds between two polls.
+        _snapshot (dict[str, Portfolio]): The portfolios served. Never
+            modified in place, only replaced.
+        _stamps (dict[str, tuple]): The stamps of the files of every
+            key, as of its last parse.
+        _reloading (Lock): Serializes the reloads, not the requests.
+        _server (Server | None): The running server.
+        _watcher (Task | None): The running watcher.
+    """
+
+    def __init__(
+        self,
+        files: str | Path | Mapping[str, tuple[Path, Path]],
+        portfolio_cls: type[Portfolio] = DegiroPortfolio,
+        *,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        **kwargs: Any,  # noqa: ANN401
+    ):
+        """__init__ method.
+
+        Constructs all the necessary attributes for the service object.
+
+        Args:
+            files (str | Path | Mapping): A directory of 'assets_*.csv'
+                and 'allocation_*.csv' files, rescanned on every poll,
+                or a mapping of keys to (assets, allocation) pairs.
+            portfolio_cls (type[Portfolio]): The class of the
+                portfolios. Defaults to DegiroPortfolio.
+            poll_interval (float): The seconds between two polls of the
+                files. Defaults to 1.
+            **kwargs: Passed to the constructor of every portfolio, e.g.
+                'currency'.
+        """
+        self._files = files if isinstance(files, str | Path) else dict(files)
+        self._portfolio_cls = portfolio_cls
+        self._kwargs = kwargs
+        self._poll_interval = poll_interval
+        self._snapshot = {}
+        self._stamps = {}
+        self._reloading = asyncio.Lock()
+        self._server = None
+        self._watcher = None
+        self.errors = {}
+
+    @property
+    def url(self) -> str:
+        """Returns the base url of the running service."""
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def portfolios(self) -> dict[str, Portfolio]:
+        """Returns the portfolios currently served."""
+        return dict(self._snapshot)
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> None:
+        """Loads the portfolios, then serves and watches them.
+
+        Args:
+            host (str): The address to listen on. Defaults to
+                '127.0.0.1'.
+            port (int): The port to listen on. Defaults to 0, an
+                ephemeral port.
+        """
+        await self.reload()
+        self._server = await asyncio.start_server(self._handle, host, port)
+        self._watcher = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        """Stops serving and watching."""
+        self._watcher.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._watcher
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def serve_forever(self, host: str = '127.0.0.1', port: int = 0) -> None:
+        """Starts the service and serves until cancelled.
+
+        Args:
+            host (str): The address to listen on. Defaults to
+                '127.0.0.1'.
+            port (int): The port to listen on. Defaults to 0, an
+                ephemeral port.
+        """
+        await self.start(host, port)
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def __aenter__(self) -> 'RebalanceService':
+        """Starts the service when entering an `async with` block."""
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        """Stops the service when leaving an `async with` block."""
+        await self.stop()
+
+    async def reload(self) -> list[str]:
+        """Re-parses the portfolios whose files changed.
+
+        New keys are loaded and the keys whose files are gone are
+        dropped. The portfolios are parsed concurrently in worker
+        threads and swapped in together.
+
+        A portfolio that fails to parse, whatever the error, is
+        recorded in `errors` and retried when its files change again.
+
+        Returns:
+            list[str]: The keys of the portfolios reloaded.
+        """
+        async with self._reloading:
+            pairs = self._pairs()
+            stamps = {key: _stamps(pair) for key, pair in pairs.items()}
+            changed = [
+                key
+                for key, stamp in stamps.items()
+                if stamp is None or stamp != self._stamps.get(key)
+            ]
+
+            results = await asyncio.gather(
+                *(self._parse(pairs[key]) for key in changed), return_exceptions=True
+            )
+
+            snapshot = {key: p for key, p in self._snapshot.items() if key in pairs}
+            for key, result in zip(changed, results, strict=True):
+                if isinstance(result, Exception):
+                    self.errors[key] = f'{type(result).__name__}: {result}'
+                elif isinstance(result, BaseException):
+                    raise result
+                else:
+                    snapshot[key] = result
+                    self.errors.pop(key, None)
+                self._stamps[key] = stamps[key]
+
+            for key in self._stamps.keys() - pairs.keys():
+                del self._stamps[key]
+            for key in self.errors.keys() - pairs.keys():
+                del self.errors[key]
+
+            self._snapshot = snapshot
+            return [key for key in changed if key not in self.errors]
+
+    def _respond(self, target: str) -> tuple[int, Any]:
+        """Computes the response to one request.
+
+        Args:
+            target (str): The path of the request.
+
+        Returns:
+            tuple[int, Any]: The status code and the JSON body.
+        """
+        parts = [unquote(part) for part in urlsplit(target).path.strip('/').split('/')]
+        snapshot = self._snapshot
+
+        if parts == ['portfolios']:
+            return 200, {'portfolios': list(snapshot), 'errors': dict(self.errors)}
+
+        if len(parts) != 3 or parts[0] != 'portfolios' or parts[2] not in VIEWS:  # noqa: PLR2004
+            return 404, {'error': f'Unknown endpoint {target!r}.'}
+
+        portfolio = snapshot.get(parts[1])
+        if portfolio is None:
+            return 404, {'error': f'Unknown portfolio {parts[1]!r}.'}
+
+        try:
+            if parts[2] == 'summary':
+                frame = portfolio.summary
+            else:
+                frame = getattr(PortfolioManager(portfolio), parts[2])()
+        except ValueError as e:
+            return 422, {'error': str(e)}
+
+        return 200, {
+            'currency': portfolio.currency,
+            'total_value': float(portfolio.total_value),
+            'rows': _records(frame),
+        }
+
+    def _pairs(self) -> dict[str, tuple[Path, Path]]:
+        """Returns the complete file pairs of every key."""
+        if isinstance(self._files, dict):
+            return self._files
+
+        return {
+            key: (assets, allocation)
+            for key, (assets, allocation) in find_portfolio_files(self._files).items()
+            if assets is not None and allocation is not None
+        }
+
+    async def _parse(self, pair: tuple[Path, Path]) -> Portfolio:
+        """Parses one portfolio in a worker thread."""
+        return await asyncio.to_thread(self._portfolio_cls, *pair, **self._kwargs)
+
+    async def _watch(self) -> None:
+        """Polls the files and reloads the changed portfolios.
+
+        An error of a poll, e.g. a directory that can't be listed, is
+        logged and the next poll retries.
+        """
+        while True:
+            await asyncio.sleep(self._poll_interval)
+            try:
+                await self.reload()
+            except Exception:
+                logger.exception('Failed to reload the portfolios.')
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serves the requests of one keep-alive connection.
+
+        A request failing with an unexpected error is logged and
+        answered with a 500 status, keeping the connection open.
+
+        Args:
+            reader (StreamReader): The stream of the connection.
+            writer (StreamWriter): The stream of the connection.
+        """
+        try:
+            while line := await reader.readline():
+                method, target, _ = line.decode('latin-1').split(' ', 2)
+                await read_headers(reader)
+
+                if method == 'GET':
+                    try:
+                        status, body = await asyncio.to_thread(self._respond, target)
+                    except Exception as e:
+                        logger.exception('Failed to respond to %s.', target)
+                        status, body = 500, {'error': f'{type(e).__name__}: {e}'}
+                else:
+                    status, body = 405, {'error': f'Unsupported method {method!r}.'}
+
+                payload = json.dumps(body).encode()
+                writer.write(
+                    f'HTTP/1.1 {status} {_REASONS[status]}\r\n'
+                    'Content-Type: application/json\r\n'
+                    f'Content-Length: {len(payload)}\r\n\r\n'.encode()
+                    + payload
+                )
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+_REASONS = {
+    200: 'OK',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    422: 'Unprocessable Content',
+    500: 'Internal Server Error',
+}
+
+
+def _stamps(pair: tuple[Path, Path]) -> tuple[Stamp, Stamp] | None:
+    """Returns the modification time and size of two files.
+
+    Args:
+        pair (tuple[Path, Path]): The assets and allocation files.
+
+    Returns:
+        tuple | None: The stamp of each file, or None if one is
+            missing, which always counts as a change.
+    """
+    try:
+        return tuple((stat.st_mtime_ns, stat.st_size) for stat in map(os.stat, pair))
+    except OSError:
+        return None
+
+
+def _records(frame: pd.DataFrame) -> list[dict[str, Any]]:
+    """Converts a DataFrame to JSON records, NaN as null.
+
+    Args:
+        frame (DataFrame): The DataFrame, indexed by ISIN.
+
+    Returns:
+        list[dict[str, Any]]: One record per row, with its ISIN.
+    """
+    frame = frame.reset_index()
+    return frame.astype(object).where(frame.notna(), None).to_dict(orient='records')
@@ -0,0 +1,346 @@
+import heapq
+
+import numpy as np
+
+PRICE_TOLERANCE = 1e-9
+
+
+def water_fill(values: np.ndarray, weights: np.ndarray, budgets: np.ndarray) -> np.ndarray:
+    """Spends a budget on the most underweight assets first.
+
+    Every asset with a positive weight has a fill level, its value
+    divided by its weight: the portfolio total at which it would be
+    exactly on target. The budget raises the lowest levels first, up
+    to a common water level L where the buys max(0, w * L - v) add up
+    to the budget. The assets are sorted by level once and L is found
+    with prefix sums, so each row costs O(n log n). Assets with a zero
+    weight are never bought.
+
+    Args:
+        values (ndarray): The current values, accounts x assets.
+        weights (ndarray): The target weights, accounts x assets, in
+            any unit such as percentages.
+        budgets (ndarray): The amount to spend in each account.
+
+    Raises:
+        ValueError: If a budget is negative or an account has no
+            asset with a positive weight.
+
+    Returns:
+        ndarray: The amount to buy of each asset, accounts x assets.
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=float))
+    weights = np.atleast_2d(np.asarray(weights, dtype=float))
+    budgets = np.broadcast_to(np.asarray(budgets, dtype=float), values.shape[:1])
+
+    if (budgets < 0).any():
+        msg = 'The amount to spend must not be negative.'
+        raise ValueError(msg)
+
+    eligible = weights > 0
+    if not eligible.any(axis=1).all():
+        msg = 'Every account needs at least one asset with a positive weight.'
+        raise ValueError(msg)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        levels = np.where(eligible, values / weights, np.inf)
+
+    order = np.argsort(levels, axis=1, kind='stable')
+    sorted_levels = np.take_along_axis(levels, order, axis=1)
+    cum_weights = np.cumsum(np.take_along_axis(np.where(eligible, weights, 0), order, axis=1), 1)
+    cum_values = np.cumsum(np.take_along_axis(np.where(eligible, values, 0), order, axis=1), 1)
+
+    with np.errstate(invalid='ignore'):
+        costs = sorted_levels * cum_weights - cum_values
+    # The lowest asset is at its own level: its cost is exactly 0, not
+    # a rounding error that a zero budget could fall short of.
+    costs[:, 0] = 0
+
+    rows = np.arange(len(values))
+    filled = (costs <= budgets[:, np.newaxis]).sum(axis=1) - 1
+    level = (budgets + cum_values[rows, filled]) / cum_weights[rows, filled]
+
+    return np.where(eligible, np.maximum(weights * level[:, np.newaxis] - values, 0), 0)
+
+
+def to_cents(amounts: np.ndarray, totals: np.ndarray) -> np.ndarray:
+    """Rounds amounts to cents while keeping their exact row totals.
+
+    Every amount is rounded down to the cent, then the cents left over
+    go to the amounts with the largest rounded-off fractions (largest
+    remainder method).
+
+    Args:
+        amounts (ndarray): The non-negative amounts, accounts x assets.
+        totals (ndarray): The total of each account.
+
+    Returns:
+        ndarray: The amounts in whole cents, as integers.
+    """
+    amounts = np.atleast_2d(np.asarray(amounts, dtype=float))
+    totals = np.broadcast_to(np.asarray(totals, dtype=float), amounts.shape[:1])
+
+    raw = amounts * 100
+    cents = np.floor(raw)
+    fractions = np.where(amounts > 0, raw - cents, -1)
+    leftover = np.round(totals * 100) - cents.sum(axis=1)
+
+    order = np.argsort(-fractions, axis=1, kind='stable')
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(amounts.shape[1])[np.newaxis, :], axis=1)
+
+    return (cents + (ranks < leftover[:, np.newaxis])).astype(np.int64)
+
+
+def allocate_shares(
+    amounts: np.ndarray, prices: np.ndarray, budgets: np.ndarray | None = None
+) -> np.ndarray:
+    """Turns amounts of money into whole numbers of shares.
+
+    Every amount is first truncated toward zero to whole shares, so
+    no line overshoots its target. If the truncated sells raise less
+    than the truncated buys spend, one extra share is sold on the
+    lines furthest above their target until the cash is no longer
+    negative. If it still is, e.g. with a budget below the truncated
+    buys, the buys are cut one share at a time on the lines closest to
+    their target. The cash left is then handed out one share at a time
+    to the buy line with the largest remaining deviation, as long as
+    the cash can pay for the share and the share brings the line
+    closer to its target. Every pass pops lines from a heap, so an
+    account of n lines costs O(n log n), and unless its buys are cut,
+    every line ends within one share of its target.
+
+    Args:
+        amounts (ndarray): The amounts to buy (positive) or sell
+            (negative), accounts x assets.
+        prices (ndarray): The price of one share, accounts x assets.
+            Lines with a zero amount may have a missing price.
+        budgets (ndarray | None): The net cash each account may
+            spend. Defaults to None, which uses the sum of its
+            amounts.
+
+    Raises:
+        ValueError: If a line with a non-zero amount has a missing or
+            non-positive price, or a budget can't be met even without
+            buying anything.
+
+    Returns:
+        ndarray: The number of shares to buy (positive) or sell
+            (negative), accounts x assets, as integers.
+    """
+    amounts = np.atleast_2d(np.asarray(amounts, dtype=float))
+    prices = np.broadcast_to(np.atleast_2d(np.asarray(prices, dtype=float)), amounts.shape)
+    if budgets is None:
+        budgets = amounts.sum(axis=1)
+    budgets = np.broadcast_to(np.asarray(budgets, dtype=float), amounts.shape[:1])
+
+    traded = amounts != 0
+    if (traded & ~(prices > 0)).any():
+        msg = 'Every asset to buy or sell needs a positive price.'
+        raise ValueError(msg)
+
+    safe_prices = np.where(traded, prices, 1)
+    targets = np.where(traded, amounts / safe_prices, 0)
+    shares = np.trunc(targets)
+    deviations = (targets - shares) * safe_prices
+    cash = budgets - (shares * safe_prices).sum(axis=1)
+
+    for row in range(len(amounts)):
+        _settle_row(shares[row], deviations[row], safe_prices[row], targets[row], cash[row])
+
+    return shares.astype(np.int64)
+
+
+def _settle_row(
+    shares: np.ndarray,
+    deviations: np.ndarray,
+    prices: np.ndarray,
+    targets: np.ndarray,
+    cash: float,
+) -> None:
+    """Hands the cash of one account out in whole shares, in place.
+
+    Args:
+        shares (ndarray): The truncated shares of the account.
+        deviations (ndarray): The value each line is still short of
+            its target.
+        prices (ndarray): The price of one share of each line.
+        targets (ndarray): The fractional shares of each line.
+        cash (float): The cash left after the truncated orders.
+
+    Raises:
+        ValueError: If the cash is still negative without any buy.
+    """
+    if cash < 0:
+        heap = [(deviations[i], i) for i in np.flatnonzero(deviations < 0)]
+        heapq.heapify(heap)
+        while cash < 0 and heap:
+            _, i = heapq.heappop(heap)
+            shares[i] -= 1
+            cash += prices[i]
+
+    if cash < -PRICE_TOLERANCE:
+        heap = [(deviations[i], i) for i in np.flatnonzero(shares > 0)]
+        heapq.heapify(heap)
+        while cash < -PRICE_TOLERANCE and heap:
+            _, i = heapq.heappop(heap)
+            shares[i] -= 1
+            deviations[i] += prices[i]
+            cash += prices[i]
+            if shares[i] > 0:
+                heapq.heappush(heap, (deviations[i], i))
+
+        if cash < -PRICE_TOLERANCE:
+            msg = f'The budget of an account is {-cash:.2f} short even without buying.'
+            raise ValueError(msg)
+
+    closer = (targets > 0) & (deviations > prices / 2)
+    heap = [(-deviations[i], i) for i in np.flatnonzero(closer)]
+    heapq.heapify(heap)
+    while heap:
+        _, i = heapq.heappop(heap)
+        if prices[i] <= cash + PRICE_TOLERANCE:
+            shares[i] += 1
+            cash -= prices[i]
+
+
+def select_trades(
+    movements: np.ndarray,
+    bands: np.ndarray,
+    fixed: np.ndarray,
+    rates: np.ndarray,
+    min_trade: float = 0.0,
+) -> np.ndarray:
+    """Picks the cheapest trades bringing every asset within its band.
+
+    Every asset further from its target than its band is traded back
+    to its target. The cash those trades and their fees need is then
+    raised by selling, among the overweight assets still within their
+    band, the ones with the lowest fee per unit of cash raised first,
+    the last one only as much as needed. The candidates are sorted
+    once and the sells are found with prefix sums, so each row costs
+    O(n log n). If the candidates can't raise the cash, the buys are
+    scaled down. If the sells raise more than the buys need, the cash
+    left is spent on the underweight assets, the buys already placed
+    first and then the largest deviations, so it does not sit idle
+    and push the traded assets out of their band. No trade is smaller
+    than `min_trade`: an asset whose movement is smaller is never
+    traded, even outside its band, and a buy scaled down below it is
+    dropped, leaving its cash unspent unless another buy can take it.
+
+    Args:
+        movements (ndarray): The movements of a sell rebalance,
+            accounts x assets.
+        bands (ndarray): The largest deviation from the target left
+            untraded, accounts x assets, one per account, or one for
+            every account.
+        fixed (ndarray): The fixed fee of a trade of every asset.
+        rates (ndarray): The percentage fee of a trade of every asset,
+            as a fraction.
+        min_trade (float): The smallest value traded. Defaults to 0.
+
+    Returns:
+        ndarray: The trades, accounts x assets, rounded to the cent.
+    """
+    movements = np.atleast_2d(np.asarray(movements, dtype=float))
+    bands = np.asarray(bands, dtype=float)
+    if bands.ndim < movements.ndim:
+        bands = bands.reshape(-1, 1)
+    bands = np.broadcast_to(bands, movements.shape)
+    fixed = np.broadcast_to(np.asarray(fixed, dtype=float), movements.shape)
+    rates = np.broadcast_to(np.asarray(rates, dtype=float), movements.shape)
+
+    sizes = np.abs(movements)
+    tradable = (sizes >= min_trade) & (sizes > 0)
+    required = tradable & (sizes > bands)
+    trades = np.where(required, movements, 0)
+    costs = np.where(required, fixed + sizes * rates, 0)
+    shortfalls = trades.sum(axis=1) + costs.sum(axis=1)
+
+    raised = np.where(tradable & ~required & (movements < 0), sizes * (1 - rates) - fixed, 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = np.where(raised > 0, (fixed + sizes * rates) / raised, np.inf)
+
+    order = np.argsort(ratios, axis=1, kind='stable')
+    cum_raised = np.cumsum(np.take_along_axis(raised, order, axis=1), axis=1)
+    full = (cum_raised < shortfalls[:, np.newaxis]) & np.isfinite(
+        np.take_along_axis(ratios, order, axis=1)
+    )
+    sells = np.zeros_like(movements)
+    np.put_along_axis(sells, order, np.where(full, 1.0, 0.0), axis=1)
+    trades = np.where(sells > 0, movements, trades)
+
+    rows = np.arange(len(movements))
+    taken = full.sum(axis=1)
+    last = order[rows, np.minimum(taken, movements.shape[1] - 1)]
+    before = np.where(taken > 0, cum_raised[rows, np.maximum(taken - 1, 0)], 0)
+    remaining = shortfalls - before
+    partial = (remaining > 0) & (taken < movements.shape[1]) & np.isfinite(ratios[rows, last])
+    amounts = (remaining + fixed[rows, last]) / (1 - rates[rows, last])
+    amounts = np.minimum(np.maximum(np.ceil(amounts * 100) / 100, min_trade), sizes[rows, last])
+    trades[rows[partial], last[partial]] = -amounts[partial]
+
+    short = remaining - np.where(partial, amounts * (1 - rates[rows, last]) - fixed[rows, last], 0)
+    buys = np.where(trades > 0, trades, 0)
+    spent = (buys * (1 + rates)).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scales = np.where((short > 0) & (spent > 0), np.maximum(1 - short / spent, 0), 1)
+    trades = np.where(trades > 0, trades * scales[:, np.newaxis], trades)
+    trades[(trades > 0) & (trades < min_trade)] = 0
+
+    gaps = np.where(tradable & (movements > 0), np.maximum(movements - trades, 0), 0)
+    trades = _spend_surplus(trades, gaps, fixed, rates, min_trade)
+
+    return np.round(trades, 2)
+
+
+def _spend_surplus(
+    trades: np.ndarray,
+    gaps: np.ndarray,
+    fixed: np.ndarray,
+    rates: np.ndarray,
+    min_trade: float,
+) -> np.ndarray:
+    """Spends the cash the trades leave on the underweight assets.
+
+    Args:
+        trades (ndarray): The trades selected so far, accounts x
+            assets.
+        gaps (ndarray): The value each underweight asset may still
+            buy, accounts x assets, 0 where it can't be traded.
+        fixed (ndarray): The fixed fee of a trade of every asset.
+        rates (ndarray): The percentage fee of a trade of every asset,
+            as a fraction.
+        min_trade (float): The smallest value traded.
+
+    Returns:
+        ndarray: The trades, with every buy the cash left can pay
+            for, none beyond the gap of its asset.
+    """
+    costs = np.where(trades != 0, fixed + np.abs(trades) * rates, 0)
+    surpluses = -(trades.sum(axis=1) + costs.sum(axis=1))
+    # A line not traded yet pays its fixed fee when it is first bought,
+    # so the buys already placed are topped up first.
+    extras = np.where(trades == 0, fixed, 0)
+    order = np.lexsort((-gaps, trades <= 0), axis=1)
+    sorted_gaps = np.take_along_axis(gaps, order, axis=1)
+    cum_costs = np.cumsum(
+        np.take_along_axis(gaps * (1 + rates) + np.where(gaps > 0, extras, 0), order, axis=1),
+        axis=1,
+    )
+    full = cum_costs <= surpluses[:, np.newaxis]
+    tops = np.zeros_like(trades)
+    np.put_along_axis(tops, order, np.where(full, sorted_gaps, 0), axis=1)
+    trades = trades + tops
+
+    rows = np.arange(len(trades))
+    taken = full.sum(axis=1)
+    last = order[rows, np.minimum(taken, trades.shape[1] - 1)]
+    before = np.where(taken > 0, cum_costs[rows, np.maximum(taken - 1, 0)], 0)
+    amounts = (surpluses - before - extras[rows, last]) / (1 + rates[rows, last])
+    amounts = np.minimum(np.floor(amounts * 100) / 100, gaps[rows, last])
+    smallest = np.where(trades[rows, last] == 0, np.maximum(min_trade, 0.01), 0.01)
+    partial = (taken < trades.shape[1]) & (gaps[rows, last] > 0) & (amounts >= smallest)
+    trades[rows[partial], last[partial]] += amounts[partial]
+
+    return trades
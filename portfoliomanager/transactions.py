@@ -0,0 +1,540 @@
+import hashlib
+import json
+import os
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from portfoliomanager.cache import decode_frame, encode_frame
+
+DEFAULT_CHUNKSIZE = 10000
+EVENT_COLUMNS = ('Date', 'ISIN', 'Product', 'Type', 'Quantity', 'Price', 'Rate', 'Cash')
+EVENT_TYPES = ('buy', 'sell', 'split', 'dividend')
+ACCOUNT_SOURCE = 'account'
+TRANSACTIONS_SOURCE = 'transactions'
+POSITION_COLUMNS = ('Product', 'Amount', 'Closing', 'Price', 'Invested', 'Dividends')
+DEGIRO_TRANSACTION_COLUMNS = (
+    'Date',
+    'Time',
+    'Product',
+    'ISIN',
+    'Exchange',
+    'Venue',
+    'Quantity',
+    'Price',
+    'Price Currency',
+    'Local Value',
+    'Local Currency',
+    'Value',
+    'Value Currency',
+    'Rate',
+    'Fees',
+    'Fees Currency',
+    'Total',
+    'Total Currency',
+    'Order ID',
+)
+DEGIRO_ACCOUNT_COLUMNS = (
+    'Date',
+    'Time',
+    'Value Date',
+    'Product',
+    'ISIN',
+    'Description',
+    'Rate',
+    'Change Currency',
+    'Change',
+    'Balance Currency',
+    'Balance',
+    'Order ID',
+)
+DIVIDEND_DESCRIPTIONS = ('Dividendo', 'Ritenuta sul dividendo', 'Dividend', 'Dividend Tax')
+
+
+def read_degiro_transactions(
+    transactions_file: str | Path, *, chunksize: int = DEFAULT_CHUNKSIZE
+) -> Iterator[pd.DataFrame]:
+    """Streams the buys and sells of a Degiro transactions export.
+
+    A stock split appears in the export as a sell of the old shares
+    and a buy of the new ones, so it needs no special handling.
+
+    Args:
+        transactions_file (str | Path): The transactions csv.
+        chunksize (int): The number of rows parsed at a time.
+            Defaults to 10000.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If the file doesn't have the expected columns, or
+            a value can't be parsed.
+
+    Yields:
+        DataFrame: The events of each chunk, with the `EVENT_COLUMNS`.
+    """
+    for chunk in _read_chunks(transactions_file, DEGIRO_TRANSACTION_COLUMNS, chunksize):
+        quantity = _to_float(chunk['Quantity'])
+        rate = _to_float(chunk['Rate']).fillna(1.0)
+
+        yield pd.DataFrame(
+            {
+                'Date': _to_datetime(chunk),
+                'ISIN': chunk['ISIN'],
+                'Product': chunk['Product'],
+                'Type': np.where(quantity < 0, 'sell', 'buy'),
+                'Quantity': quantity.abs(),
+                'Price': _to_float(chunk['Price']),
+                'Rate': rate,
+                'Cash': _to_float(chunk['Total']).fillna(_to_float(chunk['Value'])),
+            }
+        )
+
+
+def read_degiro_account(
+    account_file: str | Path, *, chunksize: int = DEFAULT_CHUNKSIZE
+) -> Iterator[pd.DataFrame]:
+    """Streams the dividends of a Degiro account statement export.
+
+    The dividends and their withholding taxes are kept, in the
+    currency they were paid in; every other row is skipped.
+
+    Args:
+        account_file (str | Path): The account statement csv.
+        chunksize (int): The number of rows parsed at a time.
+            Defaults to 10000.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If the file doesn't have the expected columns, or
+            a value can't be parsed.
+
+    Yields:
+        DataFrame: The events of each chunk, with the `EVENT_COLUMNS`.
+    """
+    for chunk in _read_chunks(account_file, DEGIRO_ACCOUNT_COLUMNS, chunksize):
+        dividends = chunk[chunk['Description'].isin(DIVIDEND_DESCRIPTIONS)]
+
+        yield pd.DataFrame(
+            {
+                'Date': _to_datetime(dividends),
+                'ISIN': dividends['ISIN'],
+                'Product': dividends['Product'],
+                'Type': 'dividend',
+                'Quantity': 0.0,
+                'Price': np.nan,
+                'Rate': 1.0,
+                'Cash': _to_float(dividends['Change']),
+            }
+        )
+
+
+class TransactionLedger:
+    """Per-ISIN positions folded from a stream of transactions.
+
+    The events are buys, sells, splits and dividends, in the
+    `EVENT_COLUMNS` format: 'Quantity' is the number of shares traded,
+    or the new shares per old share of a split; 'Price' is the price
+    of one share in its local currency; 'Rate' is the local currency
+    per unit of the portfolio currency; 'Cash' is the signed cash
+    flow, fees included.
+
+    Each `ingest` only folds the events after the watermark of their
+    source, the date of the latest event of that source already
+    folded, so ingesting a new export of the full history only
+    processes its new rows. Every source has its own watermark: an
+    account statement may well be ingested after transactions more
+    recent than its dividends. The events at a watermark are counted
+    by content, so that a later export repeating them skips as many of
+    them as were folded, while identical fills in the same minute are
+    each folded once. The positions and the watermarks are saved in a
+    checkpoint file.
+
+    Attributes:
+        _positions (DataFrame): The 'Product', 'Amount', 'Closing'
+            (last local price), 'Price' (last price in the portfolio
+            currency), 'Invested' (net cash paid) and 'Dividends' of
+            every ISIN.
+        _watermarks (dict[str, Timestamp]): The date of the latest
+            event of every source.
+        _seen (dict[str, dict[str, int]]): The number of events at
+            the watermark of every source, by content key.
+        _checkpoint (Path | None): The checkpoint file.
+    """
+
+    def __init__(self, checkpoint: str | Path | None = None):
+        """__init__ method.
+
+        Constructs all the necessary attributes for the ledger object,
+        resuming from the checkpoint file if it exists.
+
+        Args:
+            checkpoint (str | Path | None): The checkpoint file.
+                Defaults to None, no checkpoint.
+        """
+        self._checkpoint = None if checkpoint is None else Path(checkpoint)
+        self._positions = pd.DataFrame(
+            {
+                col: pd.Series(dtype=object if col == 'Product' else float)
+                for col in POSITION_COLUMNS
+            },
+            index=pd.Index([], dtype=object, name='ISIN'),
+        )
+        self._watermarks = {}
+        self._seen = {}
+
+        if self._checkpoint is not None and self._checkpoint.exists():
+            self._load()
+
+    @property
+    def positions(self) -> pd.DataFrame:
+        """Returns the positions of every ISIN ever traded."""
+        return self._positions.copy()
+
+    @property
+    def watermarks(self) -> dict[str, pd.Timestamp]:
+        """Returns the date of the latest event of every source."""
+        return dict(self._watermarks)
+
+    def ingest(
+        self, events: pd.DataFrame | Iterable[pd.DataFrame], *, source: str | None = None
+    ) -> int:
+        """Folds the new events into the positions.
+
+        Only the events after the watermark of their source are kept
+        while streaming the chunks; they are then sorted by date and
+        folded in one vectorized pass. The checkpoint, if any, is saved.
+
+        Args:
+            events (DataFrame | Iterable[DataFrame]): The events, or
+                chunks of events, in any order.
+            source (str | None): The source of the events. Defaults to
+                None, which takes the dividends from the 'account'
+                statement and the other events from the 'transactions'
+                export, like the Degiro readers.
+
+        Raises:
+            ValueError: If an event has an unknown type.
+
+        Returns:
+            int: The number of new events folded.
+        """
+        if isinstance(events, pd.DataFrame):
+            events = [events]
+
+        new = [self._new_events(chunk, source) for chunk in events]
+        new = pd.concat([chunk for chunk in new if len(chunk)] or [pd.DataFrame()])
+        if len(new):
+            new = self._unseen(new)
+
+        if len(new):
+            new = new.sort_values('Date', kind='stable')
+            self._fold(new)
+            self._advance(new)
+
+        if self._checkpoint is not None:
+            self.save()
+
+        return len(new)
+
+    def assets(self) -> pd.DataFrame:
+        """Returns the open positions as a cleaned assets DataFrame.
+
+        The result can be passed to `Portfolio.set_assets`. The current
+        values use the price of the last trade of every asset.
+
+        Returns:
+            DataFrame: The 'Product', 'Amount', 'Closing' and 'Current
+                Value' of every ISIN held, indexed by ISIN. There is no
+                'Local Value' column, so `local_values` is not
+                available on a portfolio holding these assets.
+        """
+        held = self._positions[self._positions['Amount'] != 0]
+
+        return pd.DataFrame(
+            {
+                'Product': held['Product'],
+                'Amount': held['Amount'],
+                'Closing': held['Closing'],
+                'Current Value': (held['Amount'] * held['Price']).round(2),
+            },
+            index=held.index,
+        )
+
+    def save(self, checkpoint: str | Path | None = None) -> None:
+        """Saves the positions and the watermarks.
+
+        The file is written to a temporary path first and then renamed,
+        so a crash never leaves a partial checkpoint.
+
+        Args:
+            checkpoint (str | Path | None): The checkpoint file.
+                Defaults to None, the checkpoint of the ledger.
+        """
+        path = Path(checkpoint or self._checkpoint)
+        arrays = encode_frame(self._positions)
+        arrays['watermarks'] = np.array(
+            json.dumps(
+                {
+                    source: {
+                        'date': date.isoformat(),
+                        'seen': dict(sorted(self._seen[source].items())),
+                    }
+                    for source, date in self._watermarks.items()
+                }
+            )
+        )
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+        with tmp.open('wb') as f:
+            np.savez(f, **arrays)
+        tmp.replace(path)
+
+    def _load(self) -> None:
+        """Loads the positions and the watermarks of the checkpoint."""
+        with np.load(self._checkpoint, allow_pickle=False) as archive:
+            arrays = {name: archive[name] for name in archive.files}
+
+        watermarks = json.loads(str(arrays.pop('watermarks')))
+        self._positions = decode_frame(arrays)
+        self._watermarks = {
+            source: pd.Timestamp(watermark['date']) for source, watermark in watermarks.items()
+        }
+        self._seen = {source: dict(watermark['seen']) for source, watermark in watermarks.items()}
+
+    def _new_events(self, events: pd.DataFrame, source: str | None) -> pd.DataFrame:
+        """Keeps the events at or after the watermark of their source.
+
+        Args:
+            events (DataFrame): A chunk of events.
+            source (str | None): The source of the events, or None to
+                tell the dividends from the other events.
+
+        Returns:
+            DataFrame: The events not before the watermark, with their
+                'Source'.
+        """
+        events = events[list(EVENT_COLUMNS)].dropna(subset=['ISIN'])
+        if source is None:
+            sources = np.where(
+                events['Type'] == 'dividend', ACCOUNT_SOURCE, TRANSACTIONS_SOURCE
+            ).astype(object)
+        else:
+            sources = np.full(len(events), source, dtype=object)
+        events = events.assign(Source=sources)
+
+        new = np.ones(len(events), dtype=bool)
+        dates = events['Date']
+        for name, watermark in self._watermarks.items():
+            new &= (sources != name) | (dates >= watermark)
+        return events[new]
+
+    def _unseen(self, events: pd.DataFrame) -> pd.DataFrame:
+        """Drops the events at a watermark that were already folded.
+
+        The n-th event with a given content at the watermark of its
+        source is new if fewer than n such events were folded.
+
+        Args:
+            events (DataFrame): The events not before the watermark of
+                their source, in the order of the export.
+
+        Returns:
+            DataFrame: The new events.
+        """
+        tied = np.zeros(len(events), dtype=bool)
+        for name, watermark in self._watermarks.items():
+            tied |= ((events['Source'] == name) & (events['Date'] == watermark)).to_numpy()
+        if not tied.any():
+            return events
+
+        positions = np.flatnonzero(tied)
+        sources = events['Source'].to_numpy()[positions]
+        keys = _event_keys(events.iloc[positions])
+        occurrences = (
+            pd.DataFrame({'Source': sources, 'Key': keys})
+            .groupby(['Source', 'Key'], sort=False)
+            .cumcount()
+        )
+        seen = [self._seen[source].get(key, 0) for source, key in zip(sources, keys, strict=True)]
+
+        new = np.ones(len(events), dtype=bool)
+        new[positions[occurrences.to_numpy() < seen]] = False
+        return events[new]
+
+    def _fold(self, events: pd.DataFrame) -> None:
+        """Folds sorted events into the positions.
+
+        Every event maps the amount held x to a * x + b: a trade adds
+        its signed quantity, a split multiplies by its ratio. The maps
+        of an ISIN compose to A * x + B, where A is the product of the
+        ratios and each trade contributes its quantity times the
+        ratios of the splits after it, so one grouped suffix product
+        folds every ISIN at once.
+
+        Args:
+            events (DataFrame): The new events, sorted by date.
+
+        Raises:
+            ValueError: If an event has an unknown type.
+        """
+        kinds = events['Type'].to_numpy()
+        unknown = set(kinds) - set(EVENT_TYPES)
+        if unknown:
+            msg = f'Unknown event types {sorted(unknown)}. Expected one of {EVENT_TYPES}.'
+            raise ValueError(msg)
+
+        positions = self._positions
+        isins = events['ISIN'].to_numpy(dtype=object)
+        index = positions.index.append(pd.Index(isins).difference(positions.index))
+        codes = index.get_indexer(isins)
+        size = len(index)
+
+        quantity = events['Quantity'].to_numpy(dtype=float)
+        cash = events['Cash'].to_numpy(dtype=float)
+        buy, sell = kinds == 'buy', kinds == 'sell'
+        trade = buy | sell
+
+        ratio = np.where(kinds == 'split', quantity, 1.0)
+        signed = np.where(buy, quantity, np.where(sell, -quantity, 0.0))
+        inclusive = pd.Series(ratio[::-1]).groupby(codes[::-1]).cumprod().to_numpy()[::-1]
+        after = inclusive / ratio
+
+        scale = np.ones(size)
+        np.multiply.at(scale, codes, ratio)
+        old = positions.reindex(index)
+
+        amount = scale * old['Amount'].fillna(0).to_numpy() + np.bincount(
+            codes, weights=signed * after, minlength=size
+        )
+
+        closing = old['Closing'].to_numpy(dtype=float) / scale
+        price = old['Price'].to_numpy(dtype=float) / scale
+        last = np.full(size, -1)
+        np.maximum.at(last, codes[trade], np.flatnonzero(trade))
+        traded = last >= 0
+        local = events['Price'].to_numpy(dtype=float)[last[traded]] / after[last[traded]]
+        closing[traded] = local
+        price[traded] = local / events['Rate'].to_numpy(dtype=float)[last[traded]]
+
+        products = old['Product'].to_numpy(dtype=object)
+        first = np.full(size, len(codes))
+        np.minimum.at(first, codes, np.arange(len(codes)))
+        unnamed = pd.isna(products) & (first < len(codes))
+        products[unnamed] = events['Product'].to_numpy(dtype=object)[first[unnamed]]
+
+        self._positions = pd.DataFrame(
+            {
+                'Product': products,
+                'Amount': amount,
+                'Closing': closing,
+                'Price': price,
+                'Invested': old['Invested'].fillna(0).to_numpy()
+                - np.bincount(codes, weights=np.where(trade, cash, 0.0), minlength=size),
+                'Dividends': old['Dividends'].fillna(0).to_numpy()
+                + np.bincount(
+                    codes, weights=np.where(kinds == 'dividend', cash, 0.0), minlength=size
+                ),
+            },
+            index=index.rename('ISIN'),
+        )
+
+    def _advance(self, events: pd.DataFrame) -> None:
+        """Moves the watermark of every source to its latest event.
+
+        Args:
+            events (DataFrame): The new events, sorted by date.
+        """
+        for source, group in events.groupby('Source', sort=False):
+            latest = group['Date'].iloc[-1]
+            counts = Counter(_event_keys(group[group['Date'] == latest]))
+
+            if latest == self._watermarks.get(source):
+                self._seen[source] = dict(Counter(self._seen[source]) + counts)
+            else:
+                self._watermarks[source] = latest
+                self._seen[source] = dict(counts)
+
+
+def _read_chunks(
+    file: str | Path, columns: tuple[str, ...], chunksize: int
+) -> Iterator[pd.DataFrame]:
+    """Reads a Degiro export in chunks with normalized column names.
+
+    Args:
+        file (str | Path): The csv file.
+        columns (tuple[str, ...]): The names of its columns.
+        chunksize (int): The number of rows of each chunk.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If the file doesn't have the expected number of
+            columns.
+
+    Yields:
+        DataFrame: Each chunk, with the given column names.
+    """
+    with pd.read_csv(file, chunksize=chunksize, dtype=str) as reader:
+        for chunk in reader:
+            if len(chunk.columns) != len(columns):
+                msg = (
+                    f'Column mismatch: expected {len(columns)} columns {columns} '
+                    f'but received {len(chunk.columns)}: {chunk.columns}.'
+                )
+                raise ValueError(msg)
+            chunk.columns = pd.Index(columns)
+            yield chunk
+
+
+def _event_keys(events: pd.DataFrame) -> list[str]:
+    """Returns a key of the content of every event.
+
+    The key is a hash of the text of the `EVENT_COLUMNS`, so it doesn't
+    depend on the version of pandas, unlike `hash_pandas_object`, and
+    can be saved in a checkpoint.
+
+    Args:
+        events (DataFrame): The events.
+
+    Returns:
+        list[str]: The key of every event.
+    """
+    columns = [events[col].astype(str) for col in EVENT_COLUMNS]
+    return [
+        hashlib.blake2b('\x1f'.join(row).encode(), digest_size=8).hexdigest()
+        for row in zip(*columns, strict=True)
+    ]
+
+
+def _to_float(values: pd.Series) -> pd.Series:
+    """Parses numbers with a decimal comma or point.
+
+    Args:
+        values (Series): The strings to parse.
+
+    Raises:
+        ValueError: If a value can't be converted to float.
+
+    Returns:
+        Series: The numbers, NaN where empty.
+    """
+    try:
+        return values.str.replace(',', '.', regex=False).astype(float)
+    except ValueError:
+        msg = f'Failed to convert column {values.name} to float. Check for non-numeric values.'
+        raise ValueError(msg) from None
+
+
+def _to_datetime(chunk: pd.DataFrame) -> pd.Series:
+    """Parses the 'Date' (dd-mm-yyyy) and 'Time' (HH:MM) columns.
+
+    Args:
+        chunk (DataFrame): The chunk of a Degiro export.
+
+    Returns:
+        Series: The timestamps.
+    """
+    return pd.to_datetime(chunk['Date'] + ' ' + chunk['Time'], format='%d-%m-%Y %H:%M')
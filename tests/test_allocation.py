@@ -0,0 +1,91 @@
+import shutil
+
+import pandas as pd
+import pytest
+
+from portfoliomanager.allocation import Allocation, AllocationRegistry
+from portfoliomanager.degiroportfolio import DegiroPortfolio
+from portfoliomanager.portfolio import FULL_PERCENTAGE, Portfolio
+from tests.conftest import allocations_csv, csv_dir, portfolios_csv
+
+
+@pytest.fixture
+def model():
+    return Allocation.from_csv(csv_dir / allocations_csv[0])
+
+
+def test_allocation_from_csv(model):
+    expected = Portfolio._read_allocation(csv_dir / allocations_csv[0])
+
+    assert model.frame.equals(expected)
+    assert model.isins.equals(expected.index)
+    assert model.weights.tolist() == expected['Expected Percentage'].tolist()
+    assert model.source == str(csv_dir / allocations_csv[0])
+    assert len(model) == len(expected)
+
+
+def test_allocation_weights_read_only(model):
+    with pytest.raises(ValueError, match=r'read-only'):
+        model.weights[0] = 100
+
+
+def test_allocation_raise_ValueError():
+    allocation = pd.DataFrame(
+        {'Expected Percentage': [50.0]}, index=pd.Index(['US4642872000'], name='ISIN')
+    )
+
+    with pytest.raises(ValueError, match=r'The total sum of percentages .*'):
+        Allocation(allocation)
+
+
+def test_portfolio_shares_allocation(model):
+    portfolios = [DegiroPortfolio(csv_dir / portfolios_csv[0], model) for _ in range(2)]
+    own = DegiroPortfolio(csv_dir / portfolios_csv[0], csv_dir / allocations_csv[0])
+
+    assert all(p.model is model and p._al is model.frame for p in portfolios)
+    assert own.model is None
+    assert portfolios[0].summary.equals(own.summary)
+
+
+def test_portfolio_set_allocation(model):
+    portfolio = DegiroPortfolio(csv_dir / portfolios_csv[0], csv_dir / allocations_csv[1])
+
+    portfolio.set_allocation(model)
+    assert portfolio.model is model
+    assert portfolio.summary['Expected Percentage'].sum() == FULL_PERCENTAGE
+
+    portfolio.set_allocation(model.frame.copy())
+    assert portfolio.model is None
+
+
+def test_portfolio_compact_keeps_shared_allocation(model):
+    portfolio = DegiroPortfolio(csv_dir / portfolios_csv[0], model, compact=True)
+
+    assert portfolio._al is model.frame
+
+
+def test_registry_parses_each_model_once(tmp_path):
+    for account in range(3):
+        shutil.copy(csv_dir / allocations_csv[0], tmp_path / f'allocation_{account}.csv')
+    shutil.copy(csv_dir / allocations_csv[1], tmp_path / 'allocation_other.csv')
+
+    registry = AllocationRegistry()
+    models = [registry.get(tmp_path / f'allocation_{account}.csv') for account in range(3)]
+    other = registry.get(tmp_path / 'allocation_other.csv')
+
+    assert models[0] is models[1] is models[2]
+    assert other is not models[0]
+    assert registry.models == [models[0], other]
+    assert len(registry) == len(registry.models)
+
+
+def test_registry_raise_errors(tmp_path):
+    allocation = tmp_path / 'allocation.csv'
+    allocation.write_text('ISIN,Expected Percentage\nUS4642872000,50\n')
+    registry = AllocationRegistry()
+
+    with pytest.raises(ValueError, match=r'The total sum of percentages .*'):
+        registry.get(allocation)
+    with pytest.raises(FileNotFoundError):
+        registry.get(tmp_path / 'missing.csv')
+    assert not len(registry)
@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from portfoliomanager.backtest import backtest, backtest_grid
+
+
+@pytest.fixture
+def prices():
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range('2020-01-01', '2021-12-31')
+    returns = rng.normal(0.0003, 0.01, size=(len(dates), 4))
+    return pd.DataFrame(
+        100 * np.exp(np.cumsum(returns, axis=0)),
+        index=dates,
+        columns=['US4642872000', 'IE00B3XXRP09', 'US4642872265', 'IE00BYZK4669'],
+    )
+
+
+@pytest.fixture
+def allocation():
+    return pd.Series(
+        [40, 30, 30, 0],
+        index=['US4642872000', 'IE00B3XXRP09', 'US4642872265', 'IE00BYZK4669'],
+        name='Expected Percentage',
+    )
+
+
+def naive_backtest(prices, allocation, strategy, frequency, threshold):
+    allocation = allocation[allocation > 0]
+    target = allocation.to_numpy() / 100
+    matrix = prices[allocation.index].to_numpy()
+    periods = prices.index.to_period(frequency).asi8 if frequency else None
+
+    shares = 10000 * target / matrix[0]
+    values = [10000.0]
+    dates = []
+    for day in range(1, len(matrix)):
+        current = matrix[day] * shares
+        due = frequency is None or periods[day] != periods[day - 1]
+        drift = np.abs(current / current.sum() * 100 - allocation.to_numpy()).max()
+        if due and (threshold is None or drift > threshold):
+            if strategy == 'sell':
+                current = current.sum() * target
+            else:
+                current = target * (current / target).max()
+            shares = current / matrix[day]
+            dates.append(prices.index[day])
+        values.append(current.sum())
+
+    return pd.Series(values, index=prices.index), dates
+
+
+@pytest.mark.parametrize(
+    ('strategy', 'frequency', 'threshold'),
+    [
+        ('sell', 'monthly', None),
+        ('sell', None, 2),
+        ('no_sell', 'quarterly', None),
+        ('no_sell', 'monthly', 1),
+    ],
+)
+def test_backtest_matches_naive(prices, allocation, strategy, frequency, threshold):
+    result = backtest(
+        prices, allocation, strategy=strategy, frequency=frequency, threshold=threshold
+    )
+    values, dates = naive_backtest(
+        prices, allocation, strategy, frequency and frequency[0].upper(), threshold
+    )
+
+    np.testing.assert_allclose(result.values, values)
+    assert result.rebalances.index.tolist() == dates
+    assert result.weights.columns.tolist() == ['US4642872000', 'IE00B3XXRP09', 'US4642872265']
+    assert (result.weights.loc[dates].to_numpy() == [40, 30, 30]).all()
+
+
+def test_backtest_summary(prices, allocation):
+    sell = backtest(prices, allocation).summary()
+    no_sell = backtest(prices, allocation, strategy='no_sell').summary()
+
+    assert sell['rebalances'] == prices.index.to_period('M').nunique() - 1
+    assert sell['contributions'] == 0
+    assert no_sell['contributions'] > 0
+    assert no_sell['max_drawdown'] <= 0
+    assert sell['annual_return'] == pytest.approx(
+        (sell['final_value'] / 10000) ** (365.25 / 730) - 1
+    )
+
+
+def test_backtest_raise_ValueError(prices, allocation):
+    with pytest.raises(ValueError, match=r'Unknown strategy .*'):
+        backtest(prices, allocation, strategy='hold')
+
+    with pytest.raises(ValueError, match=r'Unknown frequency .*'):
+        backtest(prices, allocation, frequency='weekly')
+
+    with pytest.raises(ValueError, match=r'A rebalancing frequency or a drift threshold .*'):
+        backtest(prices, allocation, frequency=None)
+
+    with pytest.raises(ValueError, match=r'The total sum of percentages .*'):
+        backtest(prices, allocation * 2)
+
+    with pytest.raises(ValueError, match=r".*\['US4642872000'\]."):
+        backtest(prices.drop(columns='US4642872000'), allocation)
+
+
+def test_backtest_grid(prices, allocation):
+    grid = [{'strategy': 'sell', 'threshold': 2}, {'strategy': 'no_sell', 'frequency': 'yearly'}]
+
+    summaries = backtest_grid(prices, allocation, grid, max_workers=2)
+
+    assert summaries[['strategy', 'threshold', 'frequency']].fillna('-').to_numpy().tolist() == [
+        ['sell', 2, '-'],
+        ['no_sell', '-', 'yearly'],
+    ]
+    for params, (_, row) in zip(grid, summaries.iterrows(), strict=True):
+        assert (
+            row['final_value'] == backtest(prices, allocation, **params).summary()['final_value']
+        )
@@ -0,0 +1,145 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from portfoliomanager.allocation import Allocation
+from portfoliomanager.batch import BatchPortfolioManager
+from portfoliomanager.degiroportfolio import DegiroPortfolio
+from portfoliomanager.fees import FeeSchedule
+from portfoliomanager.portfoliomanager import PortfolioManager
+from tests.conftest import allocations_csv, csv_dir, currencies, portfolios_csv
+
+
+@pytest.fixture
+def portfolios(tmp_path):
+    allocation_int = tmp_path / 'allocation_int.csv'
+    allocation_int.write_text(
+        'ISIN,Expected Percentage\n'
+        'US4642872000,40\n'
+        'IE00B3XXRP09,10\n'
+        'US4642872265,30\n'
+        'IE00BYZK4669,10\n'
+        'US9220428745,10\n'
+    )
+    allocation_new_isin = tmp_path / 'allocation_new_isin.csv'
+    allocation_new_isin.write_text(
+        'ISIN,Expected Percentage\n'
+        'US4642872000,40\n'
+        'IE00B3XXRP09,10\n'
+        'US4642872265,30\n'
+        'IE00BYZK4669,10\n'
+        'US9220428745,5\n'
+        'LU0000000001,5\n'
+    )
+
+    return [
+        *(
+            DegiroPortfolio(csv_dir / assets, csv_dir / allocation, currency)
+            for assets, allocation, currency in zip(
+                portfolios_csv, allocations_csv, currencies, strict=True
+            )
+        ),
+        DegiroPortfolio(csv_dir / portfolios_csv[0], allocation_int),
+        DegiroPortfolio(csv_dir / portfolios_csv[0], allocation_new_isin),
+    ]
+
+
+def test_batch_requires_portfolios():
+    with pytest.raises(ValueError, match=r'At least one portfolio .*'):
+        BatchPortfolioManager([])
+
+
+def test_batch_isins(portfolios):
+    batch = BatchPortfolioManager(portfolios)
+
+    assert batch.isins.is_monotonic_increasing
+    assert batch.isins.is_unique
+    assert 'LU0000000001' in batch.isins
+
+
+def test_batch_total_values(portfolios):
+    batch = BatchPortfolioManager(portfolios)
+
+    assert batch.total_values.tolist() == [p.total_value for p in portfolios]
+
+
+def test_batch_rebalance_sell(portfolios):
+    batch = BatchPortfolioManager(portfolios)
+
+    for portfolio, frame in zip(portfolios, batch.rebalance_sell(), strict=True):
+        assert frame.equals(PortfolioManager(portfolio).rebalance_sell())
+
+
+def test_batch_rebalance_no_sell(portfolios):
+    batch = BatchPortfolioManager(portfolios)
+
+    for portfolio, frame in zip(portfolios, batch.rebalance_no_sell(), strict=True):
+        assert frame.equals(PortfolioManager(portfolio).rebalance_no_sell())
+
+
+def test_batch_groups_models(portfolios):
+    model = Allocation.from_csv(csv_dir / allocations_csv[0])
+    shared = [DegiroPortfolio(csv_dir / portfolios_csv[0], model) for _ in range(2)]
+    batch = BatchPortfolioManager([*shared, *portfolios, shared[0]])
+
+    assert batch.groups.tolist() == [0, 0, 1, 2, 3, 4, 0]
+    assert batch.models[0] is model.frame
+
+    for portfolio, frame in zip(batch._portfolios, batch.rebalance_sell(), strict=True):
+        assert frame.equals(PortfolioManager(portfolio).rebalance_sell())
+    for portfolio, frame in zip(batch._portfolios, batch.rebalance_no_sell(), strict=True):
+        assert frame.equals(PortfolioManager(portfolio).rebalance_no_sell())
+
+
+def test_batch_rebalance_no_sell_raise_ValueError(portfolios, tmp_path):
+    allocation = tmp_path / 'allocation_zero.csv'
+    allocation.write_text('ISIN,Expected Percentage\nUS4642872000,100\n')
+    portfolios.append(DegiroPortfolio(csv_dir / portfolios_csv[0], allocation))
+
+    batch = BatchPortfolioManager(portfolios)
+
+    with pytest.raises(ValueError, match=r'While performing a no-sell rebalance, .*\[4\]'):
+        batch.rebalance_no_sell()
+
+
+def test_batch_rebalance_deposit(portfolios):
+    batch = BatchPortfolioManager(portfolios)
+    deposits = [1000, 0, 12345.67, 50]
+
+    frames = batch.rebalance_deposit(deposits)
+
+    for portfolio, deposit, frame in zip(portfolios, deposits, frames, strict=True):
+        assert frame.equals(PortfolioManager(portfolio).rebalance_deposit(deposit))
+
+    np.testing.assert_allclose(batch.movements_deposit(deposits).sum(axis=1), deposits)
+
+
+def test_batch_shares(portfolios):
+    batch = BatchPortfolioManager(portfolios)
+    prices = pd.Series(10.0, index=batch.isins)
+    deposits = [1000, 0, 12345.67, 50]
+
+    shares = batch.shares(batch.movements_deposit(deposits), prices)
+
+    for row, (portfolio, deposit) in enumerate(zip(portfolios, deposits, strict=True)):
+        pm = PortfolioManager(portfolio)
+        orders = pm.orders(pm.rebalance_deposit(deposit), prices)
+        assert shares[row, batch.isins.get_indexer(orders.index)].tolist() == (
+            orders['Shares'].tolist()
+        )
+
+
+def test_batch_rebalance_fees(portfolios):
+    batch = BatchPortfolioManager(portfolios)
+    fees = {'EAM': FeeSchedule(2.0, 0.05), 'NYSE': FeeSchedule(0.5, 0.1)}
+    exchanges = pd.Series(
+        np.where(batch.isins.str.startswith('US'), 'NYSE', 'EAM'), index=batch.isins
+    )
+
+    frames = batch.rebalance_fees(fees, tolerance=1, min_trade=500, exchanges=exchanges)
+
+    for portfolio, frame in zip(portfolios, frames, strict=True):
+        expected = PortfolioManager(portfolio).rebalance_fees(
+            fees, tolerance=1, min_trade=500, exchanges=exchanges
+        )
+        assert frame.equals(expected)
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from benchmarks import run
+from benchmarks.synthetic import generate_accounts, generate_isins, isin_check_digit
+from portfoliomanager.degiroportfolio import DegiroPortfolio
+from portfoliomanager.portfoliomanager import PortfolioManager
+
+
+@pytest.mark.parametrize(
+    'isin',
+    ['US0378331005', 'IE00B3XXRP09', 'US4642872000', 'IE00BYZK4669', 'US9220428745'],
+)
+def test_isin_check_digit(isin):
+    assert isin_check_digit(isin[:-1]) == isin[-1]
+
+
+def test_generate_isins():
+    size = 50
+    isins = generate_isins(size, np.random.default_rng(0))
+
+    assert len(set(isins)) == size
+    assert all(isin_check_digit(isin[:-1]) == isin[-1] for isin in isins)
+
+
+def test_generate_accounts(tmp_path):
+    n_accounts, n_assets = 3, 8
+    files = generate_accounts(tmp_path, n_accounts, n_assets, seed=1)
+
+    assert len(files) == n_accounts
+    for assets, allocation in files:
+        raw = DegiroPortfolio._read_file(assets)
+        assert raw.iloc[:, 1].isna().any()
+        assert raw.iloc[:, 3].dropna().str.contains(',').all()
+
+        portfolio = DegiroPortfolio(assets, allocation)
+        # Every asset held, plus one allocated asset that is not held.
+        assert len(portfolio._as) == n_assets
+        assert len(portfolio._al) == n_assets + 1
+        assert PortfolioManager(portfolio).rebalance_no_sell()['Movement'].min() == 0
+
+
+def test_generate_accounts_deterministic(tmp_path):
+    first = generate_accounts(tmp_path / 'first', 2, 5, seed=3)
+    second = generate_accounts(tmp_path / 'second', 2, 5, seed=3)
+
+    for (assets_a, allocation_a), (assets_b, allocation_b) in zip(first, second, strict=True):
+        assert assets_a.read_text() == assets_b.read_text()
+        assert allocation_a.read_text() == allocation_b.read_text()
+
+
+def test_run(mocker):
+    mocker.patch.dict(run.SCALES, {'tiny': {'n_accounts': 2, 'n_assets': 3}})
+
+    results = run.run(['tiny'], repeat=1)
+
+    assert set(results['tiny']) == {
+        'read_portfolio',
+        'read_allocation',
+        'summary',
+        'rebalance_sell',
+        'rebalance_no_sell',
+    }
+    assert all(m['seconds'] > 0 and m['peak_bytes'] > 0 for m in results['tiny'].values())
+
+
+def test_compare():
+    baseline = {'small': {'summary': {'seconds': 0.1, 'peak_bytes': 1000}}}
+    results = {
+        'small': {
+            'summary': {'seconds': 0.2, 'peak_bytes': 1100},
+            'rebalance_sell': {'seconds': 1, 'peak_bytes': 1},
+        }
+    }
+
+    regressions = run.compare(results, baseline, 1.5)
+
+    assert len(regressions) == 1
+    assert regressions[0].startswith('small/summary: seconds')
+
+
+def test_compare_below_min_seconds():
+    baseline = {'small': {'summary': {'seconds': 1e-5, 'peak_bytes': 1000}}}
+    results = {'small': {'summary': {'seconds': 5e-4, 'peak_bytes': 1000}}}
+
+    assert not run.compare(results, baseline, 1.5)
+
+
+def test_main_regression(mocker, tmp_path):
+    baseline = tmp_path / 'baseline.json'
+    mocker.patch.object(
+        run, 'run', return_value={'small': {'summary': {'seconds': 1.0, 'peak_bytes': 1}}}
+    )
+
+    assert run.main(['--baseline', str(baseline), '--save']) == 0
+    assert run.main(['--baseline', str(baseline)]) == 0
+
+    run.run.return_value = {'small': {'summary': {'seconds': 2.0, 'peak_bytes': 1}}}
+    assert run.main(['--baseline', str(baseline)]) == 1
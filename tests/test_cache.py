@@ -0,0 +1,130 @@
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from portfoliomanager.cache import PortfolioCache
+from portfoliomanager.degiroportfolio import DegiroPortfolio
+from portfoliomanager.portfolio import Portfolio
+from tests.conftest import allocations_csv, csv_dir, portfolios_csv
+
+
+@pytest.fixture
+def csv_files(tmp_path):
+    files = []
+    for assets, allocation in zip(portfolios_csv, allocations_csv, strict=True):
+        shutil.copy(csv_dir / assets, tmp_path / assets)
+        shutil.copy(csv_dir / allocation, tmp_path / allocation)
+        files.append((tmp_path / assets, tmp_path / allocation))
+    return files
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return PortfolioCache(tmp_path / 'cache')
+
+
+def test_cache_round_trip(csv_files, cache, mocker):
+    spy_read_file = mocker.spy(Portfolio, '_read_file')
+
+    for assets, allocation in csv_files:
+        expected = DegiroPortfolio(assets, allocation)
+        DegiroPortfolio(assets, allocation, cache=cache)
+        cached = DegiroPortfolio(assets, allocation, cache=cache)
+
+        assert cached._as.equals(expected._as)
+        assert cached._al.equals(expected._al)
+        assert cached.summary.equals(expected.summary)
+
+    assert spy_read_file.call_count == 2 * 2 * len(csv_files)
+    assert len(list(cache.directory.glob('*.npz'))) == 2 * len(csv_files)
+
+
+def test_cache_miss_on_change(csv_files, cache, mocker):
+    assets, allocation = csv_files[0]
+    DegiroPortfolio(assets, allocation, cache=cache)
+
+    amount = 501
+    assets.write_text(assets.read_text().replace('500,', f'{amount},', 1))
+    spy_clean_portfolio = mocker.spy(DegiroPortfolio, '_clean_portfolio')
+
+    portfolio = DegiroPortfolio(assets, allocation, cache=cache)
+
+    assert spy_clean_portfolio.call_count == 1
+    assert portfolio._as['Amount'].iloc[0] == amount
+
+
+def test_cache_disabled(csv_files, tmp_path, mocker):
+    cache = PortfolioCache(tmp_path / 'cache', enabled=False)
+    spy_read_file = mocker.spy(Portfolio, '_read_file')
+
+    assets, allocation = csv_files[0]
+    DegiroPortfolio(assets, allocation, cache=cache)
+    DegiroPortfolio(assets, allocation, cache=cache)
+
+    assert spy_read_file.call_count == 2 * 2
+    assert not cache.directory.exists()
+
+
+def test_cache_unwritable(csv_files, tmp_path):
+    directory = tmp_path / 'cache'
+    directory.write_text('')
+    cache = PortfolioCache(directory)
+
+    assets, allocation = csv_files[0]
+    portfolio = DegiroPortfolio(assets, allocation, cache=cache)
+
+    assert portfolio.summary.equals(DegiroPortfolio(assets, allocation).summary)
+    assert directory.is_file()
+
+
+def test_cache_concurrent_store(csv_files, cache):
+    assets, allocation = csv_files[0]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        portfolios = list(
+            executor.map(lambda _: DegiroPortfolio(assets, allocation, cache=cache), range(16))
+        )
+
+    assert all(p.summary.equals(portfolios[0].summary) for p in portfolios)
+    assert not list(cache.directory.glob('*.tmp'))
+
+
+def test_cache_eviction(csv_files, tmp_path):
+    cache = PortfolioCache(tmp_path / 'cache', max_bytes=1)
+
+    for assets, allocation in csv_files:
+        DegiroPortfolio(assets, allocation, cache=cache)
+
+    assert len(list(cache.directory.glob('*.npz'))) <= 1
+
+
+def test_cache_corrupted_entry(csv_files, cache):
+    assets, allocation = csv_files[0]
+    expected = DegiroPortfolio(assets, allocation, cache=cache)
+
+    for entry in cache.directory.glob('*.npz'):
+        entry.write_bytes(b'corrupted')
+
+    assert DegiroPortfolio(assets, allocation, cache=cache)._as.equals(expected._as)
+
+
+def test_cache_clear(csv_files, cache):
+    assets, allocation = csv_files[0]
+    DegiroPortfolio(assets, allocation, cache=cache)
+
+    cache.clear()
+
+    assert not list(cache.directory.glob('*.npz'))
+
+
+def test_fingerprint_namespace(csv_files):
+    assets, _ = csv_files[0]
+
+    assert PortfolioCache.fingerprint(assets, 'a') != PortfolioCache.fingerprint(assets, 'b')
+    assert PortfolioCache.fingerprint(assets, 'a') == PortfolioCache.fingerprint(assets, 'a')
+
+
+def test_fingerprint_raise_FileNotFoundError(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        PortfolioCache.fingerprint(tmp_path / 'missing.csv', 'a')
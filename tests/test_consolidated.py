@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from portfoliomanager.consolidated import ConsolidatedPortfolio
+from portfoliomanager.degiroportfolio import DegiroPortfolio
+from portfoliomanager.fx import FxRates
+from portfoliomanager.portfoliomanager import PortfolioManager
+from tests.conftest import allocations_csv, csv_dir, currencies, portfolios_csv
+
+
+@pytest.fixture
+def accounts():
+    return [
+        DegiroPortfolio(csv_dir / assets, csv_dir / allocation, currency)
+        for assets, allocation, currency in zip(
+            portfolios_csv, allocations_csv, currencies, strict=True
+        )
+    ]
+
+
+@pytest.fixture
+def fx():
+    return FxRates({'GBP': 1.25}, 'EUR')
+
+
+def test_consolidated_requires_accounts():
+    with pytest.raises(ValueError, match=r'At least one account .*'):
+        ConsolidatedPortfolio.from_frames([], pd.DataFrame({'Expected Percentage': [100]}))
+
+
+def test_consolidated_requires_fx(accounts):
+    with pytest.raises(ValueError, match=r'Exchange rates are required .* GBP into EUR\.'):
+        ConsolidatedPortfolio(accounts, csv_dir / allocations_csv[0])
+
+
+def test_consolidated_same_account_twice(accounts):
+    account = accounts[0]
+    consolidated = ConsolidatedPortfolio([account, account], csv_dir / allocations_csv[0])
+
+    pd.testing.assert_series_equal(consolidated._as['Amount'], account._as['Amount'] * 2)
+    assert consolidated.total_value == pytest.approx(account.total_value * 2)
+    pd.testing.assert_series_equal(
+        consolidated.summary['Current Percentage'], account.summary['Current Percentage']
+    )
+
+
+def test_consolidated_keeps_first_holding(accounts):
+    first, second = (
+        accounts[0],
+        DegiroPortfolio(csv_dir / portfolios_csv[0], csv_dir / allocations_csv[0]),
+    )
+    second._as['Product'] = 'SECOND'
+    second._as['Closing'] *= 2
+
+    consolidated = ConsolidatedPortfolio([first, second], csv_dir / allocations_csv[0])
+
+    assert consolidated._as['Product'].equals(first._as['Product'])
+    assert consolidated._as['Closing'].equals(first._as['Closing'])
+
+
+def test_consolidated_sums_union(accounts, fx):
+    eur, gbp = accounts
+    consolidated = ConsolidatedPortfolio(accounts, csv_dir / allocations_csv[0], fx=fx)
+
+    assert consolidated.currency == 'EUR'
+    assert consolidated._as.index.is_unique
+    assert set(consolidated._as.index) == set(eur._as.index) | set(gbp._as.index)
+
+    expected = eur._as['Current Value'].add(gbp._as['Current Value'] * 1.25, fill_value=0)
+    pd.testing.assert_series_equal(
+        consolidated._as['Current Value'],
+        expected.reindex(consolidated._as.index),
+        check_names=False,
+    )
+    assert consolidated.total_value == pytest.approx(eur.total_value + gbp.total_value * 1.25)
+
+
+def test_consolidated_account_values(accounts, fx):
+    consolidated = ConsolidatedPortfolio(accounts, csv_dir / allocations_csv[0], fx=fx)
+    values = consolidated.account_values()
+
+    assert values.shape == (len(consolidated._as), 2)
+    np.testing.assert_allclose(values.sum(axis=1), consolidated._as['Current Value'])
+    assert values[1].sum() == pytest.approx(accounts[1].total_value * 1.25)
+
+
+def test_consolidated_account_values_follow_updates(accounts, fx):
+    consolidated = ConsolidatedPortfolio(accounts, csv_dir / allocations_csv[0], fx=fx)
+    before = consolidated.account_values()
+    isin = consolidated._as.index[0]
+    price = consolidated.prices[isin]
+
+    consolidated.update_prices(pd.Series({isin: price * 2}))
+    consolidated.currency = 'GBP'
+    values = consolidated.account_values()
+
+    np.testing.assert_allclose(values.sum(axis=1), consolidated._as['Current Value'])
+    np.testing.assert_allclose(values.loc[isin], before.loc[isin] * 2 / 1.25)
+
+
+def test_consolidated_from_frames(accounts):
+    allocation = accounts[0]._al
+    consolidated = ConsolidatedPortfolio.from_frames(accounts[:1], allocation)
+
+    pd.testing.assert_frame_equal(consolidated.summary, accounts[0].summary)
+
+
+def test_consolidated_rebalance(accounts, fx):
+    consolidated = ConsolidatedPortfolio(accounts, csv_dir / allocations_csv[0], fx=fx)
+    rebalance = PortfolioManager(consolidated).rebalance_sell()
+
+    assert rebalance['Movement'].sum() == pytest.approx(0, abs=0.05)
+    np.testing.assert_allclose(
+        (rebalance['Current Value'] + rebalance['Movement']) / consolidated.total_value * 100,
+        rebalance['Expected Percentage'],
+        atol=0.01,
+    )
@@ -1,3 +1,4 @@
+import pandas as pd
 import pytest
 
 from portfoliomanager.degiroportfolio import DegiroPortfolio
@@ -64,3 +65,39 @@ def test_clean_portfolio(read_pickles):
     df_working_from_pickle, df_expected_from_pickle = read_pickles
 
     assert df_expected_from_pickle.equals(DegiroPortfolio._clean_portfolio(df_working_from_pickle))
+
+
+@pytest.mark.parametrize(
+    'read_pickles',
+    zip(portfolios_columns[0:1], portfolios_conv[0:1], strict=True),
+    indirect=True,
+)
+def test_convert_str_columns_to_float_mixed(read_pickles):
+    df_working_from_pickle, df_expected_from_pickle = read_pickles
+    df_working_from_pickle = DegiroPortfolio._dropna_isin(df_working_from_pickle)
+    df_working_from_pickle = DegiroPortfolio._set_index_isin(df_working_from_pickle)
+
+    for col in ('Current Value', 'Closing'):
+        df_working_from_pickle[col] = df_working_from_pickle[col].astype(object)
+        index = df_working_from_pickle.index[0]
+        df_working_from_pickle.loc[index, col] = df_expected_from_pickle.loc[index, col]
+
+    assert df_expected_from_pickle.equals(
+        DegiroPortfolio._convert_str_columns_to_float(df_working_from_pickle)
+    )
+
+
+@pytest.mark.parametrize('read_pickles', zip(portfolios_conv, strict=True), indirect=True)
+def test_parse_local_values(read_pickles):
+    (assets,) = read_pickles
+
+    local = DegiroPortfolio._parse_local_values(assets['Local Value'])
+
+    assert local.index.equals(assets.index)
+    assert local['Local Currency'].isin(['EUR', 'GBP', 'USD']).all()
+    assert (local['Local Value'] == assets['Amount'] * assets['Closing']).all()
+
+
+def test_parse_local_values_raise_ValueError():
+    with pytest.raises(ValueError, match=r'Failed to parse column Local Value.*'):
+        DegiroPortfolio._parse_local_values(pd.Series(['USD 1.00', 'USD']))
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from portfoliomanager.batch import BatchPortfolioManager
+from portfoliomanager.degiroportfolio import DegiroPortfolio
+from portfoliomanager.drift import DriftMonitor
+from tests.conftest import allocations_csv, csv_dir, currencies, portfolios_csv
+
+
+@pytest.fixture
+def batch(tmp_path):
+    assets = tmp_path / 'assets_balanced.csv'
+    assets.write_text(
+        'Product,Symbol/ISIN,Amount,Closing,Local value,Value in EUR\n'
+        'A,US4642872000,10,50.00,EUR 500.00,500.00\n'
+        'B,IE00B3XXRP09,10,30.00,EUR 300.00,300.00\n'
+        'C,US4642872265,10,19.00,EUR 190.00,190.00\n'
+    )
+    allocation = tmp_path / 'allocation_balanced.csv'
+    allocation.write_text(
+        'ISIN,Expected Percentage\nUS4642872000,50\nIE00B3XXRP09,30\nUS4642872265,20\n'
+    )
+
+    return BatchPortfolioManager(
+        [
+            *(
+                DegiroPortfolio(csv_dir / assets, csv_dir / allocation, currency)
+                for assets, allocation, currency in zip(
+                    portfolios_csv, allocations_csv, currencies, strict=True
+                )
+            ),
+            DegiroPortfolio(assets, allocation),
+        ]
+    )
+
+
+def test_screen_absolute(batch):
+    band = 5
+    report = DriftMonitor(absolute=band).screen(batch)
+
+    drift = batch.current_percentages - batch.expected_percentages
+    rows, cols = np.nonzero(np.abs(drift) > band)
+
+    assert report.accounts == [0, 1]
+    assert report.breaches.index.tolist() == list(zip(rows, batch.isins[cols], strict=True))
+    assert (report.breaches['Drift'].abs() > band).all()
+    np.testing.assert_allclose(
+        report.breaches['Drift'],
+        report.breaches['Current Percentage'] - report.breaches['Expected Percentage'],
+    )
+
+
+def test_screen_relative(batch):
+    report = DriftMonitor(relative=0.04).screen(batch)
+
+    assert report.accounts == [0, 1, 2]
+    assert report.breaches.loc[2].index.tolist() == ['US4642872265']
+
+    assert DriftMonitor(relative=0.06).screen(batch).accounts == [0, 1]
+
+
+def test_screen_per_isin_bands(batch):
+    bands = pd.Series({'US4642872265': 0.01})
+
+    report = DriftMonitor(relative=bands).screen(batch)
+
+    assert report.breaches.index.get_level_values('ISIN').unique().tolist() == ['US4642872265']
+
+
+def test_screen_total(batch):
+    report = DriftMonitor(total=1).screen(batch)
+
+    assert report.accounts == [0, 1]
+    assert report.breaches.empty
+    # Only US4642872265 is underweight, so the total drift is its gap.
+    assert report.total_drift[2] == round(20 - 190 / 990 * 100, 2)
+
+
+def test_screen_select(batch):
+    report = DriftMonitor(absolute=5).screen(batch)
+    selected = batch.select(report.accounts)
+
+    for account, frame in zip(report.accounts, selected.rebalance_sell(), strict=True):
+        assert frame.equals(batch.rebalance_sell()[account])
+
+
+def test_drift_monitor_raise_ValueError():
+    with pytest.raises(ValueError, match=r'At least one drift band is required.'):
+        DriftMonitor()
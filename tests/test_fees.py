@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from portfoliomanager.fees import FeeSchedule, exchange_fees, trade_fees
+
+isins = pd.Index(['IE00B3XXRP09', 'US4642872000', 'LU0000000001'], name='ISIN')
+
+
+def test_fee_schedule_cost():
+    schedule = FeeSchedule(fixed=2.0, percentage=0.05)
+
+    assert schedule.cost(np.array([1000.0, 0.0, -2000.0])).tolist() == [2.5, 0.0, 3.0]
+
+
+@pytest.mark.parametrize(('fixed', 'percentage'), [(-1, 0), (0, -0.1), (0, 100)])
+def test_fee_schedule_raise_ValueError(fixed, percentage):
+    with pytest.raises(ValueError, match=r'The fixed fee must not be negative .*'):
+        FeeSchedule(fixed, percentage)
+
+
+def test_exchange_fees_one_schedule():
+    fixed, rates = exchange_fees(FeeSchedule(1.0, 0.1), isins)
+
+    assert fixed.tolist() == [1.0] * 3
+    assert rates.tolist() == [0.001] * 3
+
+
+def test_exchange_fees_exchanges():
+    exchanges = pd.Series(['EAM', 'NYSE', 'EAM'], index=isins)
+    fees = {'EAM': FeeSchedule(2.0), 'NYSE': FeeSchedule(0.5, 0.1)}
+
+    fixed, rates = exchange_fees(fees, isins, exchanges)
+
+    assert fixed.tolist() == [2.0, 0.5, 2.0]
+    assert rates.tolist() == [0.0, 0.001, 0.0]
+
+
+def test_exchange_fees_raise_ValueError():
+    fees = {'EAM': FeeSchedule(), 'NYSE': FeeSchedule()}
+
+    with pytest.raises(ValueError, match=r'A fee schedule per exchange needs .*'):
+        exchange_fees(fees, isins)
+    with pytest.raises(ValueError, match=r"The ISINs \['LU0000000001'\] have no exchange."):
+        exchange_fees(fees, isins, pd.Series(['EAM', 'NYSE'], index=isins[:2]))
+    with pytest.raises(ValueError, match=r"The exchanges \['XETRA'\] have no fee schedule."):
+        exchange_fees(fees, isins, pd.Series(['EAM', 'NYSE', 'XETRA'], index=isins))
+
+
+def test_trade_fees():
+    trades = np.array([[100.0, 0.0, -333.0]])
+
+    fees = trade_fees(trades, np.array([1.0, 1.0, 1.0]), np.array([0.001, 0.001, 0.001]))
+
+    assert fees.tolist() == [[1.1, 0.0, 1.33]]
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from portfoliomanager.fx import FxRates
+
+
+@pytest.fixture
+def fx():
+    return FxRates({'USD': 0.87, 'GBP': 1.25}, 'EUR')
+
+
+def test_matrix(fx):
+    matrix = fx.matrix
+
+    assert fx.base == 'EUR'
+    assert fx.currencies.tolist() == ['EUR', 'USD', 'GBP']
+    np.testing.assert_allclose(np.diag(matrix), 1)
+    np.testing.assert_allclose(matrix.to_numpy() * matrix.to_numpy().T, 1)
+    assert fx.rate('USD', 'GBP') == pytest.approx(0.87 / 1.25)
+    assert fx.rate('USD', 'GBP') == pytest.approx(fx.rate('USD', 'EUR') * fx.rate('EUR', 'GBP'))
+
+
+def test_from_quotes():
+    fx = FxRates.from_quotes({'USD': 1.08}, 'EUR')
+
+    assert fx.rate('EUR', 'USD') == pytest.approx(1.08)
+
+
+def test_convert(fx):
+    values = pd.Series([100.0, 100.0, 100.0], index=['A', 'B', 'C'])
+
+    converted = fx.convert(values, pd.Series(['USD', 'EUR', 'GBP'], index=values.index), 'EUR')
+
+    assert converted.index.equals(values.index)
+    np.testing.assert_allclose(converted, [87, 100, 125])
+    np.testing.assert_allclose(fx.convert(values, 'EUR', 'GBP'), 80)
+
+
+def test_rates_to_raise_ValueError(fx):
+    with pytest.raises(ValueError, match=r".*currencies \['CHF', 'JPY'\]."):
+        fx.rates_to(['USD', 'CHF'], 'JPY')
+
+
+def test_fx_rates_raise_ValueError():
+    with pytest.raises(ValueError, match=r'Every exchange rate must be positive.'):
+        FxRates({'USD': 0})
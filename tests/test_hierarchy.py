@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from portfoliomanager.degiroportfolio import DegiroPortfolio
+from portfoliomanager.hierarchy import AllocationTree
+from portfoliomanager.portfolio import Portfolio
+from portfoliomanager.portfoliomanager import PortfolioManager
+from tests.conftest import allocations_csv, csv_dir, portfolios_csv
+
+
+@pytest.fixture
+def portfolio():
+    return DegiroPortfolio(csv_dir / portfolios_csv[0], csv_dir / allocations_csv[0])
+
+
+@pytest.fixture
+def tree_csv(tmp_path):
+    allocation = tmp_path / 'allocation_tree.csv'
+    allocation.write_text(
+        'ISIN,Asset Class,Region,Expected Percentage\n'
+        'US4642872000,Equity,US,45\n'
+        'IE00B3XXRP09,Equity,US,7.5\n'
+        'IE00BYZK4669,Equity,World,10\n'
+        'US4642872265,Bond,US,30\n'
+        'US9220428745,Equity,Emerging,7.5\n'
+    )
+    return allocation
+
+
+def test_tree_missing_level(portfolio):
+    with pytest.raises(ValueError, match=r"no column for the levels \['Asset Class'\]"):
+        AllocationTree(portfolio._al.assign(Region='US'))
+
+
+def test_tree_unknown_level(tree_csv):
+    tree = AllocationTree.from_csv(tree_csv)
+
+    assert tree.levels == ('Asset Class', 'Region', 'ISIN')
+    with pytest.raises(ValueError, match=r"Unknown level 'Country'.*"):
+        tree.expected('Country')
+
+
+def test_tree_expected(tree_csv):
+    tree = AllocationTree.from_csv(tree_csv)
+
+    assert tree.expected('Asset Class').to_dict() == {('Equity',): 70, ('Bond',): 30}
+    assert tree.expected('Region').to_dict() == {
+        ('Equity', 'US'): 52.5,
+        ('Equity', 'World'): 10,
+        ('Bond', 'US'): 30,
+        ('Equity', 'Emerging'): 7.5,
+    }
+
+
+def test_tree_rollup_isin_matches_summary(tree_csv, portfolio):
+    tree = AllocationTree.from_csv(tree_csv)
+    rollup = tree.rollup(portfolio, 'ISIN').droplevel(['Asset Class', 'Region'])
+
+    pd.testing.assert_frame_equal(
+        rollup.sort_index(), portfolio.summary.sort_index(), check_names=False
+    )
+
+
+def test_tree_rollup_level(tree_csv, portfolio):
+    tree = AllocationTree.from_csv(tree_csv)
+    rollup = tree.rollup(portfolio, 'Asset Class')
+    summary = portfolio.summary
+    equity = summary.index != 'US4642872265'
+
+    assert rollup.loc[('Equity',), 'Current Value'] == summary['Current Value'][equity].sum()
+    assert (
+        rollup.loc[('Bond',), 'Expected Percentage']
+        == (tree.allocation.loc['US4642872265', 'Expected Percentage'])
+    )
+    assert rollup['Current Value'].sum() == pytest.approx(portfolio.total_value)
+
+
+def test_tree_rollup_unallocated(tree_csv, portfolio):
+    allocation = pd.read_csv(tree_csv, index_col='ISIN').drop('US9220428745')
+    allocation.loc['US4642872000', 'Expected Percentage'] = 52.5
+    rollup = AllocationTree(allocation).rollup(portfolio, 'Region')
+
+    unallocated = rollup.loc[('Unallocated', 'Unallocated')]
+    assert unallocated['Expected Percentage'] == 0
+    assert unallocated['Current Value'] == portfolio.summary.loc['US9220428745', 'Current Value']
+
+
+def test_tree_rebalance_level(tree_csv, portfolio):
+    tree = AllocationTree.from_csv(tree_csv)
+    rebalance = PortfolioManager(tree.at_level(portfolio, 'Region')).rebalance_sell()
+
+    assert rebalance['Movement'].sum() == pytest.approx(0, abs=0.05)
+    np.testing.assert_allclose(
+        rebalance['Expected Value'] / portfolio.total_value * 100,
+        tree.expected('Region').reindex(rebalance.index),
+        atol=0.01,
+    )
+    assert portfolio.summary.index.name == 'ISIN'
+
+
+def test_tree_at_level(tree_csv, portfolio):
+    view = AllocationTree.from_csv(tree_csv).at_level(portfolio, 'Region')
+
+    assert type(view) is Portfolio
+    assert view.currency == portfolio.currency
+    assert view.total_value == pytest.approx(portfolio.total_value)
+    with pytest.raises(ValueError, match=r"The portfolio has no 'Local Value' column.*"):
+        _ = view.local_values
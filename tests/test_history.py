@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from portfoliomanager.degiroportfolio import DegiroPortfolio
+from portfoliomanager.history import PriceHistoryStore
+from tests.conftest import allocations_csv, csv_dir, portfolios_csv
+
+
+@pytest.fixture
+def prices():
+    return pd.DataFrame(
+        {'US4642872000': [43.5, 44.0, 45.5], 'IE00B3XXRP09': [45.0, np.nan, 46.0]},
+        index=pd.to_datetime(['2024-01-02', '2024-01-03', '2024-01-05']),
+    )
+
+
+def test_append_and_reopen(tmp_path, prices):
+    store = PriceHistoryStore(tmp_path)
+    store.append(prices.iloc[:1])
+    store.append(prices.iloc[1:])
+
+    reopened = PriceHistoryStore(tmp_path)
+
+    assert len(reopened) == len(prices)
+    assert reopened.isins.tolist() == ['US4642872000', 'IE00B3XXRP09']
+    assert reopened.window().equals(prices.rename_axis(index='Date', columns='ISIN'))
+
+
+def test_append_keeps_earlier_rows(tmp_path, prices):
+    store = PriceHistoryStore(tmp_path, isin_capacity=4)
+    store.append(prices.iloc[:2])
+    dates_file = tmp_path / 'dates.i8'
+    before = dates_file.read_bytes()
+
+    new = prices.iloc[2:].assign(US9220428745=[30.0])
+    store.append(new)
+
+    assert dates_file.read_bytes().startswith(before)
+    assert store.price('US9220428745', '2024-01-05') == new['US9220428745'].iloc[0]
+    assert np.isnan(store.price('US9220428745', '2024-01-02'))
+
+
+def test_append_grows_capacity(tmp_path, prices):
+    store = PriceHistoryStore(tmp_path, isin_capacity=1)
+    store.append(prices.iloc[:1][['US4642872000']])
+    store.append(prices.iloc[1:])
+
+    assert [p.name for p in tmp_path.glob('prices_*.f8')] == ['prices_2.f8']
+    assert PriceHistoryStore(tmp_path).window().equals(store.window())
+    assert store.price('US4642872000', '2024-01-02') == prices['US4642872000'].iloc[0]
+
+
+def test_append_ignores_uncommitted_rows(tmp_path, prices):
+    store = PriceHistoryStore(tmp_path)
+    store.append(prices.iloc[:1])
+    with (tmp_path / 'dates.i8').open('ab') as f:
+        f.write(b'\x00' * 16)
+
+    store = PriceHistoryStore(tmp_path)
+    store.append(prices.iloc[1:])
+
+    assert store.window().equals(prices.rename_axis(index='Date', columns='ISIN'))
+
+
+def test_append_raise_ValueError(tmp_path, prices):
+    store = PriceHistoryStore(tmp_path)
+    store.append(prices)
+
+    with pytest.raises(ValueError, match=r'.* later than the last date .*'):
+        store.append(prices.iloc[-1:])
+
+    with pytest.raises(ValueError, match=r'.* must be unique.'):
+        PriceHistoryStore(tmp_path / 'new').append(pd.concat([prices, prices]))
+
+
+def test_prices_on(tmp_path, prices):
+    store = PriceHistoryStore(tmp_path)
+    store.append(prices)
+
+    assert store.prices_on('2024-01-04').equals(store.prices_on('2024-01-03'))
+    assert store.prices_on(pd.Timestamp('2024-01-05')).equals(prices.iloc[-1])
+
+    with pytest.raises(ValueError, match=r'.* no prices on or before .*'):
+        store.prices_on('2024-01-01')
+
+
+def test_window_is_zero_copy(tmp_path, prices):
+    store = PriceHistoryStore(tmp_path)
+    store.append(prices)
+
+    window = store.window('2024-01-03', '2024-01-04')
+
+    assert window.index.tolist() == [pd.Timestamp('2024-01-03')]
+    assert np.shares_memory(window.to_numpy(), store.window().to_numpy())
+    assert store.window('2024-02-01').empty
+
+
+def test_revalue(tmp_path):
+    portfolio = DegiroPortfolio(csv_dir / portfolios_csv[0], csv_dir / allocations_csv[0])
+    store = PriceHistoryStore(tmp_path)
+    store.append(pd.DataFrame([portfolio.prices], index=pd.to_datetime(['2024-01-02'])))
+    store.append(pd.DataFrame([portfolio.prices * 2], index=pd.to_datetime(['2024-01-03'])))
+
+    values = portfolio.revalue(store, '2024-01-10')
+
+    assert values.name == 'Current Value'
+    assert values.round(2).equals(portfolio._as['Current Value'] * 2)
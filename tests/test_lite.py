@@ -0,0 +1,94 @@
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+from portfoliomanager.degiroportfolio import DegiroPortfolio
+from portfoliomanager.lite import LitePortfolio, LitePortfolioManager
+from portfoliomanager.portfoliomanager import PortfolioManager
+from tests.conftest import allocations_csv, csv_dir, currencies, portfolios_csv
+
+files = list(zip(portfolios_csv, allocations_csv, currencies, strict=True))
+
+
+def test_lite_does_not_import_pandas():
+    code = (
+        'import sys\n'
+        'from portfoliomanager.lite import LitePortfolio, LitePortfolioManager\n'
+        f'p = LitePortfolio.from_csv({str(csv_dir / portfolios_csv[0])!r}, '
+        f'{str(csv_dir / allocations_csv[0])!r})\n'
+        'LitePortfolioManager(p).rebalance_sell()\n'
+        "assert 'pandas' not in sys.modules\n"
+    )
+
+    # A fresh interpreter, since this session has imported pandas. The
+    # command is this interpreter and a fixed script, not user input.
+    subprocess.run([sys.executable, '-c', code], check=True)  # noqa: S603
+
+
+@pytest.mark.parametrize(('assets', 'allocation', 'currency'), files)
+def test_lite_summary(assets, allocation, currency):
+    lite = LitePortfolio.from_csv(csv_dir / assets, csv_dir / allocation, currency)
+    portfolio = DegiroPortfolio(csv_dir / assets, csv_dir / allocation, currency)
+
+    assert lite.currency == currency
+    assert lite.total_value == pytest.approx(portfolio.total_value)
+    pd.testing.assert_frame_equal(lite.summary.to_frame(), portfolio.summary)
+
+
+@pytest.mark.parametrize(('assets', 'allocation', 'currency'), files)
+@pytest.mark.parametrize('method', ['rebalance_sell', 'rebalance_no_sell'])
+def test_lite_rebalance(assets, allocation, currency, method):
+    lite = LitePortfolio.from_csv(csv_dir / assets, csv_dir / allocation, currency)
+    portfolio = DegiroPortfolio(csv_dir / assets, csv_dir / allocation, currency)
+
+    rebalance = getattr(LitePortfolioManager(lite), method)()
+
+    pd.testing.assert_frame_equal(
+        rebalance.to_frame(), getattr(PortfolioManager(portfolio), method)()
+    )
+
+
+def test_lite_frame():
+    lite = LitePortfolio(
+        [('US0000000001', 'ETF A', 60.0), ('US0000000002', 'ETF B', 20.0)],
+        {'US0000000001': 50, 'US0000000002': 50},
+    )
+    rebalance = LitePortfolioManager(lite).rebalance_sell()
+
+    assert len(rebalance) == len(lite.summary)
+    assert rebalance.index == ('US0000000001', 'US0000000002')
+    assert rebalance['Movement'] == [-20.0, 20.0]
+    assert next(rebalance.rows()) == (
+        'US0000000001',
+        {
+            'Product': 'ETF A',
+            'Current Value': 60.0,
+            'Expected Value': 40.0,
+            'Current Percentage': 75.0,
+            'Expected Percentage': 50.0,
+            'Movement': -20.0,
+        },
+    )
+
+
+def test_lite_duplicates():
+    lite = LitePortfolio(
+        [('US0000000001', 'ETF A', 60.0), ('US0000000001', 'ETF A', 40.0)],
+        {'US0000000001': 100},
+    )
+
+    assert lite.summary['Current Value'] == [100.0]
+
+
+def test_lite_raise_ValueError():
+    with pytest.raises(ValueError, match=r'.*is not 100%'):
+        LitePortfolio([('US0000000001', 'ETF A', 60.0)], {'US0000000001': 90})
+
+    lite = LitePortfolio(
+        [('US0000000001', 'ETF A', 60.0), ('US0000000002', 'ETF B', 20.0)],
+        {'US0000000001': 100},
+    )
+    with pytest.raises(ValueError, match=r".*Expected Percentage is 0%: \['ETF B'\]"):
+        LitePortfolioManager(lite).rebalance_no_sell()
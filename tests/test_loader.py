@@ -0,0 +1,115 @@
+import shutil
+
+import pytest
+
+from portfoliomanager.batch import BatchPortfolioManager
+from portfoliomanager.degiroportfolio import DegiroPortfolio
+from portfoliomanager.loader import find_portfolio_files, load_portfolios
+from tests.conftest import allocations_csv, csv_dir, currencies, portfolios_csv
+
+
+@pytest.fixture
+def portfolio_dir(tmp_path):
+    for assets, allocation, currency in zip(
+        portfolios_csv, allocations_csv, currencies, strict=True
+    ):
+        shutil.copy(csv_dir / assets, tmp_path / f'assets_{currency}.csv')
+        shutil.copy(csv_dir / allocation, tmp_path / f'allocation_{currency}.csv')
+
+    (tmp_path / 'assets_columns.csv').write_text('Product,ISIN\nETF,US4642872000\n')
+    shutil.copy(csv_dir / allocations_csv[0], tmp_path / 'allocation_columns.csv')
+
+    shutil.copy(csv_dir / portfolios_csv[0], tmp_path / 'assets_percentage.csv')
+    (tmp_path / 'allocation_percentage.csv').write_text(
+        'ISIN,Expected Percentage\nUS4642872000,50\n'
+    )
+
+    shutil.copy(csv_dir / portfolios_csv[0], tmp_path / 'assets_header.csv')
+    (tmp_path / 'allocation_header.csv').write_text('ISIN,Weight\nUS4642872000,100\n')
+
+    shutil.copy(csv_dir / portfolios_csv[0], tmp_path / 'assets_orphan.csv')
+    (tmp_path / 'notes.txt').write_text('not a portfolio')
+
+    return tmp_path
+
+
+def test_find_portfolio_files(portfolio_dir):
+    pairs = find_portfolio_files(portfolio_dir)
+
+    assert list(pairs) == ['EUR', 'GBP', 'columns', 'header', 'orphan', 'percentage']
+    assert pairs['EUR'] == (
+        portfolio_dir / 'assets_EUR.csv',
+        portfolio_dir / 'allocation_EUR.csv',
+    )
+    assert pairs['orphan'] == (portfolio_dir / 'assets_orphan.csv', None)
+
+
+def test_load_portfolios_directory(portfolio_dir):
+    result = load_portfolios(portfolio_dir, max_workers=2)
+
+    assert list(result.portfolios) == ['EUR', 'GBP']
+    assert sorted(result.errors) == ['columns', 'header', 'orphan', 'percentage']
+    assert isinstance(result.errors['columns'], ValueError)
+    assert isinstance(result.errors['header'], KeyError)
+    assert isinstance(result.errors['percentage'], ValueError)
+    assert isinstance(result.errors['orphan'], FileNotFoundError)
+
+    for currency, portfolio in result.portfolios.items():
+        expected = DegiroPortfolio(
+            portfolio_dir / f'assets_{currency}.csv',
+            portfolio_dir / f'allocation_{currency}.csv',
+        )
+        assert portfolio.summary.equals(expected.summary)
+
+
+def test_load_portfolios_pairs():
+    pairs = [
+        (csv_dir / assets, csv_dir / allocation)
+        for assets, allocation in zip(portfolios_csv, allocations_csv, strict=True)
+    ]
+
+    result = load_portfolios(pairs, max_workers=2, currency='GBP')
+
+    assert list(result.portfolios) == ['0', '1']
+    assert not result.errors
+    assert all(p.currency == 'GBP' for p in result.portfolios.values())
+
+
+def test_load_portfolios_compact():
+    pairs = [(csv_dir / portfolios_csv[0], csv_dir / allocations_csv[0])] * 2
+
+    result = load_portfolios(pairs, max_workers=2, compact=True)
+    first, second = (p._as for p in result.portfolios.values())
+
+    assert 'Local Value' not in first.columns
+    assert all(a is b for a, b in zip(first.index, second.index, strict=True))
+
+
+def test_load_portfolios_share_allocations(portfolio_dir):
+    shutil.copy(csv_dir / portfolios_csv[1], portfolio_dir / 'assets_copy.csv')
+    shutil.copy(csv_dir / allocations_csv[0], portfolio_dir / 'allocation_copy.csv')
+
+    result = load_portfolios(portfolio_dir, max_workers=2, share_allocations=True, compact=True)
+    portfolios = result.portfolios
+
+    assert portfolios['copy'].model is portfolios['EUR'].model
+    assert portfolios['copy']._al is portfolios['EUR'].model.frame
+    assert portfolios['GBP'].model is not portfolios['EUR'].model
+    assert isinstance(result.errors['percentage'], ValueError)
+    assert isinstance(result.errors['header'], KeyError)
+    assert result.batch().groups.tolist() == [0, 1, 0]
+
+
+def test_load_portfolios_missing_file(tmp_path):
+    result = load_portfolios({'missing': (tmp_path / 'missing.csv', csv_dir / 'x.csv')})
+
+    assert not result.portfolios
+    assert isinstance(result.errors['missing'], FileNotFoundError)
+
+
+def test_load_result_batch(portfolio_dir):
+    result = load_portfolios(portfolio_dir, max_workers=2)
+    batch = result.batch()
+
+    assert isinstance(batch, BatchPortfolioManager)
+    assert batch.total_values.tolist() == [p.total_value for p in result.portfolios.values()]
@@ -0,0 +1,18 @@
+from portfoliomanager.degiroportfolio import DegiroPortfolio
+from portfoliomanager.memory import memory_usage
+from tests.conftest import allocations_csv, csv_dir, portfolios_csv
+
+
+def test_memory_usage_shares_strings():
+    files = csv_dir / portfolios_csv[0], csv_dir / allocations_csv[0]
+    plain = [DegiroPortfolio(*files) for _ in range(3)]
+    compact = [DegiroPortfolio(*files, compact=True) for _ in range(3)]
+
+    usage_plain = memory_usage(plain)
+    usage_compact = memory_usage(compact)
+
+    assert list(usage_compact.index) == [str(files[0])] * 3 + ['Total']
+    assert usage_compact.loc['Total', 'Strings'] == usage_compact['Strings'].iloc[0]
+    assert usage_plain.loc['Total', 'Strings'] > usage_plain['Strings'].iloc[0]
+    assert usage_compact.loc['Total', 'Total'] < usage_plain.loc['Total', 'Total']
+    assert usage_compact.loc['Total', 'Total'] == usage_compact.loc['Total'].drop('Total').sum()
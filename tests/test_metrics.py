@@ -0,0 +1,126 @@
+import json
+
+import pandas as pd
+import pytest
+
+from portfoliomanager import metrics
+from portfoliomanager.degiroportfolio import DegiroPortfolio
+from portfoliomanager.portfoliomanager import PortfolioManager
+from tests.conftest import allocations_csv, csv_dir, portfolios_csv
+
+LOAD_STAGES = [
+    'read_file',
+    'replace_columns',
+    'dropna_isin',
+    'set_index_isin',
+    'convert_str_columns_to_float',
+    'read_file',
+    'set_index_isin',
+]
+
+
+@pytest.fixture
+def files():
+    return csv_dir / portfolios_csv[0], csv_dir / allocations_csv[0]
+
+
+def test_stage_disabled(files, mocker):
+    spy_record = mocker.spy(metrics.MetricsRecorder, 'record')
+
+    portfolio = DegiroPortfolio(*files)
+    PortfolioManager(portfolio).rebalance_sell()
+
+    assert spy_record.call_count == 0
+
+
+def test_instrument_in_memory(files):
+    sink = metrics.InMemorySink()
+    raw = pd.read_csv(files[0])
+    held = raw.iloc[:, 1].notna().sum()
+
+    with metrics.instrument(sink):
+        portfolio = DegiroPortfolio(*files)
+        pm = PortfolioManager(portfolio)
+        pm.rebalance_sell()
+        pm.rebalance_no_sell()
+
+    stages = [metric.stage for metric in sink.metrics]
+    assert stages == [*LOAD_STAGES, 'summary', 'rebalance_sell', 'rebalance_no_sell']
+    assert all(metric.portfolio == str(files[0]) for metric in sink.metrics)
+    assert all(metric.seconds >= 0 for metric in sink.metrics)
+    assert all(metric.memory_bytes is None for metric in sink.metrics)
+    assert sink.metrics[0].rows == len(raw)
+    assert sink.metrics[2].rows == held
+
+    aggregated = sink.aggregate()
+    assert aggregated.loc['read_file', 'calls'] == LOAD_STAGES.count('read_file')
+    assert aggregated.loc['summary', 'rows'] == held
+
+    pm.rebalance_sell()
+    assert len(sink.metrics) == len(stages)
+
+
+def test_instrument_trace_memory(files):
+    sink = metrics.InMemorySink()
+
+    with metrics.instrument(sink, trace_memory=True):
+        DegiroPortfolio(*files)
+
+    assert all(metric.memory_bytes is not None for metric in sink.metrics)
+
+
+def test_prometheus_sink_memory_gauge(files):
+    sink = metrics.PrometheusSink()
+
+    with metrics.instrument(sink, trace_memory=True):
+        DegiroPortfolio(*files)
+
+    text = sink.render()
+    assert '# TYPE portfoliomanager_stage_memory_bytes gauge' in text
+    assert 'portfoliomanager_stage_memory_bytes{stage="read_file"}' in text
+    assert 'portfoliomanager_stage_memory_bytes_total' not in text
+
+
+def test_json_lines_sink(files, tmp_path):
+    path = tmp_path / 'metrics.jsonl'
+
+    with metrics.instrument(metrics.JsonLinesSink(path)):
+        DegiroPortfolio(*files)
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [record['stage'] for record in records] == LOAD_STAGES
+    assert set(records[0]) == {'portfolio', 'stage', 'seconds', 'rows', 'memory_bytes'}
+
+
+def test_prometheus_sink(files):
+    sink = metrics.PrometheusSink()
+
+    with metrics.instrument(sink):
+        DegiroPortfolio(*files)
+        DegiroPortfolio(*files)
+
+    text = sink.render()
+    assert '# TYPE portfoliomanager_stage_calls_total counter' in text
+    assert 'portfoliomanager_stage_calls_total{stage="read_file"} 4' in text
+    assert 'portfoliomanager_stage_rows_total{stage="dropna_isin"} 10' in text
+    assert 'portfoliomanager_stage_memory_bytes' not in text
+
+
+def test_portfolio_label():
+    sink = metrics.InMemorySink()
+
+    @metrics.stage('custom')
+    def custom():
+        return [1, 2]
+
+    with metrics.instrument(sink), metrics.portfolio_label('account'):
+        assert custom() == [1, 2]
+
+    assert sink.metrics == [
+        metrics.StageMetric('account', 'custom', sink.metrics[0].seconds, None, None)
+    ]
+
+
+def test_metrics_sink_raise_NotImplementedError():
+    with pytest.raises(NotImplementedError):
+        metrics.MetricsSink().emit(metrics.StageMetric(None, 'stage', 0.0, None, None))
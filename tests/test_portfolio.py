@@ -1,5 +1,9 @@
+import pandas as pd
 import pytest
 
+from portfoliomanager.cache import PortfolioCache
+from portfoliomanager.degiroportfolio import DegiroPortfolio
+from portfoliomanager.fx import FxRates
 from portfoliomanager.portfolio import Portfolio
 from tests.conftest import (
     MockPortfolio,
@@ -189,3 +193,381 @@ def test_read_allocation_raise_ValueError(raw_csv_allocation, mocker):
 def test_read_allocation(read_pickles, raw_csv_allocation):
     (df_expected_from_pickle,) = read_pickles
     assert df_expected_from_pickle.equals(Portfolio._read_allocation(raw_csv_allocation))
+
+
+@pytest.mark.parametrize(
+    'read_pickles',
+    zip(portfolios_conv, allocations_idx, strict=True),
+    indirect=True,
+)
+def test_summary_memoized(read_pickles, mocker):
+    portfolio, allocation = read_pickles
+    mocker.patch.object(Portfolio, '_read_portfolio', return_value=portfolio)
+    mocker.patch.object(Portfolio, '_read_allocation', return_value=allocation)
+    spy_build_summary = mocker.spy(Portfolio, '_build_summary')
+
+    mock_portfolio = MockPortfolio()
+    first = mock_portfolio.summary
+    second = mock_portfolio.summary
+
+    assert spy_build_summary.call_count == 1
+    assert first.equals(second)
+    assert first is not second
+
+
+@pytest.mark.parametrize(
+    'read_pickles',
+    zip(portfolios_conv, allocations_idx, strict=True),
+    indirect=True,
+)
+def test_summary_defensive_copy(read_pickles, mocker):
+    portfolio, allocation = read_pickles
+    mocker.patch.object(Portfolio, '_read_portfolio', return_value=portfolio)
+    mocker.patch.object(Portfolio, '_read_allocation', return_value=allocation)
+
+    mock_portfolio = MockPortfolio()
+    expected = mock_portfolio.summary
+
+    summary = mock_portfolio.summary
+    summary['Current Value'] = 0
+    summary['Movement'] = 1
+
+    assert mock_portfolio.summary.equals(expected)
+
+
+@pytest.mark.parametrize(
+    'read_pickles',
+    zip(portfolios_conv, allocations_idx, strict=True),
+    indirect=True,
+)
+def test_cache_invalidation(read_pickles, mocker):
+    portfolio, allocation = read_pickles
+    mocker.patch.object(Portfolio, '_read_portfolio', return_value=portfolio.copy())
+    mocker.patch.object(Portfolio, '_read_allocation', return_value=allocation)
+    spy_build_summary = mocker.spy(Portfolio, '_build_summary')
+
+    mock_portfolio = MockPortfolio()
+    total_value = mock_portfolio.total_value
+    _ = mock_portfolio.summary
+
+    mock_portfolio._as['Current Value'] *= 2
+    assert mock_portfolio.total_value == total_value
+
+    mock_portfolio.invalidate_cache()
+    assert mock_portfolio.total_value == total_value * 2
+
+    mock_portfolio.set_assets(portfolio)
+    assert mock_portfolio.total_value == total_value
+
+    builds = spy_build_summary.call_count
+    mock_portfolio.set_allocation(allocation)
+    _ = mock_portfolio.summary
+
+    assert spy_build_summary.call_count == builds + 1
+
+
+@pytest.mark.parametrize('read_pickles', zip(allocations_idx, strict=True), indirect=True)
+def test_set_allocation_raise_ValueError(read_pickles):
+    (allocation,) = read_pickles
+    allocation['Expected Percentage'] = 0
+
+    mock_portfolio = MockPortfolio()
+
+    with pytest.raises(ValueError, match=r'The total sum of percentages .*'):
+        mock_portfolio.set_allocation(allocation)
+
+
+def test_from_assets():
+    portfolio = DegiroPortfolio(csv_dir / portfolios_csv[0], csv_dir / allocations_csv[0])
+    fx = FxRates({'USD': 0.87}, 'EUR')
+
+    built = DegiroPortfolio.from_assets(portfolio._as, portfolio._al, 'EUR', fx=fx, label='built')
+
+    assert type(built) is DegiroPortfolio
+    assert (built.fx, built._label, built.model) == (fx, 'built', None)
+    pd.testing.assert_frame_equal(built.summary, portfolio.summary)
+    pd.testing.assert_frame_equal(built.local_values, portfolio.local_values)
+
+
+def test_read_file_chunks_raise_FileNotFoundError():
+    with pytest.raises(FileNotFoundError):
+        list(Portfolio._read_file_chunks(csv_dir / 'missing.csv', 2))
+
+
+@pytest.mark.parametrize('read_pickles', zip(portfolios_conv, strict=True), indirect=True)
+def test_aggregate_isin(read_pickles):
+    (df_working_from_pickle,) = read_pickles
+    duplicated = pd.concat([df_working_from_pickle, df_working_from_pickle.iloc[:1]])
+
+    aggregated = Portfolio._aggregate_isin(duplicated)
+
+    expected = df_working_from_pickle.copy()
+    expected.iloc[0, expected.columns.get_indexer(['Amount', 'Current Value'])] *= 2
+
+    assert aggregated.equals(expected)
+
+
+@pytest.mark.parametrize('read_pickles', zip(portfolios_conv, strict=True), indirect=True)
+def test_aggregate_isin_untouched(read_pickles):
+    (df_expected_from_pickle,) = read_pickles
+    assert df_expected_from_pickle.equals(Portfolio._aggregate_isin(df_expected_from_pickle))
+
+
+@pytest.mark.parametrize('chunksize', [1, 2, 100])
+@pytest.mark.parametrize('raw_csv_portfolio', portfolios_csv, indirect=True)
+def test_read_portfolio_chunksize(raw_csv_portfolio, chunksize):
+    expected = DegiroPortfolio._read_portfolio(raw_csv_portfolio)
+
+    assert expected.equals(DegiroPortfolio._read_portfolio(raw_csv_portfolio, chunksize=chunksize))
+
+
+@pytest.mark.parametrize('raw_csv_portfolio', portfolios_csv, indirect=True)
+def test_read_portfolio_chunksize_duplicates(raw_csv_portfolio, tmp_path, mocker):
+    header, *rows = raw_csv_portfolio.read_text().splitlines()
+    assets_file = tmp_path / 'assets.csv'
+    assets_file.write_text('\n'.join([header, *rows, *rows]) + '\n')
+    spy_clean_portfolio = mocker.spy(DegiroPortfolio, '_clean_portfolio')
+
+    expected = DegiroPortfolio._read_portfolio(raw_csv_portfolio)
+    streamed = DegiroPortfolio._read_portfolio(assets_file, chunksize=3)
+
+    assert spy_clean_portfolio.call_count == 1 + 4
+    assert streamed.index.equals(expected.index)
+    assert streamed['Current Value'].equals(expected['Current Value'] * 2)
+    assert streamed['Amount'].equals(expected['Amount'] * 2)
+    assert streamed['Closing'].equals(expected['Closing'])
+    local = DegiroPortfolio._parse_local_values(expected['Local Value'])
+    pd.testing.assert_frame_equal(
+        DegiroPortfolio._parse_local_values(streamed['Local Value']),
+        local.assign(**{'Local Value': local['Local Value'] * 2}),
+    )
+
+
+def test_read_portfolio_chunksize_currencies(tmp_path):
+    assets_file = tmp_path / 'assets.csv'
+    assets_file.write_text(
+        'Product,ISIN,Amount,Closing,Local value,Value\n'
+        'ETF,US4642872000,1,10,USD 10.00,9.00\n'
+        'ETF,US4642872000,1,10,GBP 10.00,12.00\n'
+    )
+
+    with pytest.raises(ValueError, match=r'Every holding of an ISIN .*US4642872000.*'):
+        DegiroPortfolio._read_portfolio(assets_file, chunksize=1)
+
+
+@pytest.mark.parametrize('read_pickles', zip(portfolios_conv, strict=True), indirect=True)
+def test_prices(read_pickles, mocker):
+    (portfolio,) = read_pickles
+    mocker.patch.object(Portfolio, '_read_portfolio', return_value=portfolio)
+
+    prices = MockPortfolio().prices
+
+    assert prices.name == 'Price'
+    assert prices.index.equals(portfolio.index)
+    assert (prices * portfolio['Amount']).round(2).equals(portfolio['Current Value'])
+
+
+def test_currency_setter():
+    fx = FxRates({'USD': 0.87, 'GBP': 1.25}, 'EUR')
+    portfolio = DegiroPortfolio(csv_dir / portfolios_csv[0], csv_dir / allocations_csv[0], fx=fx)
+    values = portfolio._as['Current Value'].copy()
+    summary = portfolio.summary
+
+    portfolio.currency = 'GBP'
+
+    assert portfolio.currency == 'GBP'
+    assert portfolio.total_value == pytest.approx(values.sum() * 0.8)
+    assert portfolio.summary['Current Percentage'].equals(summary['Current Percentage'])
+
+    portfolio.currency = 'EUR'
+    pd.testing.assert_series_equal(portfolio._as['Current Value'], values)
+
+
+def test_currency_setter_raise_ValueError():
+    portfolio = DegiroPortfolio(csv_dir / portfolios_csv[0], csv_dir / allocations_csv[0])
+    portfolio.currency = 'EUR'
+
+    with pytest.raises(ValueError, match=r'Exchange rates are required .*'):
+        portfolio.currency = 'USD'
+
+    portfolio.fx = FxRates({'GBP': 1.25})
+    with pytest.raises(ValueError, match=r".*currencies \['USD'\]."):
+        portfolio.currency = 'USD'
+
+
+@pytest.mark.parametrize(
+    ('assets', 'allocation', 'currency'),
+    zip(portfolios_csv, allocations_csv, currencies, strict=True),
+)
+def test_revalue_local(assets, allocation, currency):
+    fx = FxRates({'USD': 0.87, 'GBP': 1.25}, 'EUR')
+    portfolio = DegiroPortfolio(csv_dir / assets, csv_dir / allocation, currency, fx=fx)
+    local = portfolio.local_values
+
+    portfolio.revalue_local()
+
+    expected = local['Local Value'] * [fx.rate(c, currency) for c in local['Local Currency']]
+    pd.testing.assert_series_equal(portfolio._as['Current Value'], expected, check_names=False)
+
+
+def test_revalue_local_raise_ValueError():
+    portfolio = DegiroPortfolio(csv_dir / portfolios_csv[0], csv_dir / allocations_csv[0])
+
+    with pytest.raises(ValueError, match=r'Exchange rates are required .*'):
+        portfolio.revalue_local()
+
+
+@pytest.mark.parametrize(
+    ('assets', 'allocation', 'currency'),
+    zip(portfolios_csv, allocations_csv, currencies, strict=True),
+)
+def test_update_prices_and_positions(assets, allocation, currency, mocker):
+    portfolio = DegiroPortfolio(csv_dir / assets, csv_dir / allocation, currency)
+    spy_build_summary = mocker.spy(Portfolio, '_build_summary')
+    _ = portfolio.summary
+    isins = portfolio._as.index
+
+    portfolio.update_prices(pd.Series([12.5, 99.0], index=isins[[0, 2]]))
+    amounts = pd.Series([1000.0], index=isins[[1]])
+    portfolio.update_positions(amounts)
+    summary = portfolio.summary
+    total_value = portfolio.total_value
+
+    assert spy_build_summary.call_count == 1
+    assert (
+        portfolio._as.loc[isins[0], 'Current Value']
+        == portfolio._as.loc[isins[0], 'Amount'] * 12.5
+    )
+    assert portfolio._as.loc[isins[1], 'Amount'] == amounts.iloc[0]
+    assert portfolio.current_percentage(isins[1]) == summary.loc[isins[1], 'Current Percentage']
+
+    portfolio.invalidate_cache()
+    assert total_value == pytest.approx(portfolio.total_value)
+    assert summary.equals(portfolio.summary)
+
+
+def test_update_keeps_local_values():
+    fx = FxRates({'USD': 0.87, 'GBP': 1.25}, 'EUR')
+    portfolio = DegiroPortfolio(csv_dir / portfolios_csv[0], csv_dir / allocations_csv[0], fx=fx)
+    isin = 'US4642872000'
+    local_value = portfolio.local_values.loc[isin, 'Local Value']
+    amount = portfolio._as.loc[isin, 'Amount']
+
+    portfolio.update_positions(pd.Series({isin: 1000.0}))
+    portfolio.update_prices(pd.Series({'US4642872265': 60.0}))
+    total_value = portfolio.total_value
+
+    assert portfolio.local_values.loc[isin, 'Local Value'] == pytest.approx(
+        local_value / amount * portfolio._as.loc[isin, 'Amount']
+    )
+    portfolio.revalue_local()
+    assert portfolio.total_value == pytest.approx(total_value)
+
+
+@pytest.mark.parametrize('method', ['update_prices', 'update_positions'])
+def test_update_raise_ValueError_repeated(method):
+    portfolio = DegiroPortfolio(csv_dir / portfolios_csv[0], csv_dir / allocations_csv[0])
+    total_value = portfolio.total_value
+    updates = pd.Series([10.0, 20.0], index=['US4642872000', 'US4642872000'])
+
+    with pytest.raises(ValueError, match=r"repeated ISINs: \['US4642872000'\]"):
+        getattr(portfolio, method)(updates)
+    assert portfolio.total_value == total_value
+
+
+def test_update_prices_raise_KeyError():
+    portfolio = DegiroPortfolio(csv_dir / portfolios_csv[0], csv_dir / allocations_csv[0])
+
+    with pytest.raises(KeyError, match=r'.*LU0000000001.*'):
+        portfolio.update_prices(pd.Series({'LU0000000001': 1.0}))
+
+
+def test_update_positions_raise_ValueError():
+    portfolio = DegiroPortfolio(csv_dir / portfolios_csv[0], csv_dir / allocations_csv[0])
+    isin = portfolio._as.index[0]
+    portfolio.update_positions(pd.Series({isin: 0.0}))
+
+    assert portfolio._as.loc[isin, 'Current Value'] == 0
+
+    with pytest.raises(ValueError, match=r'The price of an asset held with an amount of 0 .*'):
+        portfolio.update_positions(pd.Series({isin: 10.0}))
+
+
+@pytest.mark.parametrize(
+    ('assets', 'allocation', 'currency'),
+    zip(portfolios_csv, allocations_csv, currencies, strict=True),
+)
+def test_compact(assets, allocation, currency):
+    portfolio = DegiroPortfolio(csv_dir / assets, csv_dir / allocation, currency)
+    compact = DegiroPortfolio(csv_dir / assets, csv_dir / allocation, currency, compact=True)
+    other = DegiroPortfolio(csv_dir / assets, csv_dir / allocation, currency, compact=True)
+
+    assert 'Local Value' not in compact._as.columns
+    assert all(a is b for a, b in zip(compact._as.index, other._as.index, strict=True))
+    assert all(a is b for a, b in zip(compact._as['Product'], other._as['Product'], strict=True))
+    pd.testing.assert_frame_equal(compact.summary, portfolio.summary)
+    assert compact.memory_usage()['Total'] < portfolio.memory_usage()['Total']
+
+    with pytest.raises(ValueError, match=r"The portfolio has no 'Local Value' column.*"):
+        _ = compact.local_values
+
+
+@pytest.mark.parametrize('chunksize', [None, 2])
+def test_compact_skips_local_value(mocker, chunksize):
+    spy_read_csv = mocker.spy(pd, 'read_csv')
+    assets_file = csv_dir / portfolios_csv[0]
+    portfolio = DegiroPortfolio(assets_file, csv_dir / allocations_csv[0])
+    compact = DegiroPortfolio(
+        assets_file, csv_dir / allocations_csv[0], compact=True, chunksize=chunksize
+    )
+
+    usecols = [call.kwargs.get('usecols') for call in spy_read_csv.call_args_list]
+    assert usecols.count([0, 1, 2, 3, 5]) == 1
+    pd.testing.assert_frame_equal(
+        compact._as, portfolio._as.drop(columns='Local Value'), check_index_type=False
+    )
+
+
+def test_compact_cache(tmp_path):
+    cache = PortfolioCache(tmp_path / 'cache')
+    compact = DegiroPortfolio._read_portfolio(
+        csv_dir / portfolios_csv[0], cache=cache, compact=True
+    )
+    full = DegiroPortfolio._read_portfolio(csv_dir / portfolios_csv[0], cache=cache)
+
+    assert 'Local Value' not in compact.columns
+    assert 'Local Value' in full.columns
+
+
+def test_compact_raise_ValueError(tmp_path):
+    assets_file = tmp_path / 'assets.csv'
+    assets_file.write_text('Product,ISIN\nETF,US4642872000\n')
+
+    with pytest.raises(ValueError, match=r'Column mismatch: .*'):
+        DegiroPortfolio._read_portfolio(assets_file, compact=True)
+
+
+def test_compact_float_dtype():
+    portfolio = DegiroPortfolio(csv_dir / portfolios_csv[0], csv_dir / allocations_csv[0])
+    _ = portfolio.summary
+    portfolio.compact(float_dtype='float32')
+    isin = portfolio._as.index[0]
+
+    assert (portfolio._as.dtypes.drop('Product') == 'float32').all()
+
+    portfolio.update_prices(pd.Series({isin: 12.5}))
+    assert portfolio._as['Current Value'].dtype == 'float32'
+    assert portfolio.summary.loc[isin, 'Current Value'] == pytest.approx(
+        portfolio._as.loc[isin, 'Amount'] * 12.5
+    )
+
+
+def test_memory_usage():
+    portfolio = DegiroPortfolio(csv_dir / portfolios_csv[0], csv_dir / allocations_csv[0])
+    usage = portfolio.memory_usage()
+
+    assert usage['Cache'] == 0
+    assert usage['Total'] == usage.drop('Total').sum()
+
+    _ = portfolio.summary
+    assert portfolio.memory_usage()['Cache'] > 0
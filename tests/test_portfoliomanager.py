@@ -1,9 +1,12 @@
+import pandas as pd
 import pytest
 
+from portfoliomanager.fees import FeeSchedule
 from portfoliomanager.portfolio import Portfolio
 from portfoliomanager.portfoliomanager import PortfolioManager
 from tests.conftest import (
     MockPortfolio,
+    allocations_idx,
     portfolios_conv,
     rebalances_no_sell,
     rebalances_sell,
@@ -69,3 +72,148 @@ def test_rebalance_no_sell(read_pickles, mocker):
     pm = PortfolioManager(mock_portfolio)
 
     assert pm.rebalance_no_sell().equals(df_expected_from_pickle)
+
+
+@pytest.mark.parametrize(
+    'read_pickles',
+    zip(rebalances_no_sell, summaries_passing_no_sell, strict=True),
+    indirect=True,
+)
+def test_rebalance_deposit_matches_no_sell(read_pickles, mocker):
+    df_expected_from_pickle, summary_file = read_pickles
+
+    mocker.patch.object(
+        Portfolio,
+        'summary',
+        new_callable=mocker.PropertyMock,
+        return_value=summary_file,
+    )
+    mock_portfolio = MockPortfolio()
+    pm = PortfolioManager(mock_portfolio)
+
+    rebalance = pm.rebalance_deposit(df_expected_from_pickle['Movement'].sum())
+
+    assert rebalance.index.equals(df_expected_from_pickle.index)
+    assert rebalance.columns.equals(df_expected_from_pickle.columns)
+    assert rebalance['Movement'].equals(df_expected_from_pickle['Movement'])
+    assert rebalance['Expected Value'].equals(df_expected_from_pickle['Expected Value'])
+
+
+@pytest.mark.parametrize('deposit', [0, 0.01, 1000, 12345.67])
+@pytest.mark.parametrize('read_pickles', zip(summaries, strict=True), indirect=True)
+def test_rebalance_deposit(read_pickles, deposit, mocker):
+    (summary_file,) = read_pickles
+
+    mocker.patch.object(
+        Portfolio,
+        'summary',
+        new_callable=mocker.PropertyMock,
+        return_value=summary_file,
+    )
+    mock_portfolio = MockPortfolio()
+    pm = PortfolioManager(mock_portfolio)
+
+    rebalance = pm.rebalance_deposit(deposit)
+
+    assert round(rebalance['Movement'].sum(), 2) == deposit
+    assert (rebalance['Movement'] >= 0).all()
+    assert (rebalance.loc[rebalance['Expected Percentage'] == 0, 'Movement'] == 0).all()
+
+
+@pytest.mark.parametrize('read_pickles', zip(summaries, strict=True), indirect=True)
+def test_rebalance_deposit_raise_ValueError(read_pickles, mocker):
+    (summary_file,) = read_pickles
+
+    mocker.patch.object(
+        Portfolio,
+        'summary',
+        new_callable=mocker.PropertyMock,
+        return_value=summary_file,
+    )
+    pm = PortfolioManager(MockPortfolio())
+
+    with pytest.raises(ValueError, match=r'The amount to spend must not be negative.'):
+        pm.rebalance_deposit(-1)
+
+
+@pytest.mark.parametrize(
+    'read_pickles', zip(portfolios_conv, allocations_idx, strict=True), indirect=True
+)
+def test_orders(read_pickles, mocker):
+    portfolio, allocation = read_pickles
+    mocker.patch.object(Portfolio, '_read_portfolio', return_value=portfolio)
+    mocker.patch.object(Portfolio, '_read_allocation', return_value=allocation)
+
+    mock_portfolio = MockPortfolio()
+    pm = PortfolioManager(mock_portfolio)
+    deposit = 10000
+    rebalance = pm.rebalance_deposit(deposit)
+
+    orders = pm.orders(rebalance)
+
+    assert orders.index.equals(rebalance.index)
+    assert orders['Movement'].equals(rebalance['Movement'])
+    assert (orders['Shares'] >= 0).all()
+    assert (abs(orders['Shares'] - orders['Movement'] / orders['Price']) < 1).all()
+    assert 0 <= orders['Order Value'].sum() <= deposit
+    assert orders.loc[portfolio.index, 'Price'].equals(
+        (portfolio['Current Value'] / portfolio['Amount']).rename('Price')
+    )
+
+
+@pytest.mark.parametrize(
+    'read_pickles', zip(portfolios_conv, allocations_idx, strict=True), indirect=True
+)
+def test_orders_prices(read_pickles, mocker):
+    portfolio, allocation = read_pickles
+    mocker.patch.object(Portfolio, '_read_portfolio', return_value=portfolio)
+    mocker.patch.object(Portfolio, '_read_allocation', return_value=allocation)
+
+    pm = PortfolioManager(MockPortfolio())
+    rebalance = pm.rebalance_sell().assign(Movement=100.0)
+    rebalance.loc['LU0000000001'] = ['NEW ETF', 0, 100, 0, 0, 100]
+
+    with pytest.raises(ValueError, match=r'(?s)A price is required .*LU0000000001'):
+        pm.orders(rebalance)
+
+    orders = pm.orders(rebalance, pd.Series(1.0, index=rebalance.index))
+
+    assert (orders['Shares'] == rebalance['Movement']).all()
+
+
+@pytest.mark.parametrize(
+    'read_pickles', zip(portfolios_conv, allocations_idx, strict=True), indirect=True
+)
+def test_rebalance_fees(read_pickles, mocker):
+    portfolio, allocation = read_pickles
+    mocker.patch.object(Portfolio, '_read_portfolio', return_value=portfolio)
+    mocker.patch.object(Portfolio, '_read_allocation', return_value=allocation)
+
+    pm = PortfolioManager(MockPortfolio())
+    total = pm._portfolio.total_value
+    sell = pm.rebalance_sell()
+    tolerance = 2
+    rebalance = pm.rebalance_fees(FeeSchedule(2.0, 0.05), tolerance=tolerance)
+
+    deviation = (rebalance['Expected Value'] / total * 100 - sell['Expected Percentage']).abs()
+    assert (deviation < tolerance).all()
+    assert (rebalance['Movement'] != 0).sum() <= (sell['Movement'] != 0).sum()
+    # The trades and their fees are paid by the sells, up to a cent.
+    cent = 0.01
+    assert rebalance['Movement'].sum() + rebalance['Fee'].sum() <= cent
+    assert (rebalance['Fee'] == 0).equals(rebalance['Movement'] == 0)
+
+
+@pytest.mark.parametrize(
+    'read_pickles', zip(portfolios_conv, allocations_idx, strict=True), indirect=True
+)
+def test_rebalance_fees_no_trade(read_pickles, mocker):
+    portfolio, allocation = read_pickles
+    mocker.patch.object(Portfolio, '_read_portfolio', return_value=portfolio)
+    mocker.patch.object(Portfolio, '_read_allocation', return_value=allocation)
+
+    pm = PortfolioManager(MockPortfolio())
+    rebalance = pm.rebalance_fees(FeeSchedule(2.0), tolerance=100)
+
+    assert (rebalance['Movement'] == 0).all()
+    assert rebalance['Expected Value'].equals(rebalance['Current Value'])
@@ -0,0 +1,225 @@
+import asyncio
+import json
+
+import pytest
+
+from portfoliomanager._http import HTTPError, read_message
+from portfoliomanager.degiroportfolio import DegiroPortfolio
+from portfoliomanager.quotes import (
+    HttpQuoteProvider,
+    Quote,
+    QuoteFetcher,
+    QuoteProvider,
+    StubQuoteServer,
+)
+from tests.conftest import allocations_csv, csv_dir, currencies, portfolios_csv
+
+
+def read(data):
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        return await read_message(reader)
+
+    return asyncio.run(run())
+
+
+class CountingProvider(QuoteProvider):
+    def __init__(self, error=None):
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.error = error
+
+    async def fetch(self, isins):
+        self.calls.append(list(isins))
+        if self.error is not None:
+            raise self.error
+
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return [Quote(isin, None, 1.0) for isin in isins]
+
+
+@pytest.fixture
+def portfolios():
+    return [
+        DegiroPortfolio(csv_dir / assets, csv_dir / allocation, currency)
+        for assets, allocation, currency in zip(
+            portfolios_csv, allocations_csv, currencies, strict=True
+        )
+    ]
+
+
+def quotes_of(portfolios, factor=2):
+    return {
+        isin: Quote(isin, f'NAME {isin}', closing * factor)
+        for portfolio in portfolios
+        for isin, closing in portfolio._as['Closing'].items()
+    }
+
+
+def test_fetch_dedupes_and_batches(portfolios):
+    quotes = quotes_of(portfolios)
+    batch_size = pool_size = 2
+
+    async def run():
+        async with StubQuoteServer(quotes) as server:
+            provider = HttpQuoteProvider(server.url, pool_size=pool_size)
+            fetcher = QuoteFetcher(provider, batch_size=batch_size, max_concurrency=2)
+            isins = [isin for p in portfolios for isin in p._as.index] * 2
+            result = await fetcher.fetch([*isins, 'XX0000000000'])
+            await provider.close()
+            return result, server, provider
+
+    result, server, provider = asyncio.run(run())
+    requested = [isin for request in server.requests for isin in request]
+
+    assert result == quotes
+    assert sorted(requested) == sorted({*quotes, 'XX0000000000'})
+    assert all(len(request) <= batch_size for request in server.requests)
+    assert server.connections == provider.connections_opened <= pool_size
+    assert provider.connections_opened < len(server.requests)
+
+
+def test_fetch_caps_concurrency():
+    provider = CountingProvider()
+    isins = [f'ISIN{i}' for i in range(20)]
+    max_concurrency = 3
+    fetcher = QuoteFetcher(provider, batch_size=1, max_concurrency=max_concurrency)
+
+    quotes = asyncio.run(fetcher.fetch(iter(isins)))
+
+    assert len(quotes) == len(isins)
+    assert provider.max_in_flight == max_concurrency
+
+
+def test_fetch_ttl_cache():
+    now = [0.0]
+    provider = CountingProvider()
+    fetcher = QuoteFetcher(provider, ttl=10, clock=lambda: now[0])
+
+    asyncio.run(fetcher.fetch(['A', 'B']))
+    asyncio.run(fetcher.fetch(['A', 'B', 'C']))
+    now[0] = 11
+    asyncio.run(fetcher.fetch(['A']))
+
+    assert provider.calls == [['A', 'B'], ['C'], ['A']]
+
+    fetcher.clear()
+    asyncio.run(fetcher.fetch(['B']))
+    assert provider.calls[-1] == ['B']
+
+
+def test_fetch_retries(portfolios):
+    quotes = quotes_of(portfolios)
+
+    async def run(failures):
+        async with StubQuoteServer(quotes, failures=failures) as server:
+            provider = HttpQuoteProvider(server.url)
+            fetcher = QuoteFetcher(provider, retries=2, backoff=0)
+            try:
+                return await fetcher.fetch(quotes)
+            finally:
+                await provider.close()
+
+    assert asyncio.run(run(2)) == quotes
+
+    with pytest.raises(HTTPError, match=r'HTTP 503 .*'):
+        asyncio.run(run(3))
+
+
+def test_fetch_does_not_retry_client_errors():
+    provider = CountingProvider(HTTPError(404, 'Not Found'))
+    fetcher = QuoteFetcher(provider, backoff=0)
+
+    with pytest.raises(HTTPError):
+        asyncio.run(fetcher.fetch(['A']))
+
+    assert len(provider.calls) == 1
+
+
+def test_refresh(portfolios):
+    quotes = quotes_of(portfolios)
+    expected = [
+        (
+            p._as['Current Value']
+            * [quotes[isin].close for isin in p._as.index]
+            / p._as['Closing']
+        ).round(2)
+        for p in portfolios
+    ]
+    _ = [p.summary for p in portfolios]
+
+    async def run():
+        async with StubQuoteServer(quotes) as server:
+            provider = HttpQuoteProvider(server.url)
+            await QuoteFetcher(provider).refresh(portfolios)
+            await provider.close()
+
+    asyncio.run(run())
+
+    for portfolio, value in zip(portfolios, expected, strict=True):
+        assert portfolio._as['Current Value'].equals(value)
+        assert portfolio._as['Closing'].tolist() == [
+            quotes[isin].close for isin in portfolio._as.index
+        ]
+        assert portfolio.total_value == value.sum()
+        assert portfolio.summary['Product'].str.startswith('NAME ').all()
+
+
+def test_read_message_chunked():
+    response = (
+        b'HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n'
+        b'4\r\n[{"i\r\n5;ext=1\r\nsin"}\r\n1\r\n]\r\n0\r\nExpires: 0\r\n\r\n'
+    )
+
+    status, _, headers, body = read(response)
+
+    assert (status, body) == (200, b'[{"isin"}]')
+    assert headers['transfer-encoding'] == 'chunked'
+
+
+def test_read_message_until_eof():
+    status, _, _, body = read(b'HTTP/1.1 200 OK\r\nConnection: close\r\n\r\n{"quotes": []}')
+    assert (status, body) == (200, b'{"quotes": []}')
+
+    status, _, _, body = read(b'HTTP/1.1 204 No Content\r\n\r\n')
+    assert (status, body) == (204, b'')
+
+
+def test_fetch_body_until_eof():
+    quote = Quote('US4642872000', 'S&P 500 ETF', 50.0)
+    body = json.dumps({'quotes': [{'isin': quote.isin, 'name': quote.name, 'close': 50.0}]})
+
+    async def handle(reader, writer):
+        await reader.readuntil(b'\r\n\r\n')
+        writer.write(b'HTTP/1.1 200 OK\r\n\r\n' + body.encode())
+        await writer.drain()
+        writer.close()
+
+    async def run():
+        server = await asyncio.start_server(handle, '127.0.0.1', 0)
+        host, port = server.sockets[0].getsockname()[:2]
+        provider = HttpQuoteProvider(f'http://{host}:{port}')
+        try:
+            return [await provider.fetch([quote.isin]) for _ in range(2)], provider
+        finally:
+            await provider.close()
+            server.close()
+            await server.wait_closed()
+
+    results, provider = asyncio.run(run())
+
+    assert results == [[quote], [quote]]
+    assert provider.connections_opened == len(results)
+
+
+def test_read_message_raise_ConnectionError():
+    with pytest.raises(ConnectionError, match=r'Malformed HTTP response\.'):
+        read(b'HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\nx\r\n')
+    with pytest.raises(ConnectionError, match=r'Malformed HTTP response\.'):
+        read(b'HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n9\r\nabc')
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from portfoliomanager.degiroportfolio import DegiroPortfolio
+from portfoliomanager.portfoliomanager import PortfolioManager
+from portfoliomanager.scenarios import evaluate_allocations, read_candidates
+from tests.conftest import allocations_csv, csv_dir, portfolios_csv
+
+# The candidate buying an asset not held yet.
+NEW_ASSET = 5
+# The candidate with a 0% weight on a held asset, which can't be
+# rebalanced without selling.
+ZERO_WEIGHT = 7
+
+
+@pytest.fixture
+def portfolio():
+    return DegiroPortfolio(csv_dir / portfolios_csv[0], csv_dir / allocations_csv[0])
+
+
+@pytest.fixture
+def candidates(portfolio):
+    rng = np.random.default_rng(0)
+    held = len(portfolio._as)
+    # Whole percentages, at least 1 per held asset, sum to exactly 100.
+    weights = 1 + rng.multinomial(100 - held, np.full(held, 1 / held), size=50)
+    weights = np.column_stack([weights, np.zeros(len(weights), dtype=int)])
+    weights[NEW_ASSET, [weights[NEW_ASSET].argmax(), -1]] += -1, 1
+    weights[ZERO_WEIGHT, [0, 1]] = 0, weights[ZERO_WEIGHT, 0] + weights[ZERO_WEIGHT, 1]
+    return pd.DataFrame(weights.astype(float), columns=[*portfolio._as.index, 'LU0000000001'])
+
+
+def test_evaluate_allocations_matches_manager(portfolio, candidates):
+    result = evaluate_allocations(portfolio, candidates)
+
+    for candidate in (0, NEW_ASSET, ZERO_WEIGHT):
+        portfolio._al = candidates.loc[candidate].rename('Expected Percentage').to_frame()
+        portfolio.invalidate_cache()
+        manager = PortfolioManager(portfolio)
+        sell = manager.rebalance_sell()
+
+        pd.testing.assert_series_equal(
+            result.movements.loc[candidate], sell['Movement'], check_names=False
+        )
+        assert result.turnover[candidate] == pytest.approx(
+            sell['Movement'].abs().sum() / portfolio.total_value
+        )
+
+        if candidate == ZERO_WEIGHT:
+            with pytest.raises(ValueError, match=r'.*Expected Percentage of 0%.*'):
+                manager.rebalance_no_sell()
+            assert result.no_sell_movements.loc[candidate].isna().all()
+            assert np.isnan(result.no_sell_cash[candidate])
+        else:
+            no_sell = manager.rebalance_no_sell()
+            pd.testing.assert_series_equal(
+                result.no_sell_movements.loc[candidate], no_sell['Movement'], check_names=False
+            )
+            assert result.no_sell_cash[candidate] == pytest.approx(no_sell['Movement'].sum())
+
+
+def test_evaluate_allocations_summary(portfolio, candidates):
+    summary = evaluate_allocations(portfolio, candidates).summary()
+
+    assert summary.shape == (len(candidates), 2)
+    assert (summary['Turnover'] >= 0).all()
+    assert (summary['No-sell Cash'].drop(ZERO_WEIGHT) >= 0).all()
+
+
+def test_evaluate_allocations_raise_ValueError(portfolio, candidates):
+    candidates.iloc[3, 0] += 1
+    # Rejected like a real allocation, which checks the sum exactly.
+    candidates.iloc[4, 0] += 1e-9
+
+    with pytest.raises(ValueError, match=r'.*candidates \[3, 4\] do not sum to 100%.'):
+        evaluate_allocations(portfolio, candidates)
+
+
+def test_read_candidates(tmp_path):
+    other = tmp_path / 'allocation_other.csv'
+    new = 40
+    other.write_text(f'ISIN,Expected Percentage\nUS4642872000,{100 - new}\nLU0000000001,{new}\n')
+
+    candidates = read_candidates({'base': csv_dir / allocations_csv[0], 'other': other})
+
+    assert list(candidates.index) == ['base', 'other']
+    assert candidates.loc['other', 'LU0000000001'] == new
+    assert candidates.loc['other', 'IE00B3XXRP09'] == 0
+    np.testing.assert_allclose(candidates.sum(axis=1), 100)
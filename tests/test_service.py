@@ -0,0 +1,223 @@
+import asyncio
+import json
+import os
+import shutil
+from http import HTTPStatus
+from urllib.parse import urlsplit
+
+import pytest
+
+from portfoliomanager._http import ConnectionPool, HTTPError, read_message
+from portfoliomanager.degiroportfolio import DegiroPortfolio
+from portfoliomanager.portfolio import FULL_PERCENTAGE
+from portfoliomanager.portfoliomanager import PortfolioManager
+from portfoliomanager.service import RebalanceService
+from tests.conftest import allocations_csv, csv_dir, currencies, portfolios_csv
+
+
+@pytest.fixture
+def portfolio_dir(tmp_path):
+    for assets, allocation, currency in zip(
+        portfolios_csv, allocations_csv, currencies, strict=True
+    ):
+        shutil.copy(csv_dir / assets, tmp_path / f'assets_{currency}.csv')
+        shutil.copy(csv_dir / allocation, tmp_path / f'allocation_{currency}.csv')
+
+    return tmp_path
+
+
+def rewrite(path, text):
+    stat = path.stat()
+    path.write_text(text)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+async def get(pool, target):
+    return json.loads(await pool.get(target))
+
+
+def test_service_endpoints(portfolio_dir):
+    async def run():
+        async with RebalanceService(portfolio_dir) as service:
+            pool = ConnectionPool(service.url)
+            index = await get(pool, '/portfolios')
+            summary = await get(pool, '/portfolios/EUR/summary')
+            rebalance = await get(pool, '/portfolios/GBP/rebalance_no_sell')
+            await pool.close()
+        return index, summary, rebalance
+
+    index, summary, rebalance = asyncio.run(run())
+    portfolio = DegiroPortfolio(
+        portfolio_dir / 'assets_GBP.csv', portfolio_dir / 'allocation_GBP.csv'
+    )
+    expected = PortfolioManager(portfolio).rebalance_no_sell()
+
+    assert index == {'portfolios': ['EUR', 'GBP'], 'errors': {}}
+    assert summary['currency'] == 'EUR'
+    assert [row['ISIN'] for row in summary['rows']] == sorted(
+        row['ISIN'] for row in summary['rows']
+    )
+    assert rebalance['total_value'] == pytest.approx(portfolio.total_value)
+    assert [row['Movement'] for row in rebalance['rows']] == pytest.approx(
+        expected['Movement'].tolist()
+    )
+
+
+def test_service_errors(portfolio_dir):
+    async def status(pool, target):
+        try:
+            await pool.get(target)
+        except HTTPError as e:
+            return e.status
+        return 200
+
+    async def run():
+        rewrite(
+            portfolio_dir / 'allocation_EUR.csv', 'ISIN,Expected Percentage\nUS4642872000,100\n'
+        )
+        async with RebalanceService(portfolio_dir) as service:
+            pool = ConnectionPool(service.url)
+            statuses = [
+                await status(pool, target)
+                for target in (
+                    '/portfolios/EUR/rebalance_no_sell',
+                    '/portfolios/USD/summary',
+                    '/portfolios/EUR/orders',
+                    '/other',
+                )
+            ]
+            await pool.close()
+        return statuses
+
+    assert asyncio.run(run()) == [422, 404, 404, 404]
+
+
+def test_service_internal_error(portfolio_dir, mocker):
+    mocker.patch.object(PortfolioManager, 'rebalance_sell', side_effect=RuntimeError('boom'))
+
+    async def run():
+        async with RebalanceService(portfolio_dir) as service:
+            url = urlsplit(service.url)
+            reader, writer = await asyncio.open_connection(url.hostname, url.port)
+            responses = []
+            for target in ('/portfolios/EUR/rebalance_sell', '/portfolios'):
+                writer.write(f'GET {target} HTTP/1.1\r\nHost: localhost\r\n\r\n'.encode())
+                responses.append(await read_message(reader))
+            writer.close()
+        return responses
+
+    (status, _, _, body), (after, *_) = asyncio.run(run())
+
+    assert status == HTTPStatus.INTERNAL_SERVER_ERROR
+    assert json.loads(body) == {'error': 'RuntimeError: boom'}
+    assert after == HTTPStatus.OK
+
+
+def test_service_reload_changed_only(portfolio_dir):
+    async def run():
+        service = RebalanceService(portfolio_dir)
+        assert await service.reload() == ['EUR', 'GBP']
+        before = service.portfolios
+
+        assert await service.reload() == []
+        rewrite(
+            portfolio_dir / 'allocation_EUR.csv',
+            'ISIN,Expected Percentage\nUS4642872000,50\nIE00B3XXRP09,50\n',
+        )
+        reloaded = await service.reload()
+        return before, service.portfolios, reloaded
+
+    before, after, reloaded = asyncio.run(run())
+
+    assert reloaded == ['EUR']
+    assert after['GBP'] is before['GBP']
+    assert after['EUR'] is not before['EUR']
+    assert after['EUR']._al['Expected Percentage'].tolist() == [50, 50]
+    assert before['EUR']._al['Expected Percentage'].sum() == FULL_PERCENTAGE
+
+
+def test_service_reload_keeps_previous_on_error(portfolio_dir):
+    async def run():
+        service = RebalanceService(portfolio_dir)
+        await service.reload()
+        before = service.portfolios['EUR']
+
+        rewrite(
+            portfolio_dir / 'allocation_EUR.csv', 'ISIN,Expected Percentage\nUS4642872000,90\n'
+        )
+        reloaded = await service.reload()
+        return service, before, reloaded
+
+    service, before, reloaded = asyncio.run(run())
+
+    assert reloaded == []
+    assert service.portfolios['EUR'] is before
+    assert 'is not 100%' in service.errors['EUR']
+
+
+def test_service_records_any_error(portfolio_dir):
+    async def run():
+        service = RebalanceService(portfolio_dir)
+        allocation = portfolio_dir / 'allocation_EUR.csv'
+        text = allocation.read_text()
+
+        rewrite(allocation, 'ISIN,Weight\nUS4642872000,100\n')
+        await service.reload()
+        error = service.errors.get('EUR')
+
+        rewrite(allocation, text)
+        reloaded = await service.reload()
+        return service, error, reloaded
+
+    service, error, reloaded = asyncio.run(run())
+
+    assert error.startswith('KeyError')
+    assert reloaded == ['EUR']
+    assert not service.errors
+
+
+def test_service_watcher_survives_errors(portfolio_dir, mocker):
+    async def run():
+        service = RebalanceService(portfolio_dir, poll_interval=0.01)
+        await service.start()
+        mocker.patch.object(service, '_pairs', side_effect=OSError('unreachable'))
+        await asyncio.sleep(0.05)
+        mocker.stopall()
+
+        (portfolio_dir / 'assets_EUR.csv').unlink()
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if 'EUR' not in service.portfolios:
+                break
+        await service.stop()
+        return service
+
+    service = asyncio.run(run())
+
+    assert list(service.portfolios) == ['GBP']
+
+
+def test_service_watcher_and_concurrency(portfolio_dir):
+    async def run():
+        async with RebalanceService(portfolio_dir, poll_interval=0.01) as service:
+            pools = [ConnectionPool(service.url) for _ in range(4)]
+            before = await asyncio.gather(
+                *(get(pools[i % 4], '/portfolios/EUR/rebalance_sell') for i in range(20))
+            )
+
+            (portfolio_dir / 'assets_EUR.csv').unlink()
+            (portfolio_dir / 'allocation_EUR.csv').unlink()
+            for _ in range(100):
+                await asyncio.sleep(0.01)
+                if 'EUR' not in service.portfolios:
+                    break
+            index = await get(pools[0], '/portfolios')
+
+            for pool in pools:
+                await pool.close()
+        return before, index
+
+    before, index = asyncio.run(run())
+
+    assert all(response == before[0] for response in before)
+    assert index['portfolios'] == ['GBP']
@@ -0,0 +1,239 @@
+import numpy as np
+import pytest
+
+from portfoliomanager.solvers import allocate_shares, select_trades, to_cents, water_fill
+
+
+def iterative_water_fill(values, weights, budget, step=0.01):
+    values = np.array(values, dtype=float)
+    buys = np.zeros_like(values)
+    for _ in range(round(budget / step)):
+        with np.errstate(divide='ignore'):
+            levels = np.where(weights > 0, (values + buys) / weights, np.inf)
+        buys[np.argmin(levels)] += step
+    return buys
+
+
+def test_water_fill_spends_budget():
+    values = np.array([[100.0, 50.0, 0.0, 30.0]])
+    weights = np.array([[25.0, 25.0, 40.0, 10.0]])
+
+    buys = water_fill(values, weights, 70)
+
+    assert buys.sum() == pytest.approx(70)
+    assert (buys >= 0).all()
+    assert buys[0, 0] == 0
+    assert buys[0, 3] == 0
+
+
+def test_water_fill_matches_iterative():
+    values = np.array([100.0, 50.0, 0.0, 30.0, 10.0])
+    weights = np.array([20.0, 20.0, 30.0, 10.0, 20.0])
+
+    buys = water_fill(values, weights, 150)
+
+    np.testing.assert_allclose(buys[0], iterative_water_fill(values, weights, 150), atol=0.05)
+
+
+def test_water_fill_reaches_targets():
+    values = np.array([[10.0, 20.0, 30.0]])
+    weights = np.array([[50.0, 30.0, 20.0]])
+
+    buys = water_fill(values, weights, 1000)
+    final = values + buys
+
+    np.testing.assert_allclose(final / final.sum(), weights / 100)
+
+
+@pytest.mark.parametrize('budget', [0, 1e-14])
+def test_water_fill_zero_budget(budget):
+    values = np.array([881.31, 510.71, 344.3, 994.92, 315.94])
+    weights = np.array([1.4128, 36.8755, 37.8955, 9.9025, 13.9137])
+
+    buys = water_fill(values, weights, budget)
+
+    assert buys.sum() == pytest.approx(budget, abs=1e-9)
+
+
+def test_water_fill_zero_budget_random():
+    rng = np.random.default_rng(0)
+    values = np.round(rng.uniform(0, 1000, (2000, 5)), 2)
+    weights = rng.uniform(0, 40, (2000, 5))
+
+    assert water_fill(values, weights, 0).sum() == pytest.approx(0, abs=1e-9)
+
+
+def test_water_fill_zero_weight():
+    buys = water_fill(np.array([[100.0, 0.0]]), np.array([[0.0, 100.0]]), 10)
+
+    np.testing.assert_array_equal(buys, [[0.0, 10.0]])
+
+
+def test_water_fill_rows():
+    values = np.array([[10.0, 20.0], [20.0, 10.0]])
+    weights = np.array([[50.0, 50.0], [50.0, 50.0]])
+
+    buys = water_fill(values, weights, np.array([10.0, 20.0]))
+
+    np.testing.assert_allclose(buys, [[10.0, 0.0], [5.0, 15.0]])
+
+
+def test_water_fill_raise_ValueError_negative_budget():
+    with pytest.raises(ValueError, match=r'The amount to spend must not be negative.'):
+        water_fill(np.array([[1.0]]), np.array([[100.0]]), -1)
+
+
+def test_water_fill_raise_ValueError_no_weight():
+    with pytest.raises(ValueError, match=r'Every account needs .*'):
+        water_fill(np.array([[1.0]]), np.array([[0.0]]), 1)
+
+
+def test_to_cents():
+    total = 10
+    amounts = np.array([[total / 3, total / 3, total / 3, 0.0]])
+
+    cents = to_cents(amounts, total)
+
+    assert cents.sum() == total * 100
+    assert sorted(cents[0].tolist()) == [0, 333, 333, 334]
+
+
+def test_to_cents_rows():
+    amounts = np.array([[0.005, 0.005], [1.0, 0.0]])
+
+    cents = to_cents(amounts, np.array([0.01, 1.0]))
+
+    np.testing.assert_array_equal(cents.sum(axis=1), [1, 100])
+    assert cents[1, 1] == 0
+
+
+def test_allocate_shares_within_one_share():
+    rng = np.random.default_rng(0)
+    amounts = rng.normal(0, 5000, size=(20, 1000))
+    prices = rng.uniform(1, 500, size=(20, 1000))
+
+    shares = allocate_shares(amounts, prices)
+
+    assert shares.dtype == np.int64
+    assert (np.abs(shares - amounts / prices) < 1).all()
+    assert ((shares * prices).sum(axis=1) <= amounts.sum(axis=1) + 1e-6).all()
+    assert (np.sign(shares) * np.sign(amounts) >= 0).all()
+
+
+def test_allocate_shares_largest_deviation_first():
+    shares = allocate_shares([[190.0, 150.0, 60.0]], [[100.0, 100.0, 50.0]])
+
+    np.testing.assert_array_equal(shares, [[2, 1, 1]])
+
+
+def test_allocate_shares_negative_cash():
+    shares = allocate_shares([[-150.0, -50.0, 200.0]], [[100.0, 100.0, 100.0]])
+
+    np.testing.assert_array_equal(shares, [[-2, 0, 2]])
+
+
+def test_allocate_shares_budget():
+    shares = allocate_shares([[150.0, 150.0]], [[100.0, 100.0]], 250)
+
+    np.testing.assert_array_equal(shares, [[1, 1]])
+
+
+def test_allocate_shares_budget_below_buys():
+    amounts = [[350.0, 120.0, 0.0]]
+    prices = [[100.0, 40.0, 10.0]]
+    budget = 150
+
+    shares = allocate_shares(amounts, prices, budget)
+
+    np.testing.assert_array_equal(shares, [[1, 1, 0]])
+    assert (shares * prices).sum() <= budget
+
+
+def test_allocate_shares_budget_below_buys_random():
+    rng = np.random.default_rng(0)
+    amounts = rng.uniform(0, 5000, size=(50, 20))
+    prices = rng.uniform(1, 500, size=(50, 20))
+    budgets = amounts.sum(axis=1) * rng.uniform(0, 1, size=50)
+
+    shares = allocate_shares(amounts, prices, budgets)
+
+    assert ((shares * prices).sum(axis=1) <= budgets + 1e-6).all()
+    assert (shares >= 0).all()
+
+
+def test_allocate_shares_missing_price():
+    shares = allocate_shares([[100.0, 0.0]], [[50.0, np.nan]])
+
+    np.testing.assert_array_equal(shares, [[2, 0]])
+
+
+def test_allocate_shares_raise_ValueError():
+    with pytest.raises(ValueError, match=r'Every asset to buy or sell needs a positive price.'):
+        allocate_shares([[100.0]], [[np.nan]])
+    with pytest.raises(ValueError, match=r'The budget of an account is 50.00 short .*'):
+        allocate_shares([[100.0]], [[10.0]], -50)
+
+
+def test_select_trades_within_band():
+    movements = np.array([[500.0, -20.0, -300.0, 30.0, -210.0]])
+
+    trades = select_trades(movements, 100, 2.0, 0.001, 10)
+
+    assert trades.tolist() == [[500.0, 0.0, -300.0, 0.0, -210.0]]
+
+
+def test_select_trades_cheapest_funding():
+    movements = np.array([[500.0, -20.0, -30.0, 30.0, -480.0]])
+
+    trades = select_trades(movements, 100, 2.0, 0.001)
+    fees = np.where(trades != 0, 2.0 + np.abs(trades) * 0.001, 0)
+
+    assert trades[0, [0, 1, 3, 4]].tolist() == [500.0, 0.0, 0.0, -480.0]
+    assert movements[0, 2] < trades[0, 2] < 0
+    assert -(trades.sum() + fees.sum()) == pytest.approx(0, abs=0.01)
+
+
+def test_select_trades_scales_buys():
+    movements = np.array([[500.0, -490.0, -10.0]])
+
+    trades = select_trades(movements, 100, 1.0, 0.0, 50)
+
+    assert trades.tolist() == [[488.0, -490.0, 0.0]]
+
+
+def test_select_trades_min_trade():
+    movements = np.array([[150.0, -150.0], [50.0, -50.0]])
+
+    trades = select_trades(movements, [40, 40], 0.0, 0.0, 100)
+
+    assert trades.tolist() == [[150.0, -150.0], [0.0, 0.0]]
+
+
+def test_select_trades_scaled_buy_below_min_trade():
+    movements = np.array([[-51.26, 51.26]])
+
+    trades = select_trades(movements, 0, [2.5, 2.5], [0.005, 0.001], 50)
+
+    assert trades.tolist() == [[-51.26, 0.0]]
+
+
+def test_select_trades_bands_per_asset():
+    movements = np.array([[150.0, -100.0, -50.0], [50.0, -50.0, 0.0]])
+
+    trades = select_trades(movements, [[200, 200, 20], [40, 40, 40]], 0.0, 0.0)
+
+    assert trades.tolist() == [[50.0, 0.0, -50.0], [50.0, -50.0, 0.0]]
+
+
+def test_select_trades_spends_surplus():
+    current = np.array([580.0, 105.0, 105.0, 105.0, 105.0])
+    weights = np.array([40.0, 15.0, 15.0, 15.0, 15.0])
+    tolerance = 5
+    movements = weights * current.sum() / 100 - current
+
+    trades = select_trades(movements, current.sum() * tolerance / 100, 1.0, 0.001)[0]
+    fees = np.where(trades != 0, 1.0 + np.abs(trades) * 0.001, 0)
+    expected = current + trades
+
+    assert (np.abs(expected / expected.sum() * 100 - weights) < tolerance).all()
+    assert -(trades.sum() + fees.sum()) == pytest.approx(0, abs=0.01)
@@ -0,0 +1,215 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from portfoliomanager.degiroportfolio import DegiroPortfolio
+from portfoliomanager.transactions import (
+    TransactionLedger,
+    read_degiro_account,
+    read_degiro_transactions,
+)
+from tests.conftest import allocations_csv, csv_dir, portfolios_csv
+
+HEADER = (
+    'Data,Ora,Prodotto,ISIN,Borsa di riferimento,Sede di esecuzione,Quantità,Quotazione,,'
+    'Valore locale,,Valore,,Tasso di cambio,Costi di transazione,,Totale,,ID Ordine\n'
+)
+ROWS = [
+    (
+        '15-03-2024,10:00,S&P 500 ETF,US4642872000,NSY,ARCX,-100,"55,00",USD,"5500,00",USD,'
+        '"5000,00",EUR,"1,1000","-2,00",EUR,"4998,00",EUR,o4\n'
+    ),
+    (
+        '01-02-2024,09:30,S&P 500 ETF,US4642872000,NSY,ARCX,50,"50,00",USD,"-2500,00",USD,'
+        '"-2272,73",EUR,"1,1000","-2,00",EUR,"-2274,73",EUR,o3\n'
+    ),
+    (
+        '10-01-2024,09:00,VANGUARD S&P 500,IE00B3XXRP09,EAM,XAMS,20,"80,00",EUR,"-1600,00",EUR,'
+        '"-1600,00",EUR,,"-1,00",EUR,"-1601,00",EUR,o2\n'
+    ),
+    (
+        '02-01-2024,09:00,S&P 500 ETF,US4642872000,NSY,ARCX,200,"50,00",USD,"-10000,00",USD,'
+        '"-9090,91",EUR,"1,1000","-2,00",EUR,"-9092,91",EUR,o1\n'
+    ),
+]
+HELD = {'US4642872000': 200 + 50 - 100, 'IE00B3XXRP09': 20}
+
+
+@pytest.fixture
+def export(tmp_path):
+    def write(rows, name='transactions.csv'):
+        path = tmp_path / name
+        path.write_text(HEADER + ''.join(rows))
+        return path
+
+    return write
+
+
+def events(rows):
+    return pd.DataFrame(
+        rows, columns=['Date', 'ISIN', 'Product', 'Type', 'Quantity', 'Price', 'Rate', 'Cash']
+    ).assign(Date=lambda df: pd.to_datetime(df['Date']))
+
+
+def test_read_degiro_transactions(export):
+    chunks = list(read_degiro_transactions(export(ROWS), chunksize=3))
+
+    assert [len(chunk) for chunk in chunks] == [3, 1]
+    first = chunks[0].iloc[0]
+    assert first[['Type', 'Quantity', 'Price', 'Rate', 'Cash']].to_dict() == {
+        'Type': 'sell',
+        'Quantity': 100,
+        'Price': 55,
+        'Rate': 1.1,
+        'Cash': 4998,
+    }
+    assert chunks[0].iloc[2]['Rate'] == 1
+
+
+def test_read_degiro_transactions_raise_ValueError(tmp_path):
+    path = tmp_path / 'transactions.csv'
+    path.write_text('Data,Ora,Prodotto\n01-01-2024,09:00,ETF\n')
+
+    with pytest.raises(ValueError, match=r'Column mismatch: expected 19 columns .*'):
+        list(read_degiro_transactions(path))
+
+
+def test_ledger_positions(export):
+    ledger = TransactionLedger()
+
+    assert ledger.ingest(read_degiro_transactions(export(ROWS), chunksize=2)) == len(ROWS)
+    positions = ledger.positions
+
+    assert ledger.watermarks == {'transactions': pd.Timestamp('2024-03-15 10:00')}
+    assert positions['Amount'].to_dict() == HELD
+    assert positions['Closing'].to_dict() == {'US4642872000': 55, 'IE00B3XXRP09': 80}
+    assert positions.loc['US4642872000', 'Price'] == pytest.approx(50)
+    assert positions.loc['US4642872000', 'Invested'] == pytest.approx(9092.91 + 2274.73 - 4998)
+    assert positions.loc['IE00B3XXRP09', 'Product'] == 'VANGUARD S&P 500'
+    assert positions.loc['IE00B3XXRP09', 'Invested'] == pytest.approx(1601)
+
+
+def test_ledger_splits():
+    ledger = TransactionLedger()
+    ledger.ingest(
+        events(
+            [
+                ('2024-01-01', 'A', 'ETF A', 'buy', 10, 100.0, 1.0, -1000.0),
+                ('2024-02-01', 'A', None, 'split', 3, np.nan, 1.0, 0.0),
+                ('2024-03-01', 'A', None, 'buy', 5, 40.0, 1.0, -200.0),
+                ('2024-03-01', 'B', 'ETF B', 'buy', 4, 10.0, 1.0, -40.0),
+                ('2024-04-01', 'B', None, 'split', 2, np.nan, 1.0, 0.0),
+                ('2024-04-02', 'A', None, 'sell', 15, 45.0, 1.0, 675.0),
+            ]
+        )
+    )
+    positions = ledger.positions
+
+    assert positions['Amount'].to_dict() == {'A': 20, 'B': 8}
+    assert positions['Closing'].to_dict() == {'A': 45, 'B': 5}
+    assert positions['Invested'].to_dict() == {'A': 525, 'B': 40}
+
+
+def test_ledger_unknown_type():
+    with pytest.raises(ValueError, match=r"Unknown event types \['merger'\].*"):
+        TransactionLedger().ingest(
+            events([('2024-01-01', 'A', 'ETF A', 'merger', 1, 1.0, 1.0, 0.0)])
+        )
+
+
+def test_ledger_checkpoint(export, tmp_path):
+    checkpoint = tmp_path / 'ledger.npz'
+    TransactionLedger(checkpoint).ingest(read_degiro_transactions(export(ROWS[1:])))
+
+    resumed = TransactionLedger(checkpoint)
+    assert resumed.watermarks == {'transactions': pd.Timestamp('2024-02-01 09:30')}
+    assert resumed.ingest(read_degiro_transactions(export(ROWS))) == 1
+    assert TransactionLedger(checkpoint).ingest(read_degiro_transactions(export(ROWS))) == 0
+
+    full = TransactionLedger()
+    full.ingest(read_degiro_transactions(export(ROWS)))
+    pd.testing.assert_frame_equal(resumed.positions, full.positions)
+
+
+def test_ledger_watermark_ties(export):
+    sold = 10
+    tie = ROWS[0].replace('-100', f'-{sold}').replace(',o4', ',o5')
+    ledger = TransactionLedger()
+    ledger.ingest(read_degiro_transactions(export(ROWS)))
+
+    assert ledger.ingest(read_degiro_transactions(export([tie, *ROWS]))) == 1
+    assert ledger.positions.loc['US4642872000', 'Amount'] == HELD['US4642872000'] - sold
+
+
+def test_ledger_identical_fills(export, tmp_path):
+    checkpoint = tmp_path / 'ledger.npz'
+    twice = export([ROWS[0], *ROWS], 'twice.csv')
+    thrice = export([ROWS[0], ROWS[0], *ROWS], 'thrice.csv')
+
+    assert TransactionLedger(checkpoint).ingest(read_degiro_transactions(twice)) == len(ROWS) + 1
+    assert TransactionLedger(checkpoint).ingest(read_degiro_transactions(twice)) == 0
+    assert TransactionLedger(checkpoint).ingest(read_degiro_transactions(thrice)) == 1
+
+    sold = 100
+    amount = TransactionLedger(checkpoint).positions.loc['US4642872000', 'Amount']
+    assert amount == HELD['US4642872000'] - 2 * sold
+
+
+def test_ledger_dividends(tmp_path):
+    account = tmp_path / 'account.csv'
+    account.write_text(
+        'Data,Ora,Data valore,Prodotto,ISIN,Descrizione,Tasso di cambio,Variazione,,Saldo,,'
+        'ID Ordine\n'
+        '20-03-2024,07:00,19-03-2024,S&P 500 ETF,US4642872000,Ritenuta sul dividendo,,USD,'
+        '"-4,50",USD,"25,50",\n'
+        '20-03-2024,07:00,19-03-2024,S&P 500 ETF,US4642872000,Dividendo,,USD,"30,00",USD,'
+        '"30,00",\n'
+        '05-03-2024,12:00,,,,Deposito,,EUR,"1000,00",EUR,"1000,00",\n'
+    )
+    ledger = TransactionLedger()
+    dividends = ['Ritenuta sul dividendo', 'Dividendo']
+
+    assert ledger.ingest(read_degiro_account(account)) == len(dividends)
+    assert ledger.positions.loc['US4642872000', 'Dividends'] == pytest.approx(25.5)
+    assert ledger.positions.loc['US4642872000', 'Amount'] == 0
+
+
+def test_ledger_watermark_per_source(export, tmp_path):
+    checkpoint = tmp_path / 'ledger.npz'
+    TransactionLedger(checkpoint).ingest(read_degiro_transactions(export(ROWS)))
+    ledger = TransactionLedger(checkpoint)
+    dividend = 30.0
+
+    folded = ledger.ingest(
+        events(
+            [('2024-03-01', 'US4642872000', 'S&P 500 ETF', 'dividend', 0, np.nan, 1.0, dividend)]
+        )
+    )
+
+    assert folded == 1
+    assert ledger.positions.loc['US4642872000', 'Dividends'] == dividend
+    assert TransactionLedger(checkpoint).watermarks == {
+        'transactions': pd.Timestamp('2024-03-15 10:00'),
+        'account': pd.Timestamp('2024-03-01'),
+    }
+
+
+def test_ledger_source(export):
+    ledger = TransactionLedger()
+    ledger.ingest(read_degiro_transactions(export(ROWS[:1])), source='broker A')
+
+    new = ROWS[1:]
+
+    assert ledger.ingest(read_degiro_transactions(export(new)), source='broker B') == len(new)
+    assert set(ledger.watermarks) == {'broker A', 'broker B'}
+
+
+def test_ledger_assets(export):
+    ledger = TransactionLedger()
+    ledger.ingest(read_degiro_transactions(export(ROWS)))
+    portfolio = DegiroPortfolio(csv_dir / portfolios_csv[0], csv_dir / allocations_csv[0])
+
+    portfolio.set_assets(ledger.assets())
+
+    assert portfolio.total_value == pytest.approx(150 * 50 + 20 * 80)
+    assert portfolio.summary.loc['IE00B3XXRP09', 'Current Value'] == 20 * 80